@@ -7,11 +7,14 @@ Loader mechanism for caching data, with data expiration, etc.
 
 # Import Python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import atexit
 import logging
+import threading
 import time
 
 # Import Salt libs
 import salt.config
+from salt.exceptions import SaltCacheError
 from salt.ext import six
 from salt.payload import Serial
 from salt.utils.odict import OrderedDict
@@ -20,20 +23,128 @@ import salt.syspaths
 
 log = logging.getLogger(__name__)
 
+# Sentinel telling buffered writes of None apart from missing ones
+_MISSING = object()
+
 
 def factory(opts, **kwargs):
     '''
     Creates and returns the cache class.
     If memory caching is enabled by opts MemCache class will be instantiated.
-    If not Cache class will be returned.
+    If a memory bound is set for the LRU cache LRUCache class will be
+    instantiated. If not Cache class will be returned.
     '''
     if opts.get('memcache_expire_seconds', 0):
         cls = MemCache
+    elif opts.get('cache_lru_max_bytes', 0):
+        cls = LRUCache
     else:
         cls = Cache
     return cls(opts, **kwargs)
 
 
+class DeferredWriter(object):
+    '''
+    Buffer cache writes in memory and store them from a background thread.
+
+    Writes to the same key are coalesced and every bank is written with a
+    single ``store_many`` call. Data is written at most ``interval`` seconds
+    after it was handed over, which bounds how stale other processes reading
+    the cache may be. Reads through the owning cache object see the buffered
+    data immediately.
+    '''
+    def __init__(self, cache, interval):
+        self.cache = cache
+        self.interval = interval
+        # {<bank>: {<key>: <data>, ...}, ...}
+        self.pending = {}
+        # The writes currently being stored by flush()
+        self.inflight = {}
+        self.lock = threading.Lock()
+        # Held for the whole of a flush, so that the final flush of stop()
+        # does not run while the background thread is still storing a batch
+        self.flush_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        if self.thread is None:
+            atexit.register(self.stop)
+        self.thread = threading.Thread(target=self._run, name='DeferredWriter')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.flush()
+
+    def stop(self):
+        '''
+        Stop the background thread and store all buffered writes
+        '''
+        self.stop_event.set()
+        thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+
+    def put(self, bank, key, data):
+        '''
+        Buffer a write of ``data`` to ``bank``/``key``
+        '''
+        with self.lock:
+            self.pending.setdefault(bank, {})[key] = data
+            self._start()
+
+    def get(self, bank, key, default=None):
+        '''
+        Return the buffered data of ``bank``/``key``, or ``default``
+        '''
+        with self.lock:
+            for writes in (self.pending, self.inflight):
+                if key in writes.get(bank, {}):
+                    return writes[bank][key]
+        return default
+
+    def discard(self, bank, key=None):
+        '''
+        Drop the buffered writes of a key, or of a whole bank and its sub-banks
+        '''
+        with self.lock:
+            for writes in (self.pending, self.inflight):
+                for wbank in list(writes):
+                    if key is None:
+                        if wbank == bank or wbank.startswith(bank + '/'):
+                            del writes[wbank]
+                    elif wbank == bank:
+                        writes[wbank].pop(key, None)
+
+    def flush(self):
+        '''
+        Store all buffered writes
+        '''
+        with self.flush_lock:
+            with self.lock:
+                inflight = self.inflight = self.pending
+                self.pending = {}
+            try:
+                for bank in list(inflight):
+                    with self.lock:
+                        # discard() may have dropped keys since the swap
+                        data = dict(inflight.get(bank) or {})
+                    if not data:
+                        continue
+                    try:
+                        self.cache.store_many(bank, data)
+                    except SaltCacheError as exc:
+                        log.error('Failed to store deferred cache writes to %s: %s', bank, exc)
+            finally:
+                with self.lock:
+                    self.inflight = {}
+
+
 class Cache(object):
     '''
     Base caching object providing access to the modular cache subsystem.
@@ -50,6 +161,10 @@ class Cache(object):
         If a driver can't use a specific module or uses specific objects storage
         it can ignore this parameter.
 
+    :param cache_flush_interval:
+        The maximum number of seconds writes handed to ``defer_store`` are
+        buffered before being stored. Default is `0`, storing them immediately.
+
     Terminology.
 
     Salt cache subsystem is organized as a tree with nodes and leafs like a
@@ -78,6 +193,11 @@ class Cache(object):
         self._modules = None
         self._kwargs = kwargs
         self._kwargs['cachedir'] = self.cachedir
+        flush_interval = opts.get('cache_flush_interval', 0)
+        if flush_interval:
+            self._writer = DeferredWriter(self, flush_interval)
+        else:
+            self._writer = None
 
     def __lazy_init(self):
         self._modules = salt.loader.cache(self.opts, self.serial)
@@ -155,6 +275,51 @@ class Cache(object):
         fun = '{0}.store'.format(self.driver)
         return self.modules[fun](bank, key, data, **self._kwargs)
 
+    def store_many(self, bank, data):
+        '''
+        Store several keys of the same bank at once. Drivers implementing
+        ``store_many`` can group the writes, for the others every key is
+        stored in turn.
+
+        :param bank:
+            The name of the location inside the cache which will hold the keys
+            and their associated data.
+
+        :param data:
+            A dict mapping the key names to the data to store under them.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        fun = '{0}.store_many'.format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](bank, data, **self._kwargs)
+        for key, value in six.iteritems(data):
+            self.store(bank, key, value)
+
+    def defer_store(self, bank, key, data):
+        '''
+        Hand data over to be stored in the background, at most
+        ``cache_flush_interval`` seconds later. Fetching the key through this
+        object returns the new data right away. If ``cache_flush_interval`` is
+        not set, the data is stored immediately.
+
+        :param bank:
+            The name of the location inside the cache which will hold the key
+            and its associated data.
+
+        :param key:
+            The name of the key (or file inside a directory) which will hold
+            the data.
+
+        :param data:
+            The data which will be stored in the cache.
+        '''
+        if self._writer is None:
+            return self.store(bank, key, data)
+        self._writer.put(bank, key, data)
+
     def fetch(self, bank, key):
         '''
         Fetch data using the specified module
@@ -176,6 +341,10 @@ class Cache(object):
             Raises an exception if cache driver detected an error accessing data
             in the cache backend (auth, permissions, etc).
         '''
+        if self._writer is not None:
+            data = self._writer.get(bank, key, _MISSING)
+            if data is not _MISSING:
+                return data
         fun = '{0}.fetch'.format(self.driver)
         return self.modules[fun](bank, key, **self._kwargs)
 
@@ -221,6 +390,8 @@ class Cache(object):
             Raises an exception if cache driver detected an error accessing data
             in the cache backend (auth, permissions, etc).
         '''
+        if self._writer is not None:
+            self._writer.discard(bank, key)
         fun = '{0}.flush'.format(self.driver)
         return self.modules[fun](bank, key=key, **self._kwargs)
 
@@ -352,6 +523,154 @@ class MemCache(Cache):
                 self.storage.popitem(last=False)
         self.storage[(bank, key)] = [time.time(), data]
 
+    def store_many(self, bank, data):
+        for key in data:
+            self.storage.pop((bank, key), None)
+        super(MemCache, self).store_many(bank, data)
+
+    def defer_store(self, bank, key, data):
+        self.storage.pop((bank, key), None)
+        super(MemCache, self).defer_store(bank, key, data)
+
     def flush(self, bank, key=None):
         self.storage.pop((bank, key), None)
         super(MemCache, self).flush(bank, key)
+
+
+class LRUCache(Cache):
+    '''
+    Read-through in-memory cache bounded in bytes with least recently used
+    eviction.
+
+    Entries are revalidated on every fetch. With drivers implementing
+    ``updated`` the entry is served from memory as long as the driver reports
+    the same update time, which is much cheaper than fetching and
+    reading the data again. Since ``updated`` has a resolution of one second,
+    data fetched during the second it was written is revalidated by fetching
+    it again. With other drivers the entry is served from memory for
+    ``cache_lru_ttl`` seconds.
+
+    Entries are kept serialized and unpacked on every hit, so that callers
+    modifying the data they fetched do not alter what is served to the next
+    ones.
+
+    Related configuration options:
+
+    :param cache_lru_max_bytes:
+        The size of the serialized entries kept per storage (driver + driver
+        options) before the least recently used ones are evicted.
+
+    :param cache_lru_ttl:
+        The number of seconds entries of drivers not implementing ``updated``
+        are served from memory. Default is `60`.
+    '''
+    # {<storage_id>: odict({(<bank>, <key>): [<version>, <valid>, <size>, <packed data>], ...}), ...}
+    data = {}
+    # {<storage_id>: {'hit': <int>, 'miss': <int>, 'eviction': <int>, 'bytes': <int>}, ...}
+    counters = {}
+
+    def __init__(self, opts, **kwargs):
+        super(LRUCache, self).__init__(opts, **kwargs)
+        self.max_bytes = opts.get('cache_lru_max_bytes', 0)
+        self.ttl = opts.get('cache_lru_ttl', 60)
+        self._storage_id = None
+
+    @property
+    def storage_id(self):
+        if self._storage_id is None:
+            fun = '{0}.get_storage_id'.format(self.driver)
+            if fun in self.modules:
+                self._storage_id = self.modules[fun](self._kwargs)
+            else:
+                self._storage_id = self.driver
+            if self._storage_id not in LRUCache.data:
+                LRUCache.data[self._storage_id] = OrderedDict()
+                LRUCache.counters[self._storage_id] = {
+                    'hit': 0, 'miss': 0, 'eviction': 0, 'bytes': 0}
+        return self._storage_id
+
+    @classmethod
+    def stats(cls):
+        '''
+        Return the hit, miss and eviction counters and the estimated size of
+        the entries of every storage used in this process
+        '''
+        ret = {}
+        for storage_id, counters in six.iteritems(cls.counters):
+            ret[six.text_type(storage_id)] = dict(counters,
+                                                  items=len(cls.data[storage_id]))
+        return ret
+
+    def _version(self, bank, key):
+        '''
+        Return a token changing whenever the data of the key changes, and
+        whether it is precise enough to trust a cached entry carrying it
+        '''
+        now = time.time()
+        if '{0}.updated'.format(self.driver) in self.modules:
+            updated = self.updated(bank, key)
+            return updated, updated is not None and updated < int(now)
+        return int(now // self.ttl) if self.ttl else None, bool(self.ttl)
+
+    def _evict(self, storage, counters, bank, key):
+        record = storage.pop((bank, key), None)
+        if record is not None:
+            counters['bytes'] -= record[2]
+
+    def fetch(self, bank, key):
+        storage = LRUCache.data[self.storage_id]
+        counters = LRUCache.counters[self.storage_id]
+        version, valid = self._version(bank, key)
+        record = storage.pop((bank, key), None)
+        if record is not None:
+            if record[1] and record[0] == version:
+                counters['hit'] += 1
+                storage[(bank, key)] = record
+                return self.serial.loads(record[3], encoding='utf-8')
+            counters['bytes'] -= record[2]
+        counters['miss'] += 1
+
+        data = super(LRUCache, self).fetch(bank, key)
+        # Packed with the bin type, so that str and bytes are told apart on
+        # load without walking the data to decode them
+        packed = self.serial.dumps(data, use_bin_type=True)
+        size = len(packed)
+        if size > self.max_bytes:
+            return data
+        storage[(bank, key)] = [version, valid, size, packed]
+        counters['bytes'] += size
+        while counters['bytes'] > self.max_bytes:
+            _, record = storage.popitem(last=False)
+            counters['bytes'] -= record[2]
+            counters['eviction'] += 1
+        return data
+
+    def store(self, bank, key, data):
+        self._evict(LRUCache.data[self.storage_id],
+                    LRUCache.counters[self.storage_id],
+                    bank, key)
+        super(LRUCache, self).store(bank, key, data)
+
+    def store_many(self, bank, data):
+        for key in data:
+            self._evict(LRUCache.data[self.storage_id],
+                        LRUCache.counters[self.storage_id],
+                        bank, key)
+        super(LRUCache, self).store_many(bank, data)
+
+    def defer_store(self, bank, key, data):
+        self._evict(LRUCache.data[self.storage_id],
+                    LRUCache.counters[self.storage_id],
+                    bank, key)
+        super(LRUCache, self).defer_store(bank, key, data)
+
+    def flush(self, bank, key=None):
+        storage = LRUCache.data[self.storage_id]
+        counters = LRUCache.counters[self.storage_id]
+        if key is None:
+            for cbank, ckey in list(storage):
+                if cbank == bank or cbank.startswith(bank + '/'):
+                    self._evict(storage, counters, cbank, ckey)
+        else:
+            self._evict(storage, counters, bank, key)
+        super(LRUCache, self).flush(bank, key)
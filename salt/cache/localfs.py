@@ -72,6 +72,38 @@ def store(bank, key, data, cachedir):
         )
 
 
+def store_many(bank, data, cachedir):
+    '''
+    Store several keys of a bank, creating the bank directory only once.
+    '''
+    base = os.path.join(cachedir, os.path.normpath(bank))
+    try:
+        os.makedirs(base)
+    except OSError as exc:
+        if exc.errno != errno.EEXIST:
+            raise SaltCacheError(
+                'The cache directory, {0}, could not be created: {1}'.format(
+                    base, exc
+                )
+            )
+
+    serial = __context__['serial']
+    for key, value in data.items():
+        outfile = os.path.join(base, '{0}.p'.format(key))
+        tmpfh, tmpfname = tempfile.mkstemp(dir=base)
+        try:
+            with os.fdopen(tmpfh, 'w+b') as fh_:
+                fh_.write(serial.dumps(value))
+            # On Windows, os.rename will fail if the destination file exists.
+            salt.utils.atomicfile.atomic_rename(tmpfname, outfile)
+        except (IOError, OSError) as exc:
+            raise SaltCacheError(
+                'There was an error writing the cache file, {0}: {1}'.format(
+                    base, exc
+                )
+            )
+
+
 def fetch(bank, key, cachedir):
     '''
     Fetch information from a file.
@@ -106,7 +138,7 @@ def updated(bank, key, cachedir):
     '''
     key_file = os.path.join(cachedir, os.path.normpath(bank), '{0}.p'.format(key))
     if not os.path.isfile(key_file):
-        log.warning('Cache file "%s" does not exist', key_file)
+        log.debug('Cache file "%s" does not exist', key_file)
         return None
     try:
         return int(os.path.getmtime(key_file))
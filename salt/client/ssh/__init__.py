@@ -668,7 +668,7 @@ class SSH(object):
             }
 
         # save load to the master job cache
-        if self.opts['master_job_cache'] == 'local_cache':
+        if self.opts['master_job_cache'] in ('local_cache', 'local_log_cache'):
             self.returners['{0}.save_load'.format(self.opts['master_job_cache'])](jid, job_load, minions=self.targets.keys())
         else:
             self.returners['{0}.save_load'.format(self.opts['master_job_cache'])](jid, job_load)
@@ -742,7 +742,7 @@ class SSH(object):
         try:
             if isinstance(jid, bytes):
                 jid = jid.decode('utf-8')
-            if self.opts['master_job_cache'] == 'local_cache':
+            if self.opts['master_job_cache'] in ('local_cache', 'local_log_cache'):
                 self.returners['{0}.save_load'.format(self.opts['master_job_cache'])](jid, job_load, minions=self.targets.keys())
             else:
                 self.returners['{0}.save_load'.format(self.opts['master_job_cache'])](jid, job_load)
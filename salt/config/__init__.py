@@ -381,6 +381,25 @@ VALID_OPTS = immutabletypes.freeze({
     # The chunk size to use when streaming files with the file server
     'file_buffer_size': int,
 
+    # The size of the content addressed chunks files are split into for
+    # chunked transfers
+    'file_chunk_size': int,
+
+    # Transfer files from the master in content addressed chunks, only
+    # fetching the chunks missing from the local copy
+    'file_chunk_transfer': bool,
+
+    # The number of chunks requested at once in chunked transfers
+    'file_chunk_batch': int,
+
+    # The number of files requested from the master at once when caching
+    # several files. 0 disables batched transfers.
+    'file_batch_size': int,
+
+    # The largest file, and the most file data, the master returns in
+    # response to a single batched request
+    'file_batch_max_size': int,
+
     # The TCP port on which minion events should be published if ipc_mode is TCP
     'tcp_pub_port': int,
 
@@ -400,6 +419,14 @@ VALID_OPTS = immutabletypes.freeze({
     # The TCP port for mworkers to connect to on the master
     'tcp_master_workers': int,
 
+    # The TCP port the TCP transport publisher hands publishes to its shard
+    # processes on if ipc_mode is TCP
+    'tcp_master_publish_shards': int,
+
+    # The number of processes the TCP transport publisher spreads the minion
+    # connections over
+    'tcp_publish_shards': int,
+
     # The file to send logging data to
     'log_file': six.string_types,
 
@@ -454,6 +481,14 @@ VALID_OPTS = immutabletypes.freeze({
     # Tell the loader to attempt to import *.zip archives
     'enable_zip_modules': bool,
 
+    # Persist the loader file mappings under the cachedir and reuse them
+    # instead of listing the module directories on every load
+    'loader_manifest': bool,
+
+    # Cache which modules are unavailable according to their __virtual__
+    # function so that they are not imported again
+    'loader_virtual_cache': bool,
+
     # Tell the client to show minions that have timed out
     'show_timeout': bool,
 
@@ -484,6 +519,18 @@ VALID_OPTS = immutabletypes.freeze({
     # Fire events as state chunks are processed by the state compiler
     'state_events': bool,
 
+    # The number of processes used to run independent state chunks at the
+    # same time, 0 runs the chunks one after the other
+    'state_parallel_workers': int,
+
+    # State modules which are never run in a separate process by the
+    # parallel state scheduler
+    'state_parallel_exclude': list,
+
+    # Cache the lowstate compiled by a highstate, along with the fingerprint
+    # of the top file matches, SLS files, grains and pillar it is compiled from
+    'state_lowstate_cache': bool,
+
     # The number of seconds a minion should wait before retry when attempting authentication
     'acceptance_wait_time': float,
 
@@ -554,6 +601,18 @@ VALID_OPTS = immutabletypes.freeze({
     # returner specified by 'event_return'
     'event_return_queue': int,
 
+    # The number of seconds after which the queued events are pushed to the event
+    # returners, even if fewer than 'event_return_queue' events have been queued
+    'event_return_flush_interval': int,
+
+    # The number of events to keep on disk for each event returner until it has
+    # stored them, 0 disables the spool
+    'event_return_spool_max': int,
+
+    # The number of attempts to store a spooled batch of events before setting
+    # it aside until the master restarts, 0 retries forever
+    'event_return_spool_retries': int,
+
     # Only forward events to an event returner if it matches one of the tags in this list
     'event_return_whitelist': list,
 
@@ -710,6 +769,8 @@ VALID_OPTS = immutabletypes.freeze({
     'gitfs_ref_types': list,
     'gitfs_refspecs': list,
     'gitfs_disable_saltenv_mapping': bool,
+    # Serve gitfs files and hashes straight from the object database
+    'gitfs_serve_from_odb': bool,
     'hgfs_remotes': list,
     'hgfs_mountpoint': six.string_types,
     'hgfs_root': six.string_types,
@@ -737,6 +798,21 @@ VALID_OPTS = immutabletypes.freeze({
     # Specify a list of external pillar systems to use
     'ext_pillar': list,
 
+    # The number of ext_pillar sources a pillar compile evaluates at the same
+    # time, 0 evaluates them one after the other
+    'ext_pillar_concurrency': int,
+
+    # The number of seconds concurrently evaluated ext_pillar sources may take,
+    # 0 waits for them for as long as they take
+    'ext_pillar_timeout': (int, float),
+
+    # Per ext_pillar interface overrides of ext_pillar_timeout
+    'ext_pillar_timeouts': dict,
+
+    # Whether a failed ext_pillar source makes the pillar compilation fail
+    # ('closed') or is skipped ('open')
+    'ext_pillar_fail_policy': six.string_types,
+
     # Reserved for future use to version the pillar structure
     'pillar_version': int,
 
@@ -749,9 +825,24 @@ VALID_OPTS = immutabletypes.freeze({
     # Pillar cache TTL, in seconds. Has no effect unless `pillar_cache` is True
     'pillar_cache_ttl': int,
 
-    # Pillar cache backend. Defaults to `disk` which stores caches in the master cache
+    # Pillar cache backend. Defaults to `disk` which stores caches in the master cache,
+    # `cache` stores them through the salt.cache drivers
     'pillar_cache_backend': six.string_types,
 
+    # The number of seconds the revisions of the pillar_roots files and
+    # git_pillar refs checked by `pillar_cache` are reused for
+    'pillar_cache_source_interval': int,
+
+    # Reuse the data rendered from a pillar SLS file for the minions for which
+    # the file reads the same grains, pillar and opts values
+    'pillar_render_cache': bool,
+
+    # The number of pillar SLS renders kept in memory by each process
+    'pillar_render_cache_size': int,
+
+    # The number of seconds unused pillar SLS renders are kept in the master cache
+    'pillar_render_cache_ttl': int,
+
     'pillar_safe_render_error': bool,
 
     # When creating a pillar, there are several strategies to choose from when
@@ -801,6 +892,11 @@ VALID_OPTS = immutabletypes.freeze({
     'fileserver_backend': list,
     'fileserver_followsymlinks': bool,
     'fileserver_ignoresymlinks': bool,
+
+    # Keep an in-memory index of the file_roots, refreshed incrementally, to
+    # serve the roots fileserver file lists and hashes
+    'fileserver_roots_index': bool,
+
     'fileserver_limit_traversal': bool,
     'fileserver_verify_config': bool,
 
@@ -853,12 +949,24 @@ VALID_OPTS = immutabletypes.freeze({
     # Specify whether the master should store end times for jobs as returns come in
     'job_cache_store_endtime': bool,
 
+    # The maximum number of seconds the master buffers minion data cache writes
+    # before storing them from a background thread, 0 stores them immediately
+    'cache_flush_interval': int,
+
     # The minion data cache is a cache of information about the minions stored on the master.
     # This information is primarily the pillar and grains data. The data is cached in the master
     # cachedir under the name of the minion and used to predetermine what minions are expected to
     # reply from executions.
     'minion_data_cache': bool,
 
+    # Keep an in-memory inverted index of the minion data cache in each master
+    # process and resolve grain and pillar targets against it
+    'minion_data_index': bool,
+
+    # The number of seconds between reconciliations of the minion data index
+    # with the minion data cache
+    'minion_data_index_refresh': int,
+
     # The number of seconds between AES key rotations on the master
     'publish_session': int,
 
@@ -939,6 +1047,10 @@ VALID_OPTS = immutabletypes.freeze({
     # The number of minutes between the minion refreshing its cache of grains
     'grains_refresh_every': int,
 
+    # Mapping of grain functions (or globs matching them) to the number of
+    # seconds their results are reused for on grains refreshes
+    'grains_ttl': dict,
+
     # Use lspci to gather system data for grains on a minion
     'enable_lspci': bool,
 
@@ -1115,6 +1227,12 @@ VALID_OPTS = immutabletypes.freeze({
     'memcache_full_cleanup': bool,
     # Enable collecting the memcache stats and log it on `debug` log level.
     'memcache_debug': bool,
+    # Enables a read-through LRU cache over the cache driver, bounded to the
+    # given size in bytes of serialized entries per cache storage.
+    'cache_lru_max_bytes': int,
+    # Number of seconds LRU cache entries of drivers not reporting update times
+    # are served from memory.
+    'cache_lru_ttl': int,
 
     # Thin and minimal Salt extra modules
     'thin_extra_mods': six.string_types,
@@ -1249,6 +1367,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'grains_blacklist': [],
     'grains_cache': False,
     'grains_cache_expiration': 300,
+    'grains_ttl': {},
     'grains_deep_merge': False,
     'conf_file': os.path.join(salt.syspaths.CONFIG_DIR, 'minion'),
     'sock_dir': os.path.join(salt.syspaths.SOCK_DIR, 'minion'),
@@ -1273,6 +1392,10 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'pillar_cache': False,
     'pillar_cache_ttl': 3600,
     'pillar_cache_backend': 'disk',
+    'pillar_cache_source_interval': 60,
+    'pillar_render_cache': False,
+    'pillar_render_cache_size': 1024,
+    'pillar_render_cache_ttl': 86400,
     'extension_modules': os.path.join(salt.syspaths.CACHE_DIR, 'minion', 'extmods'),
     'state_top': 'top.sls',
     'state_top_saltenv': None,
@@ -1302,6 +1425,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'file_ignore_glob': [],
     'fileserver_backend': ['roots'],
     'fileserver_followsymlinks': True,
+    'fileserver_roots_index': False,
     'fileserver_ignoresymlinks': False,
     'pillar_roots': {
         'base': [salt.syspaths.BASE_PILLAR_ROOTS_DIR,
@@ -1356,6 +1480,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'gitfs_ref_types': ['branch', 'tag', 'sha'],
     'gitfs_refspecs': _DFLT_REFSPECS,
     'gitfs_disable_saltenv_mapping': False,
+    'gitfs_serve_from_odb': False,
     'unique_jid': False,
     'hash_type': 'sha256',
     'optimization_order': [0, 1, 2],
@@ -1389,6 +1514,10 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'ipc_so_backlog': 128,
     'ipv6': None,
     'file_buffer_size': 262144,
+    'file_chunk_size': 1048576,
+    'file_chunk_transfer': False,
+    'file_chunk_batch': 4,
+    'file_batch_size': 0,
     'tcp_pub_port': 4510,
     'tcp_pull_port': 4511,
     'tcp_authentication_retries': 5,
@@ -1410,12 +1539,17 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'cython_enable': False,
     'enable_gpu_grains': True,
     'enable_zip_modules': False,
+    'loader_manifest': False,
+    'loader_virtual_cache': False,
     'state_verbose': True,
     'state_output': 'full',
     'state_output_diff': False,
     'state_auto_order': True,
     'state_events': False,
     'state_aggregate': False,
+    'state_parallel_workers': 0,
+    'state_parallel_exclude': ['pkg', 'pkgrepo'],
+    'state_lowstate_cache': False,
     'snapper_states': False,
     'snapper_states_config': 'root',
     'acceptance_wait_time': 10,
@@ -1613,6 +1747,7 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'gitfs_ref_types': ['branch', 'tag', 'sha'],
     'gitfs_refspecs': _DFLT_REFSPECS,
     'gitfs_disable_saltenv_mapping': False,
+    'gitfs_serve_from_odb': False,
     'hgfs_remotes': [],
     'hgfs_mountpoint': '',
     'hgfs_root': '',
@@ -1643,6 +1778,10 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'minionfs_whitelist': [],
     'minionfs_blacklist': [],
     'ext_pillar': [],
+    'ext_pillar_concurrency': 0,
+    'ext_pillar_timeout': 0,
+    'ext_pillar_timeouts': {},
+    'ext_pillar_fail_policy': 'closed',
     'pillar_version': 2,
     'pillar_opts': False,
     'pillar_safe_render_error': True,
@@ -1652,6 +1791,10 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'pillar_cache': False,
     'pillar_cache_ttl': 3600,
     'pillar_cache_backend': 'disk',
+    'pillar_cache_source_interval': 60,
+    'pillar_render_cache': False,
+    'pillar_render_cache_size': 1024,
+    'pillar_render_cache_ttl': 86400,
     'ping_on_rotate': False,
     'peer': {},
     'preserve_minion_cache': False,
@@ -1679,10 +1822,13 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'file_recv': False,
     'file_recv_max_size': 100,
     'file_buffer_size': 1048576,
+    'file_chunk_size': 1048576,
+    'file_batch_max_size': 1048576,
     'file_ignore_regex': [],
     'file_ignore_glob': [],
     'fileserver_backend': ['roots'],
     'fileserver_followsymlinks': True,
+    'fileserver_roots_index': False,
     'fileserver_ignoresymlinks': False,
     'fileserver_limit_traversal': False,
     'fileserver_verify_config': True,
@@ -1706,6 +1852,9 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'master_job_cache': 'local_cache',
     'job_cache_store_endtime': False,
     'minion_data_cache': True,
+    'minion_data_index': False,
+    'minion_data_index_refresh': 60,
+    'cache_flush_interval': 0,
     'enforce_mine_cache': False,
     'ipc_mode': _DFLT_IPC_MODE,
     'ipc_write_buffer': _DFLT_IPC_WBUFFER,
@@ -1717,6 +1866,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'tcp_master_pull_port': 4513,
     'tcp_master_publish_pull': 4514,
     'tcp_master_workers': 4515,
+    'tcp_master_publish_shards': 4516,
+    'tcp_publish_shards': 1,
     'log_file': os.path.join(salt.syspaths.LOGS_DIR, 'master'),
     'log_level': 'warning',
     'log_level_logfile': None,
@@ -1738,6 +1889,9 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'engines': [],
     'event_return': '',
     'event_return_queue': 0,
+    'event_return_flush_interval': 0,
+    'event_return_spool_max': 0,
+    'event_return_spool_retries': 10,
     'event_return_whitelist': [],
     'event_return_blacklist': [],
     'event_match_type': 'startswith',
@@ -1750,12 +1904,16 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'state_auto_order': True,
     'state_events': False,
     'state_aggregate': False,
+    'state_parallel_workers': 0,
+    'state_parallel_exclude': ['pkg', 'pkgrepo'],
     'search': '',
     'loop_interval': 60,
     'nodegroups': {},
     'ssh_list_nodegroups': {},
     'ssh_use_home_key': False,
     'cython_enable': False,
+    'loader_manifest': False,
+    'loader_virtual_cache': False,
     'enable_gpu_grains': False,
     # XXX: Remove 'key_logfile' support in 2014.1.0
     'key_logfile': os.path.join(salt.syspaths.LOGS_DIR, 'key'),
@@ -1831,6 +1989,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'memcache_max_items': 1024,
     'memcache_full_cleanup': False,
     'memcache_debug': False,
+    'cache_lru_max_bytes': 0,
+    'cache_lru_ttl': 60,
     'thin_extra_mods': '',
     'min_extra_mods': '',
     'ssl': None,
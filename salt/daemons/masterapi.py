@@ -435,6 +435,9 @@ class RemoteFuncs(object):
         '''
         fs_ = salt.fileserver.Fileserver(self.opts)
         self._serve_file = fs_.serve_file
+        self._file_chunks = fs_.file_chunks
+        self._serve_chunks = fs_.serve_chunks
+        self._serve_files = fs_.serve_files
         self._file_find = fs_._find_file
         self._file_hash = fs_.file_hash
         self._file_list = fs_.file_list
@@ -635,6 +638,8 @@ class RemoteFuncs(object):
                 if isinstance(data, dict):
                     data.update(load['data'])
                     load['data'] = data
+            # Not deferred: the next update of the mine, maybe handled by
+            # another worker, is merged into what is stored here
             self.cache.store(cbank, ckey, load['data'])
         return True
 
@@ -747,9 +752,9 @@ class RemoteFuncs(object):
                 pillar_override=load.get('pillar_override', {}))
         data = pillar.compile_pillar()
         if self.opts.get('minion_data_cache', False):
-            self.cache.store('minions/{0}'.format(load['id']),
-                             'data',
-                             {'grains': load['grains'], 'pillar': data})
+            mdata = {'grains': load['grains'], 'pillar': data}
+            self.cache.defer_store('minions/{0}'.format(load['id']), 'data', mdata)
+            self.ckminions.update_data_index(load['id'], mdata)
             if self.opts.get('minion_data_cache_events') is True:
                 self.event.fire_event({'comment': 'Minion data cache refresh'}, salt.utils.event.tagify(load['id'], 'refresh', 'minion'))
         return data
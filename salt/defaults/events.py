@@ -11,3 +11,4 @@ as this may result in circular imports.
 # Constants for events on the minion bus
 MINION_PILLAR_COMPLETE = '/salt/minion/minion_pillar_complete'
 MINION_MOD_COMPLETE = '/salt/minion/minion_mod_complete'
+MINION_GRAINS_CHANGED = '/salt/minion/minion_grains_changed'
@@ -7,6 +7,7 @@ from __future__ import absolute_import, print_function, unicode_literals
 # Import python libs
 import contextlib
 import errno
+import hashlib
 import logging
 import os
 import string
@@ -30,6 +31,7 @@ import salt.utils.files
 import salt.utils.gzip_util
 import salt.utils.hashutils
 import salt.utils.http
+import salt.utils.odict
 import salt.utils.path
 import salt.utils.platform
 import salt.utils.stringutils
@@ -198,24 +200,25 @@ class Client(object):
         Download a list of files stored on the master and put them in the
         minion file cache
         '''
-        ret = []
         if isinstance(paths, six.string_types):
             paths = paths.split(',')
-        for path in paths:
-            ret.append(self.cache_file(path, saltenv, cachedir=cachedir))
-        return ret
+        return self._cache_files(paths, saltenv, cachedir=cachedir)
+
+    def _cache_files(self, paths, saltenv='base', cachedir=None):
+        '''
+        Cache a list of files, returning the results in the same order
+        '''
+        return [self.cache_file(path, saltenv, cachedir=cachedir)
+                for path in paths]
 
     def cache_master(self, saltenv='base', cachedir=None):
         '''
         Download and cache all files on a master in a specified environment
         '''
-        ret = []
-        for path in self.file_list(saltenv):
-            ret.append(
-                self.cache_file(
-                    salt.utils.url.create(path), saltenv, cachedir=cachedir)
-            )
-        return ret
+        return self._cache_files(
+            [salt.utils.url.create(path) for path in self.file_list(saltenv)],
+            saltenv,
+            cachedir=cachedir)
 
     def cache_dir(self, path, saltenv='base', include_empty=False,
                   include_pat=None, exclude_pat=None, cachedir=None):
@@ -236,15 +239,16 @@ class Client(object):
         )
         # go through the list of all files finding ones that are in
         # the target directory and caching them
+        paths = []
         for fn_ in self.file_list(saltenv):
             fn_ = salt.utils.data.decode(fn_)
             if fn_.strip() and fn_.startswith(path):
                 if salt.utils.stringutils.check_include_exclude(
                         fn_, include_pat, exclude_pat):
-                    fn_ = self.cache_file(
-                        salt.utils.url.create(fn_), saltenv, cachedir=cachedir)
-                    if fn_:
-                        ret.append(fn_)
+                    paths.append(salt.utils.url.create(fn_))
+        for fn_ in self._cache_files(paths, saltenv, cachedir=cachedir):
+            if fn_:
+                ret.append(fn_)
 
         if include_empty:
             # Break up the path into a list containing the bottom-level
@@ -1125,6 +1129,11 @@ class RemoteClient(Client):
             gzip = int(gzip)
             load['gzip'] = gzip
 
+        if self.opts.get('file_chunk_transfer', False) and dest2check:
+            ret = self._get_file_chunked(load, dest or dest2check, makedirs)
+            if ret is not None:
+                return ret
+
         fn_ = None
         if dest:
             destdir = os.path.dirname(dest)
@@ -1232,6 +1241,210 @@ class RemoteClient(Client):
 
         return dest
 
+    def _cache_files(self, paths, saltenv='base', cachedir=None):
+        '''
+        Cache a list of files, requesting up to :conf_minion:`file_batch_size`
+        of them from the master at once. Files which cannot be transferred
+        this way, such as large files or non salt:// URLs, are cached one at
+        a time.
+        '''
+        batch = self.opts.get('file_batch_size', 0)
+        if not batch or batch <= 0:
+            return super(RemoteClient, self)._cache_files(
+                paths, saltenv, cachedir=cachedir)
+
+        ret = {}
+        # salt:// URLs to be requested, mapped to their relative path
+        queue = salt.utils.odict.OrderedDict()
+        for path in paths:
+            if path.startswith('salt://') \
+                    and not salt.utils.url.split_env(path)[1]:
+                queue.setdefault(path, self._check_proto(path))
+
+        hash_type = self.opts.get('hash_type', 'md5')
+        while queue:
+            urls = list(queue)[:batch]
+            dests = {}
+            hashes = {}
+            for url in urls:
+                rel_path = queue[url]
+                with self._cache_loc(
+                        rel_path, saltenv, cachedir=cachedir) as cache_dest:
+                    dests[rel_path] = (url, cache_dest)
+                if os.path.isfile(cache_dest):
+                    hashes[rel_path] = [
+                        hash_type,
+                        salt.utils.hashutils.get_hash(cache_dest, hash_type)]
+            load = {'paths': [queue[url] for url in urls],
+                    'hashes': hashes,
+                    'saltenv': saltenv,
+                    'cmd': '_serve_files'}
+            files = self.channel.send(load, raw=True)
+            if six.PY3:
+                files = decode_dict_keys_to_str(files)
+            try:
+                files = files['files']
+            except (TypeError, KeyError):
+                # The master does not support batched transfers
+                break
+            if not files:
+                break
+            for rel_path, hsum, hsum_type, data in files:
+                rel_path = salt.utils.stringutils.to_unicode(rel_path)
+                if rel_path not in dests:
+                    continue
+                url, dest = dests[rel_path]
+                queue.pop(url, None)
+                if hsum is None:
+                    log.debug(
+                        'Could not find file \'%s\' in saltenv \'%s\'',
+                        url, saltenv
+                    )
+                    ret[url] = False
+                    continue
+                hsum = salt.utils.stringutils.to_str(hsum)
+                hsum_type = salt.utils.stringutils.to_str(hsum_type)
+                if hashes.get(rel_path) == [hsum_type, hsum]:
+                    ret[url] = dest
+                    continue
+                if data is None:
+                    # Too large to be sent in a batch
+                    continue
+                if hashlib.new(hsum_type, data).hexdigest() != hsum:
+                    log.debug(
+                        'Hash mismatch for \'%s\' in batched transfer', url)
+                    continue
+                if os.path.isdir(dest):
+                    # A directory was formerly cached at this path
+                    salt.utils.files.rm_rf(dest)
+                with salt.utils.atomicfile.atomic_open(dest, 'wb+') as fp_:
+                    fp_.write(data)
+                ret[url] = dest
+
+        return [ret[path] if path in ret
+                else self.cache_file(path, saltenv, cachedir=cachedir)
+                for path in paths]
+
+    def _get_file_chunked(self, load, dest, makedirs=False):
+        '''
+        Fetch a file from the master in content addressed chunks, only
+        transferring the chunks which are not already present in the local
+        copy of the file at ``dest``. Several chunks are requested at once,
+        according to the :conf_minion:`file_chunk_batch` option.
+
+        Returns None if the file could not be transferred this way, in which
+        case the whole file should be transferred instead.
+        '''
+        manifest = self.channel.send(dict(load, cmd='_file_chunks'))
+        if not isinstance(manifest, dict) or not manifest.get('hash_type'):
+            return None
+        hash_type = salt.utils.stringutils.to_str(manifest['hash_type'])
+        chunk_size = manifest['chunk_size']
+        chunks = [salt.utils.stringutils.to_str(x) for x in manifest['chunks']]
+
+        destdir = os.path.dirname(dest)
+        if not os.path.isdir(destdir):
+            if not makedirs:
+                return False
+            try:
+                os.makedirs(destdir)
+            except OSError as exc:
+                if exc.errno != errno.EEXIST:  # ignore if it was there already
+                    raise
+        if os.path.isdir(dest):
+            # A directory was formerly cached at this path
+            salt.utils.files.rm_rf(dest)
+
+        # Chunks of the local copy, mapped to their offset and length
+        local = {}
+        if os.path.isfile(dest):
+            with salt.utils.files.fopen(dest, 'rb') as fp_:
+                offset = 0
+                while True:
+                    data = fp_.read(chunk_size)
+                    if not data:
+                        break
+                    local.setdefault(
+                        hashlib.new(hash_type, data).hexdigest(),
+                        (offset, len(data)))
+                    offset += len(data)
+
+        batch = max(1, self.opts.get('file_chunk_batch', 4))
+        # Chunks already written to the new file, mapped to their offset
+        # and length
+        written = {}
+        pending = []
+        fetched = [0]
+
+        def _fetch(out):
+            if not pending:
+                return
+            ret = self.channel.send(
+                dict(load, cmd='_serve_chunks', chunks=pending), raw=True)
+            if six.PY3:
+                ret = decode_dict_keys_to_str(ret)
+            try:
+                data_list = ret['data']
+            except (TypeError, KeyError):
+                data_list = []
+            if len(data_list) != len(pending):
+                raise MinionError('the master returned an incomplete batch')
+            for idx, data in zip(pending, data_list):
+                if ret.get('gzip'):
+                    data = salt.utils.gzip_util.uncompress(data)
+                if hashlib.new(hash_type, data).hexdigest() != chunks[idx]:
+                    raise MinionError('the file changed on the master')
+                written.setdefault(chunks[idx], (out.tell(), len(data)))
+                out.write(data)
+            fetched[0] += len(pending)
+            del pending[:]
+
+        try:
+            with salt.utils.atomicfile.atomic_open(dest, 'wb+') as out:
+                old = salt.utils.files.fopen(dest, 'rb') if local else None
+                try:
+                    for idx, hsum in enumerate(chunks):
+                        if hsum in written or hsum in local:
+                            _fetch(out)
+                            if hsum in written:
+                                src = out
+                                offset, length = written[hsum]
+                            else:
+                                src = old
+                                offset, length = local[hsum]
+                            src.seek(offset)
+                            data = src.read(length)
+                            out.seek(0, os.SEEK_END)
+                            written.setdefault(hsum, (out.tell(), length))
+                            out.write(data)
+                        else:
+                            pending.append(idx)
+                            if len(pending) >= batch:
+                                _fetch(out)
+                    _fetch(out)
+                finally:
+                    if old is not None:
+                        old.close()
+        except MinionError as exc:
+            log.warning(
+                'Chunked transfer of \'%s\' failed, falling back to a full '
+                'transfer: %s', load['path'], exc
+            )
+            return None
+
+        if salt.utils.hashutils.get_hash(dest, hash_type) != manifest['hsum']:
+            log.warning(
+                'Bad chunked download of file \'%s\', falling back to a full '
+                'transfer', load['path']
+            )
+            return None
+        log.info(
+            'Fetching file from saltenv \'%s\', ** done ** \'%s\' '
+            '(%d of %d chunks transferred)',
+            load['saltenv'], load['path'], fetched[0], len(chunks)
+        )
+        return dest
+
     def file_list(self, saltenv='base', prefix=''):
         '''
         List the files on the master
@@ -8,6 +8,7 @@ from __future__ import absolute_import, print_function, unicode_literals
 
 import errno
 import fnmatch
+import hashlib
 import logging
 import os
 import re
@@ -18,6 +19,8 @@ import time
 import salt.loader
 import salt.utils.data
 import salt.utils.files
+import salt.utils.gzip_util
+import salt.utils.odict
 import salt.utils.path
 import salt.utils.url
 import salt.utils.versions
@@ -346,9 +349,13 @@ class Fileserver(object):
     iterates over them to execute the desired function within the scope of the
     desired fileserver backend.
     '''
+    # Maximum number of chunk manifests kept in memory
+    chunk_manifests_size = 128
+
     def __init__(self, opts):
         self.opts = opts
         self.servers = salt.loader.fileserver(opts, opts['fileserver_backend'])
+        self._chunk_manifests = salt.utils.odict.OrderedDict()
 
     def backends(self, back=None):
         '''
@@ -650,6 +657,136 @@ class Fileserver(object):
             return self.servers[fstr](load, fnd)
         return ret
 
+    def _chunk_manifest(self, load):
+        '''
+        Find the file requested in ``load`` and return its path and its chunk
+        manifest, the hashes of the consecutive chunks of
+        :conf_master:`file_chunk_size` bytes the file is split into. Manifests
+        are kept in memory for as long as the mtime and size of the file do
+        not change.
+        '''
+        if 'env' in load:
+            # "env" is not supported; Use "saltenv".
+            load.pop('env')
+
+        if 'path' not in load or 'saltenv' not in load:
+            return None, None
+        if not isinstance(load['saltenv'], six.string_types):
+            load['saltenv'] = six.text_type(load['saltenv'])
+
+        fnd = self.find_file(salt.utils.stringutils.to_unicode(load['path']),
+                load['saltenv'])
+        if not fnd.get('back') or not fnd.get('path'):
+            return None, None
+        try:
+            stat = os.stat(fnd['path'])
+        except OSError:
+            return None, None
+        key = (fnd['path'], stat.st_mtime, stat.st_size)
+        manifest = self._chunk_manifests.pop(key, None)
+        if manifest is None:
+            chunk_size = self.opts.get('file_chunk_size', 1048576)
+            hash_type = self.opts.get('hash_type', 'md5')
+            hsum = hashlib.new(hash_type)
+            chunks = []
+            with salt.utils.files.fopen(fnd['path'], 'rb') as fp_:
+                while True:
+                    data = fp_.read(chunk_size)
+                    if not data:
+                        break
+                    hsum.update(data)
+                    chunks.append(hashlib.new(hash_type, data).hexdigest())
+            manifest = {'dest': fnd['rel'],
+                        'size': stat.st_size,
+                        'hash_type': hash_type,
+                        'hsum': hsum.hexdigest(),
+                        'chunk_size': chunk_size,
+                        'chunks': chunks}
+        self._chunk_manifests[key] = manifest
+        while len(self._chunk_manifests) > self.chunk_manifests_size:
+            self._chunk_manifests.popitem(last=False)
+        return fnd['path'], manifest
+
+    def file_chunks(self, load):
+        '''
+        Return the chunk manifest of a file, so that a client can fetch only
+        the chunks it does not already have
+        '''
+        return self._chunk_manifest(load)[1] or {}
+
+    def serve_chunks(self, load):
+        '''
+        Serve up a batch of chunks of a file, identified by their index in the
+        chunk manifest of the file
+        '''
+        ret = {'chunks': [],
+               'data': []}
+        path, manifest = self._chunk_manifest(load)
+        if path is None or not isinstance(load.get('chunks'), list):
+            return ret
+        gzip = load.get('gzip', None)
+        chunk_size = manifest['chunk_size']
+        with salt.utils.files.fopen(path, 'rb') as fp_:
+            for idx in load['chunks']:
+                if not isinstance(idx, six.integer_types) \
+                        or not 0 <= idx < len(manifest['chunks']):
+                    return {'chunks': [], 'data': []}
+                fp_.seek(idx * chunk_size)
+                data = fp_.read(chunk_size)
+                if gzip and data:
+                    data = salt.utils.gzip_util.compress(data, gzip)
+                ret['chunks'].append(manifest['chunks'][idx])
+                ret['data'].append(data)
+        if gzip:
+            ret['gzip'] = gzip
+        return ret
+
+    def serve_files(self, load):
+        '''
+        Serve up a batch of whole files. The hash of each file is returned,
+        along with its contents unless the client already has a copy with the
+        same hash or the file is larger than :conf_master:`file_batch_max_size`.
+        Files are processed in order until the contents returned reach
+        :conf_master:`file_batch_max_size`, the client is expected to request
+        the remaining ones again.
+        '''
+        ret = {'files': []}
+
+        if 'env' in load:
+            # "env" is not supported; Use "saltenv".
+            load.pop('env')
+
+        if not isinstance(load.get('paths'), list) or 'saltenv' not in load:
+            return ret
+        if not isinstance(load['saltenv'], six.string_types):
+            load['saltenv'] = six.text_type(load['saltenv'])
+
+        hashes = load.get('hashes') or {}
+        max_size = self.opts.get('file_batch_max_size', 1048576)
+        size = 0
+        for path in load['paths']:
+            if ret['files'] and size >= max_size:
+                break
+            path = salt.utils.stringutils.to_unicode(path)
+            fnd = self.find_file(path, load['saltenv'])
+            fstr = '{0}.file_hash'.format(fnd.get('back'))
+            hsum = None
+            if fnd.get('back') and fstr in self.servers:
+                hsum = self.servers[fstr](
+                    {'path': path, 'saltenv': load['saltenv']}, fnd)
+            if not hsum:
+                ret['files'].append([path, None, None, None])
+                continue
+            data = None
+            if list(hashes.get(path) or []) != [hsum['hash_type'], hsum['hsum']] \
+                    and os.path.isfile(fnd.get('path', '')) \
+                    and os.path.getsize(fnd['path']) <= max_size:
+                with salt.utils.files.fopen(fnd['path'], 'rb') as fp_:
+                    data = fp_.read()
+                size += len(data)
+            ret['files'].append([path, hsum['hsum'], hsum['hash_type'], data])
+        return ret
+
     def __file_hash_and_stat(self, load):
         '''
         Common code for hashing and stating files
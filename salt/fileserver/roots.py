@@ -21,6 +21,7 @@ from __future__ import absolute_import, print_function, unicode_literals
 import os
 import errno
 import logging
+import time
 
 # Import salt libs
 import salt.fileserver
@@ -36,6 +37,12 @@ from salt.ext import six
 
 log = logging.getLogger(__name__)
 
+# In-memory index of the file_roots, per saltenv, used when the
+# fileserver_roots_index option is enabled
+_INDEX = {}
+# In-memory cache of the file hashes, keyed on (hash_type, path)
+_HASHES = {}
+
 
 def find_file(path, saltenv='base', **kwargs):
     '''
@@ -236,6 +243,18 @@ def file_hash(load, fnd):
     # set the hash_type as it is determined by config-- so mechanism won't change that
     ret['hash_type'] = __opts__['hash_type']
 
+    hash_key = None
+    if __opts__.get('fileserver_roots_index', False):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return {}
+        hash_key = (__opts__['hash_type'], path)
+        cached = _HASHES.get(hash_key)
+        if cached is not None and cached[0] == (stat.st_mtime, stat.st_size):
+            ret['hsum'] = cached[1]
+            return ret
+
     # check if the hash is cached
     # cache file's contents should be "hash:mtime"
     cache_path = os.path.join(__opts__['cachedir'],
@@ -261,6 +280,8 @@ def file_hash(load, fnd):
                 if str(os.path.getmtime(path)) == mtime:
                     # check if mtime changed
                     ret['hsum'] = hsum
+                    if hash_key is not None:
+                        _HASHES[hash_key] = ((stat.st_mtime, stat.st_size), hsum)
                     return ret
         except (os.error, IOError):  # Can't use Python select() because we need Windows support
             log.debug("Fileserver encountered lock when reading cache file. Retrying.")
@@ -273,6 +294,8 @@ def file_hash(load, fnd):
 
     # if we don't have a cache entry-- lets make one
     ret['hsum'] = salt.utils.hashutils.get_hash(path, __opts__['hash_type'])
+    if hash_key is not None:
+        _HASHES[hash_key] = ((stat.st_mtime, stat.st_size), ret['hsum'])
     cache_dir = os.path.dirname(cache_path)
     # make cache directory if it doesn't exist
     if not os.path.exists(cache_dir):
@@ -292,6 +315,158 @@ def file_hash(load, fnd):
     return ret
 
 
+def _translate_sep(path):
+    '''
+    Translate path separators for Windows masterless minions
+    '''
+    return path.replace('\\', '/') if os.path.sep == '\\' else path
+
+
+def _link_dest(fs_root, abs_path, link_dest):
+    '''
+    Return the destination of the symlink ``abs_path``, or None if it points
+    outside of the fileserver root ``fs_root``
+    '''
+    log.trace('roots: %s symlink destination is %s', abs_path, link_dest)
+    if salt.utils.platform.is_windows() and link_dest.startswith('\\\\'):
+        # Symlink points to a network path. Since you can't join UNC and
+        # non-UNC paths, just assume the original path.
+        log.trace(
+            'roots: %s is a UNC path, using %s instead',
+            link_dest, abs_path
+        )
+        link_dest = abs_path
+    if link_dest.startswith('..'):
+        joined = os.path.join(abs_path, link_dest)
+    else:
+        joined = os.path.join(os.path.dirname(abs_path), link_dest)
+    rel_dest = _translate_sep(
+        os.path.relpath(
+            os.path.realpath(os.path.normpath(joined)),
+            fs_root
+        )
+    )
+    log.trace('roots: %s relative path is %s', abs_path, rel_dest)
+    if rel_dest.startswith('..'):
+        # Only count the link if it does not point outside of the root dir
+        # of the fileserver
+        return None
+    return link_dest
+
+
+def _index_dir(abs_dir, old, new):
+    '''
+    Add ``abs_dir`` and the directories below it to the ``new`` index,
+    reusing the entries of the ``old`` index for the directories whose mtime
+    did not change. Return True if any directory had to be listed again.
+    '''
+    followlinks = __opts__['fileserver_followsymlinks']
+    try:
+        mtime = os.stat(abs_dir).st_mtime
+    except OSError:
+        return abs_dir in old
+    entry = old.get(abs_dir)
+    changed = entry is None or entry['mtime'] != mtime
+    if changed:
+        try:
+            names = sorted(os.listdir(abs_dir))
+        except OSError:
+            return abs_dir in old
+        items = []
+        for name in names:
+            abs_path = os.path.join(abs_dir, name)
+            is_link = salt.utils.path.islink(abs_path)
+            is_dir = os.path.isdir(abs_path)
+            empty = None
+            if is_dir and is_link and not followlinks:
+                # Not indexed itself, so check whether it is empty now
+                try:
+                    empty = not os.listdir(abs_path)
+                except OSError:
+                    empty = False
+            items.append((
+                name,
+                is_dir,
+                is_link,
+                salt.utils.path.readlink(abs_path) if is_link else None,
+                empty,
+            ))
+        entry = {'mtime': mtime, 'items': items}
+    new[abs_dir] = entry
+    for name, is_dir, is_link, _, _ in entry['items']:
+        if is_dir and (followlinks or not is_link):
+            if _index_dir(os.path.join(abs_dir, name), old, new):
+                changed = True
+    return changed
+
+
+def _index_file_lists(saltenv, dirs):
+    '''
+    Build the file lists of a saltenv from its index
+    '''
+    ret = {
+        'files': set(),
+        'dirs': set(),
+        'empty_dirs': set(),
+        'links': {}
+    }
+    for fs_root in __opts__['file_roots'][saltenv]:
+        pending = [fs_root]
+        while pending:
+            parent_dir = pending.pop()
+            if parent_dir not in dirs:
+                continue
+            for name, is_dir, is_link, link_dest, empty in dirs[parent_dir]['items']:
+                abs_path = os.path.join(parent_dir, name)
+                if is_dir and empty is None:
+                    pending.append(abs_path)
+                    empty = abs_path in dirs and not dirs[abs_path]['items']
+                if is_link and __opts__['fileserver_ignoresymlinks']:
+                    continue
+                rel_path = _translate_sep(os.path.relpath(abs_path, fs_root))
+                if salt.fileserver.is_file_ignored(__opts__, rel_path):
+                    continue
+                ret['dirs' if is_dir else 'files'].add(rel_path)
+                if is_dir and empty:
+                    ret['empty_dirs'].add(rel_path)
+                if is_link:
+                    link_dest = _link_dest(fs_root, abs_path, link_dest)
+                    if link_dest is not None:
+                        ret['links'][rel_path] = link_dest
+
+    ret['files'] = sorted(ret['files'])
+    ret['dirs'] = sorted(ret['dirs'])
+    ret['empty_dirs'] = sorted(ret['empty_dirs'])
+    return ret
+
+
+def _indexed_file_lists(saltenv):
+    '''
+    Return the file lists of a saltenv from the in-memory index of the
+    file_roots. Within :conf_master:`fileserver_list_cache_time` the lists are
+    served straight from memory. After that, every indexed directory is
+    stat'ed and only the ones which changed are listed again.
+    '''
+    index = _INDEX.get(saltenv)
+    now = time.time()
+    if index is not None \
+            and now - index['time'] < __opts__.get('fileserver_list_cache_time', 20):
+        return index['lists']
+    old = index['dirs'] if index is not None else {}
+    new = {}
+    changed = index is None
+    for path in __opts__['file_roots'][saltenv]:
+        if _index_dir(path, old, new):
+            changed = True
+    if changed or len(new) != len(old):
+        log.debug('roots: Rebuilding the file lists of saltenv %s', saltenv)
+        lists = _index_file_lists(saltenv, new)
+    else:
+        lists = index['lists']
+    _INDEX[saltenv] = {'time': now, 'dirs': new, 'lists': lists}
+    return lists
+
+
 def _file_lists(load, form):
     '''
     Return a dict containing the file lists for files, dirs, emtydirs and symlinks
@@ -308,6 +483,9 @@ def _file_lists(load, form):
         else:
             return []
 
+    if __opts__.get('fileserver_roots_index', False):
+        return _indexed_file_lists(saltenv).get(form, [])
+
     list_cachedir = os.path.join(__opts__['cachedir'], 'file_lists', 'roots')
     if not os.path.isdir(list_cachedir):
         try:
@@ -335,12 +513,6 @@ def _file_lists(load, form):
             '''
             Add the files to the target set
             '''
-            def _translate_sep(path):
-                '''
-                Translate path separators for Windows masterless minions
-                '''
-                return path.replace('\\', '/') if os.path.sep == '\\' else path
-
             for item in items:
                 abs_path = os.path.join(parent_dir, item)
                 log.trace('roots: Processing %s', abs_path)
@@ -365,41 +537,9 @@ def _file_lists(load, form):
                     # WindowsError on Windows.
                     pass
                 if is_link:
-                    link_dest = salt.utils.path.readlink(abs_path)
-                    log.trace(
-                        'roots: %s symlink destination is %s',
-                        abs_path, link_dest
-                    )
-                    if salt.utils.platform.is_windows() \
-                            and link_dest.startswith('\\\\'):
-                        # Symlink points to a network path. Since you can't
-                        # join UNC and non-UNC paths, just assume the original
-                        # path.
-                        log.trace(
-                            'roots: %s is a UNC path, using %s instead',
-                            link_dest, abs_path
-                        )
-                        link_dest = abs_path
-                    if link_dest.startswith('..'):
-                        joined = os.path.join(abs_path, link_dest)
-                    else:
-                        joined = os.path.join(
-                            os.path.dirname(abs_path), link_dest
-                        )
-                    rel_dest = _translate_sep(
-                        os.path.relpath(
-                            os.path.realpath(os.path.normpath(joined)),
-                            fs_root
-                        )
-                    )
-                    log.trace(
-                        'roots: %s relative path is %s',
-                        abs_path, rel_dest
-                    )
-                    if not rel_dest.startswith('..'):
-                        # Only count the link if it does not point
-                        # outside of the root dir of the fileserver
-                        # (i.e. the "path" variable)
+                    link_dest = _link_dest(
+                        fs_root, abs_path, salt.utils.path.readlink(abs_path))
+                    if link_dest is not None:
                         ret['links'][rel_path] = link_dest
 
         for path in __opts__['file_roots'][saltenv]:
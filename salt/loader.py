@@ -9,10 +9,13 @@ plugin interfaces used by Salt.
 from __future__ import absolute_import, print_function, unicode_literals
 import os
 import re
+import copy
+import fnmatch
 import sys
 import time
 import logging
 import inspect
+import hashlib
 import tempfile
 import threading
 import functools
@@ -27,16 +30,19 @@ import salt.defaults.events
 import salt.defaults.exitcodes
 import salt.syspaths
 import salt.utils.args
+import salt.utils.atomicfile
 import salt.utils.context
 import salt.utils.data
 import salt.utils.dictupdate
 import salt.utils.event
 import salt.utils.files
+import salt.utils.json
 import salt.utils.lazy
 import salt.utils.odict
 import salt.utils.platform
 import salt.utils.versions
 import salt.utils.stringutils
+import salt.version
 from salt.exceptions import LoaderError
 from salt.template import check_render_pipe_str
 from salt.utils.decorators import Depends
@@ -729,6 +735,50 @@ def _load_cached_grains(opts, cfn):
         return None
 
 
+# Results of the grain functions with a TTL, keyed on (minion id, function)
+_GRAINS_FUNC_CACHE = {}
+# Duration in seconds of the last run of each grain function
+GRAINS_FUNC_TIMINGS = {}
+
+
+def _grain_ttl(opts, key, func):
+    '''
+    Return the TTL of the grain function ``key``. The :conf_minion:`grains_ttl`
+    option takes precedence over the ``__grains_ttl__`` dictionary that grains
+    modules can use to declare the TTL of their functions.
+    '''
+    ttls = opts.get('grains_ttl') or {}
+    if key in ttls:
+        return ttls[key]
+    for pattern in sorted(ttls):
+        if fnmatch.fnmatch(key, pattern):
+            return ttls[pattern]
+    declared = getattr(inspect.getmodule(func), '__grains_ttl__', None) or {}
+    return declared.get(key.split('.', 1)[-1], 0)
+
+
+def _call_grain_func(opts, key, func, **kwargs):
+    '''
+    Run the grain function ``key``, unless it has a TTL and its cached result
+    is still fresh, and record how long it took
+    '''
+    ttl = _grain_ttl(opts, key, func)
+    cache_key = (opts.get('id'), key)
+    now = time.time()
+    if ttl:
+        cached = _GRAINS_FUNC_CACHE.get(cache_key)
+        if cached is not None and now - cached[0] < ttl:
+            log.trace('Using cached %s grain', key)
+            return copy.deepcopy(cached[1])
+    ret = func(**kwargs)
+    duration = time.time() - now
+    GRAINS_FUNC_TIMINGS[key] = duration
+    log.profile('Grain function %s took %.3f seconds', key, duration)
+    if ttl:
+        _GRAINS_FUNC_CACHE[cache_key] = (now, copy.deepcopy(ret))
+    return ret
+
+
 def grains(opts, force_refresh=False, proxy=None):
     '''
     Return the functions for the dynamic grains and the values for the static
@@ -798,7 +848,7 @@ def grains(opts, force_refresh=False, proxy=None):
         if not key.startswith('core.'):
             continue
         log.trace('Loading %s grain', key)
-        ret = funcs[key]()
+        ret = _call_grain_func(opts, key, funcs[key])
         if not isinstance(ret, dict):
             continue
         if blist:
@@ -832,7 +882,7 @@ def grains(opts, force_refresh=False, proxy=None):
                 kwargs['proxy'] = proxy
             if 'grains' in parameters:
                 kwargs['grains'] = grains_data
-            ret = funcs[key](**kwargs)
+            ret = _call_grain_func(opts, key, funcs[key], **kwargs)
         except Exception:
             if salt.utils.platform.is_proxy():
                 log.info('The following CRITICAL message may not be an error; the proxy may not be completely established yet.')
@@ -1191,6 +1241,40 @@ class FilterDictWrapper(MutableMapping):
                 yield key.replace(self.suffix, '')
 
 
+# Grains left out of the fingerprint of the __virtual__ cache: they differ
+# between the processes of a host or change with its network configuration,
+# which __virtual__ functions do not look at
+VIRTUAL_CACHE_IGNORED_GRAINS = ('pid', 'ipv4', 'ipv6', 'ip_interfaces',
+                                'ip4_interfaces', 'ip6_interfaces',
+                                'fqdn_ip4', 'fqdn_ip6', 'dns')
+
+# Number of seconds after which the __virtual__ caches of a loader which were
+# neither read nor written are removed, leaving those of other fingerprints in
+# use alone
+VIRTUAL_CACHE_MAX_AGE = 7 * 86400
+
+
+def _mtime(path):
+    '''
+    Return the mtime of a path, or None if it cannot be read
+    '''
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _file_stat(path):
+    '''
+    Return the mtime and size of a path, or None if it cannot be read
+    '''
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime, stat.st_size]
+
+
 class LazyLoader(salt.utils.lazy.LazyDict):
     '''
     A pseduo-dictionary which has a set of keys which are the
@@ -1220,6 +1304,11 @@ class LazyLoader(salt.utils.lazy.LazyDict):
 
     mod_dict_class = salt.utils.odict.OrderedDict
 
+    # Per process cache of the loaded file mapping manifests
+    _manifests = {}
+    # Per process cache of the loaded __virtual__ caches
+    _virtual_caches = {}
+
     def __init__(self,
                  module_dirs,
                  opts=None,
@@ -1277,6 +1366,9 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         if virtual_funcs is None:
             virtual_funcs = []
         self.virtual_funcs = virtual_funcs
+        # (path, data) of the __virtual__ cache, loaded on first use
+        self._virtual_cache = None
+        self._virtual_cache_dirty = False
 
         self.disabled = set(
             self.opts.get(
@@ -1389,9 +1481,19 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         else:
             self.suffix_map[''] = ('', '', imp.PKG_DIRECTORY)
 
+        manifest = None
+        if self.opts.get('loader_manifest', False):
+            manifest = self._manifest_path()
+            file_mapping = self._load_manifest(manifest)
+            if file_mapping is not None:
+                self.file_mapping = file_mapping
+                return
+
         # create mapping of filename (without suffix) to (path, suffix)
         # The files are added in order of priority, so order *must* be retained.
         self.file_mapping = salt.utils.odict.OrderedDict()
+        # mtimes of every directory listed below, used to validate the manifest
+        dir_mtimes = salt.utils.odict.OrderedDict()
 
         opt_match = []
 
@@ -1406,6 +1508,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             return ''
 
         for mod_dir in self.module_dirs:
+            dir_mtimes[mod_dir] = _mtime(mod_dir)
             try:
                 # Make sure we have a sorted listdir in order to have
                 # expectable override results
@@ -1415,10 +1518,12 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             except OSError:
                 continue  # Next mod_dir
             if six.PY3:
+                pycache_dir = os.path.join(mod_dir, '__pycache__')
+                dir_mtimes[pycache_dir] = _mtime(pycache_dir)
                 try:
                     pycache_files = [
                         os.path.join('__pycache__', x) for x in
-                        sorted(os.listdir(os.path.join(mod_dir, '__pycache__')))
+                        sorted(os.listdir(pycache_dir))
                     ]
                 except OSError:
                     pass
@@ -1470,6 +1575,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # if its a directory, lets allow us to load that
                     if ext == '':
                         # is there something __init__?
+                        dir_mtimes[fpath] = _mtime(fpath)
                         subfiles = os.listdir(fpath)
                         for suffix in self.suffix_order:
                             if '' == suffix:
@@ -1519,6 +1625,95 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             f_noext = smod.split('.')[-1]
             self.file_mapping[f_noext] = (smod, '.o', 0)
 
+        if manifest is not None:
+            self._store_manifest(manifest, dir_mtimes)
+
+    def _manifest_path(self):
+        '''
+        Return the path of the file mapping manifest for this loader. The
+        name is derived from everything besides the directory contents which
+        influences the mapping, so that a change in any of them simply
+        selects a different manifest.
+        '''
+        key = [
+            salt.version.__version__,
+            list(sys.version_info[:2]),
+            list(self.module_dirs),
+            sorted(self.suffix_map),
+            self.suffix_order,
+            sorted(self.disabled),
+            list(self.static_modules),
+            list(self.opts.get('optimization_order', [0, 1, 2])),
+        ]
+        digest = hashlib.sha1(
+            salt.utils.stringutils.to_bytes(repr(key))
+        ).hexdigest()
+        return os.path.join(
+            self.opts.get('cachedir', ''),
+            'loader',
+            '{0}-{1}.p'.format(self.tag, digest)
+        )
+
+    def _load_manifest(self, path):
+        '''
+        Return the file mapping stored in the manifest at ``path``, or None if
+        the manifest is missing, corrupted or stale. A manifest is stale as
+        soon as the mtime of any of the directories listed to build it has
+        changed, which happens whenever a module is added, removed or renamed.
+        '''
+        manifest = LazyLoader._manifests.get(path)
+        if manifest is None:
+            try:
+                serial = salt.payload.Serial(self.opts)
+                with salt.utils.files.fopen(path, 'rb') as fp_:
+                    manifest = salt.utils.data.decode(serial.load(fp_))
+                dir_mtimes = manifest['dirs']
+                file_mapping = salt.utils.odict.OrderedDict(
+                    (name, (fpath, ext, opt_index))
+                    for name, fpath, ext, opt_index in manifest['files']
+                )
+            except (IOError, OSError):
+                return None
+            except Exception as exc:  # pylint: disable=broad-except
+                log.debug('Ignoring corrupted loader manifest %s: %s', path, exc)
+                return None
+            manifest = (dir_mtimes, file_mapping)
+        dir_mtimes, file_mapping = manifest
+        for dirname, mtime in six.iteritems(dir_mtimes):
+            if _mtime(dirname) != mtime:
+                log.trace('Loader manifest %s is stale (%s changed)', path, dirname)
+                LazyLoader._manifests.pop(path, None)
+                return None
+        LazyLoader._manifests[path] = manifest
+        return salt.utils.odict.OrderedDict(file_mapping)
+
+    def _store_manifest(self, path, dir_mtimes):
+        '''
+        Persist the current file mapping to the manifest at ``path``
+        '''
+        # A directory modified within the mtime granularity of the filesystem
+        # could change again without its mtime changing, so do not trust the
+        # listing until it has settled.
+        now = time.time()
+        if any(mtime is not None and now - mtime < 2
+               for mtime in six.itervalues(dir_mtimes)):
+            return
+        file_mapping = salt.utils.odict.OrderedDict(self.file_mapping)
+        LazyLoader._manifests[path] = (dir_mtimes, file_mapping)
+        manifest = {
+            'dirs': dir_mtimes,
+            'files': [[name] + list(entry)
+                      for name, entry in six.iteritems(file_mapping)],
+        }
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            serial = salt.payload.Serial(self.opts)
+            with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+                serial.dump(manifest, fp_)
+        except (IOError, OSError) as exc:
+            log.debug('Unable to write loader manifest %s: %s', path, exc)
+
     def clear(self):
         '''
         Clear the dict
@@ -1532,6 +1727,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             # we obviously want a re-do
             if hasattr(self, 'opts'):
                 self._refresh_file_mapping()
+            self._virtual_cache = None
             self.initial_load = False
 
     def __prep_mod_opts(self, opts):
@@ -1598,6 +1794,8 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         mod = None
         fpath, suffix = self.file_mapping[name][:2]
         self.loaded_files.add(name)
+        if self._virtual_unavailable(name):
+            return False
         fpath_dirname = os.path.dirname(fpath)
         try:
             sys.path.append(fpath_dirname)
@@ -1770,6 +1968,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # If a module has information about why it could not be loaded, record it
                     self.missing_modules[module_name] = virtual_err
                     self.missing_modules[name] = virtual_err
+                    self._cache_virtual(name, mod, virtual_err)
                     return False
         else:
             virtual_aliases = ()
@@ -1898,6 +2097,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                         self._refresh_file_mapping()
                         reloaded = True
                     continue
+            self._flush_virtual_cache()
 
         return ret
 
@@ -1912,12 +2112,157 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                 self._load_module(name)
 
             self.loaded = True
+            self._flush_virtual_cache()
 
     def reload_modules(self):
         with self._lock:
             self.loaded_files = set()
             self._load_all()
 
+    def _virtual_cache_path(self):
+        '''
+        Return the path of the __virtual__ cache of this loader. Its name is
+        a fingerprint of what __virtual__ functions commonly depend on: the
+        grains (but those in VIRTUAL_CACHE_IGNORED_GRAINS), the binaries and
+        libraries available in PATH and sys.path (through the mtimes of those
+        directories) and the configuration file.
+        '''
+        grains = self.opts.get('grains', {})
+        if isinstance(grains, ThreadLocalProxy):
+            grains = ThreadLocalProxy.unproxy(grains)
+        grains = dict((key, val) for key, val in six.iteritems(grains or {})
+                      if key not in VIRTUAL_CACHE_IGNORED_GRAINS)
+        search_path = os.environ.get('PATH', '').split(os.pathsep) + sys.path
+        key = salt.utils.json.dumps(
+            [
+                salt.version.__version__,
+                list(sys.version_info[:2]),
+                self.tag,
+                list(self.module_dirs),
+                list(self.virtual_funcs),
+                grains,
+                [[x, _mtime(x)] for x in search_path],
+                _mtime(self.opts.get('conf_file') or ''),
+            ],
+            sort_keys=True,
+            default=repr
+        )
+        digest = hashlib.sha1(salt.utils.stringutils.to_bytes(key)).hexdigest()
+        return os.path.join(
+            self.opts.get('cachedir', ''),
+            'loader',
+            'virtual-{0}-{1}.p'.format(self.tag, digest)
+        )
+
+    def _load_virtual_cache(self):
+        '''
+        Return the __virtual__ cache of this loader, a dict mapping module
+        names to their path, mtime, size and the reason they are unavailable
+        '''
+        if self._virtual_cache is None:
+            path = self._virtual_cache_path()
+            cache = LazyLoader._virtual_caches.get(path)
+            if cache is None:
+                try:
+                    serial = salt.payload.Serial(self.opts)
+                    with salt.utils.files.fopen(path, 'rb') as fp_:
+                        cache = salt.utils.data.decode(serial.load(fp_))
+                    if not isinstance(cache, dict):
+                        raise TypeError('not a dict')
+                    # Keep the cache from being pruned as unused
+                    os.utime(path, None)
+                except (IOError, OSError):
+                    cache = {}
+                except Exception as exc:  # pylint: disable=broad-except
+                    log.debug('Ignoring corrupted __virtual__ cache %s: %s', path, exc)
+                    cache = {}
+                LazyLoader._virtual_caches[path] = cache
+            self._virtual_cache = (path, cache)
+        return self._virtual_cache[1]
+
+    def _virtual_cacheable(self, name):
+        '''
+        Return the path and stat of the file of module ``name`` if its
+        __virtual__ outcome can be cached, otherwise None
+        '''
+        if not self.opts.get('loader_virtual_cache', False) \
+                or not self.virtual_enable:
+            return None
+        fpath, suffix = self.file_mapping[name][:2]
+        if suffix == '.o':
+            # Static modules are not files on disk
+            return None
+        stat = _file_stat(fpath)
+        if stat is None:
+            return None
+        return [fpath] + stat
+
+    def _virtual_unavailable(self, name):
+        '''
+        Return True if the __virtual__ cache knows the module ``name`` to be
+        unavailable on this host, so that it does not need to be imported
+        '''
+        current = self._virtual_cacheable(name)
+        if current is None:
+            return False
+        entry = self._load_virtual_cache().get(name)
+        if entry is None or entry[:3] != current:
+            return False
+        log.trace(
+            'Skipping %s.%s, its __virtual__ is cached as unavailable',
+            self.tag, name
+        )
+        self.missing_modules[name] = entry[3]
+        return True
+
+    def _cache_virtual(self, name, mod, reason):
+        '''
+        Record in the __virtual__ cache that module ``name`` is unavailable,
+        if the module sets ``__virtual_cacheable__`` to declare that its
+        __virtual__ only depends on what the cache fingerprint covers
+        '''
+        if getattr(mod, '__virtual_cacheable__', False) is not True:
+            return
+        current = self._virtual_cacheable(name)
+        if current is None:
+            return
+        if reason is not None:
+            reason = six.text_type(reason)
+        self._load_virtual_cache()[name] = current + [reason]
+        self._virtual_cache_dirty = True
+
+    def _flush_virtual_cache(self):
+        '''
+        Persist the __virtual__ cache if it changed, removing the caches of
+        this loader unused for VIRTUAL_CACHE_MAX_AGE
+        '''
+        if not self._virtual_cache_dirty:
+            return
+        self._virtual_cache_dirty = False
+        path, cache = self._virtual_cache
+        cache_dir = os.path.dirname(path)
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            serial = salt.payload.Serial(self.opts)
+            with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+                serial.dump(cache, fp_)
+        except (IOError, OSError) as exc:
+            log.debug('Unable to write __virtual__ cache %s: %s', path, exc)
+            return
+        prefix = 'virtual-{0}-'.format(self.tag)
+        expired = time.time() - VIRTUAL_CACHE_MAX_AGE
+        for fn_ in os.listdir(cache_dir):
+            stale = os.path.join(cache_dir, fn_)
+            if not fn_.startswith(prefix) or not fn_.endswith('.p') or stale == path:
+                continue
+            try:
+                if os.path.getmtime(stale) < expired:
+                    os.remove(stale)
+                    LazyLoader._virtual_caches.pop(stale, None)
+            except OSError:
+                pass
+
     def _apply_outputter(self, func, mod):
         '''
         Apply the __outputter__ variable to the functions
@@ -30,6 +30,7 @@ from salt.utils.zeromq import zmq, ZMQDefaultLoop, install_zmq, ZMQ_VERSION_INFO
 import tornado.gen  # pylint: disable=F0401
 
 # Import salt libs
+import salt.cache
 import salt.crypt
 import salt.cli.batch_async
 import salt.client
@@ -235,6 +236,7 @@ class Maintenance(salt.utils.process.SignalHandlingMultiprocessingProcess):
                 salt.daemons.masterapi.clean_expired_tokens(self.opts)
                 salt.daemons.masterapi.clean_pub_auth(self.opts)
             self.handle_git_pillar()
+            self.handle_pillar_render_cache()
             self.handle_schedule()
             self.handle_key_cache()
             self.handle_presence(old_present)
@@ -243,22 +245,27 @@ class Maintenance(salt.utils.process.SignalHandlingMultiprocessingProcess):
             last = now
             time.sleep(self.loop_interval)
 
+    def handle_pillar_render_cache(self):
+        '''
+        Remove the expired renders of the pillar render cache
+        '''
+        if self.opts.get('pillar_render_cache'):
+            salt.pillar.RenderCache(self.opts).expire()
+
     def handle_key_cache(self):
         '''
         Evaluate accepted keys and create a msgpack file
         which contains a list
         '''
         if self.opts['key_cache'] == 'sched':
-            keys = []
             #TODO DRY from CKMinions
             if self.opts['transport'] in ('zeromq', 'tcp'):
                 acc = 'minions'
             else:
                 acc = 'accepted'
 
-            for fn_ in os.listdir(os.path.join(self.opts['pki_dir'], acc)):
-                if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], acc, fn_)):
-                    keys.append(fn_)
+            keys = list(salt.utils.minions.get_pki_key_index(
+                os.path.join(self.opts['pki_dir'], acc)).keys)
             log.debug('Writing master key cache')
             # Write a temporary file securely
             if six.PY2:
@@ -1071,7 +1078,13 @@ class MWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
         end_time = time.time()
         if end_time - self.stat_clock > self.opts['master_stats_event_iter']:
             # Fire the event with the stats and wipe the tracker
-            self.aes_funcs.event.fire_event({'time': end_time - self.stat_clock, 'worker': self.name, 'stats': stats}, tagify(self.name, 'stats'))
+            self.aes_funcs.event.fire_event({'time': end_time - self.stat_clock,
+                                             'worker': self.name,
+                                             'stats': stats,
+                                             'cache': salt.cache.LRUCache.stats(),
+                                             'pillar_render': salt.pillar.RenderCache.stats(),
+                                             'ext_pillar': salt.pillar.Pillar.ext_pillar_stats()},
+                                            tagify(self.name, 'stats'))
             self.stats = collections.defaultdict(lambda: {'mean': 0, 'latency': 0, 'runs': 0})
             self.stat_clock = end_time
 
@@ -1180,6 +1193,9 @@ class AESFuncs(object):
         import salt.fileserver
         self.fs_ = salt.fileserver.Fileserver(self.opts)
         self._serve_file = self.fs_.serve_file
+        self._file_chunks = self.fs_.file_chunks
+        self._serve_chunks = self.fs_.serve_chunks
+        self._serve_files = self.fs_.serve_files
         self._file_find = self.fs_._find_file
         self._file_hash = self.fs_.file_hash
         self._file_hash_and_stat = self.fs_.file_hash_and_stat
@@ -1539,10 +1555,11 @@ class AESFuncs(object):
         data = pillar.compile_pillar()
         self.fs_.update_opts()
         if self.opts.get('minion_data_cache', False):
-            self.masterapi.cache.store('minions/{0}'.format(load['id']),
-                                       'data',
-                                       {'grains': load['grains'],
-                                        'pillar': data})
+            mdata = {'grains': load['grains'], 'pillar': data}
+            self.masterapi.cache.defer_store('minions/{0}'.format(load['id']),
+                                             'data',
+                                             mdata)
+            self.ckminions.update_data_index(load['id'], mdata)
             if self.opts.get('minion_data_cache_events') is True:
                 self.event.fire_event({'Minion data cache refresh': load['id']}, tagify(load['id'], 'refresh', 'minion'))
         return data
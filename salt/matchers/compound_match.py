@@ -4,7 +4,9 @@ This is the default compound matcher function.
 '''
 from __future__ import absolute_import, print_function, unicode_literals
 
+import collections
 import logging
+import threading
 from salt.ext import six  # pylint: disable=3rd-party-module-not-gated
 import salt.loader
 import salt.utils.minions  # pylint: disable=3rd-party-module-not-gated
@@ -18,32 +20,43 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
-
-def match(tgt, opts=None):
+# Compiled compound targets, least recently used first. Compiling is cheap
+# next to the matching, but a busy minion sees the same handful of targets
+# over and over.
+COMPILED_MAX = 256
+_COMPILED = collections.OrderedDict()
+_COMPILED_LOCK = threading.Lock()
+# The nodegroups targets are compiled against when none are configured
+_NO_NODEGROUPS = {}
+
+# The results of the individual target checks, only valid for the minion id,
+# grains and pillar they were made against. A grains or pillar refresh
+# replaces those dicts, which drops the results.
+_RESULTS = {'data': None, 'results': {}}
+
+REF = {'G': 'grain',
+       'P': 'grain_pcre',
+       'I': 'pillar',
+       'J': 'pillar_pcre',
+       'L': 'list',
+       'N': None,      # Nodegroups should already be expanded
+       'S': 'ipcidr',
+       'E': 'pcre'}
+if HAS_RANGE:
+    REF['R'] = 'range'
+
+# Engines whose result can change without the minion data changing
+VOLATILE_ENGINES = ('range',)
+
+
+def _compile(tgt, nodegroups):
     '''
-    Runs the compound target check
+    Tokenize a compound target. Returns the code object of the boolean
+    expression and the (engine, pattern, delimiter) checks it refers to, or
+    None if the target is invalid.
     '''
-    if not opts:
-        opts = __opts__
-    nodegroups = opts.get('nodegroups', {})
-    matchers = salt.loader.matchers(opts)
-
-    if not isinstance(tgt, six.string_types) and not isinstance(tgt, (list, tuple)):
-        log.error('Compound target received that is neither string, list nor tuple')
-        return False
-    log.debug('compound_match: %s ? %s', opts['id'], tgt)
-    ref = {'G': 'grain',
-           'P': 'grain_pcre',
-           'I': 'pillar',
-           'J': 'pillar_pcre',
-           'L': 'list',
-           'N': None,      # Nodegroups should already be expanded
-           'S': 'ipcidr',
-           'E': 'pcre'}
-    if HAS_RANGE:
-        ref['R'] = 'range'
-
-    results = []
+    tokens = []
+    checks = []
     opers = ['and', 'or', 'not', '(', ')']
 
     if isinstance(tgt, six.string_types):
@@ -58,20 +71,20 @@ def match(tgt, opts=None):
 
         # Easy check first
         if word in opers:
-            if results:
-                if results[-1] == '(' and word in ('and', 'or'):
+            if tokens:
+                if tokens[-1] == '(' and word in ('and', 'or'):
                     log.error('Invalid beginning operator after "(": %s', word)
-                    return False
+                    return None
                 if word == 'not':
-                    if not results[-1] in ('and', 'or', '('):
-                        results.append('and')
-                results.append(word)
+                    if not tokens[-1] in ('and', 'or', '('):
+                        tokens.append('and')
+                tokens.append(word)
             else:
                 # seq start with binary oper, fail
                 if word not in ['(', 'not']:
                     log.error('Invalid beginning operator: %s', word)
-                    return False
-                results.append(word)
+                    return None
+                tokens.append(word)
 
         elif target_info and target_info['engine']:
             if 'N' == target_info['engine']:
@@ -81,34 +94,105 @@ def match(tgt, opts=None):
                     words = decomposed + words
                 continue
 
-            engine = ref.get(target_info['engine'])
+            engine = REF.get(target_info['engine'])
             if not engine:
                 # If an unknown engine is called at any time, fail out
                 log.error(
                     'Unrecognized target engine "%s" for target '
                     'expression "%s"', target_info['engine'], word
                 )
-                return False
+                return None
 
-            engine_args = [target_info['pattern']]
-            engine_kwargs = {}
-            if target_info['delimiter']:
-                engine_kwargs['delimiter'] = target_info['delimiter']
-
-            results.append(
-                six.text_type(matchers['{0}_match.match'.format(engine)](*engine_args, **engine_kwargs))
-            )
+            tokens.append('_{0}'.format(len(checks)))
+            checks.append((engine, target_info['pattern'], target_info['delimiter']))
 
         else:
             # The match is not explicitly defined, evaluate it as a glob
-            results.append(six.text_type(matchers['glob_match.match'](word)))
+            tokens.append('_{0}'.format(len(checks)))
+            checks.append(('glob', word, None))
+
+    try:
+        code = compile(' '.join(tokens), '<compound target>', 'eval')
+    except Exception:
+        log.error('Invalid compound target: %s', tgt)
+        return None
+    return code, checks
+
+
+def _compiled(tgt, opts):
+    '''
+    Return the compiled target from the cache, compiling it if needed
+    '''
+    nodegroups = opts.get('nodegroups') or _NO_NODEGROUPS
+    key = tgt if isinstance(tgt, six.string_types) else tuple(tgt)
+    with _COMPILED_LOCK:
+        entry = _COMPILED.pop(key, None)
+        # The opts are often copied, so nodegroups equal to the ones the
+        # target was compiled against are as good as the same dict
+        if entry is not None and (entry[0] is nodegroups or entry[0] == nodegroups):
+            _COMPILED[key] = entry
+            return entry[1]
+    compiled = _compile(tgt, nodegroups)
+    with _COMPILED_LOCK:
+        _COMPILED[key] = (nodegroups, compiled)
+        while len(_COMPILED) > COMPILED_MAX:
+            _COMPILED.popitem(last=False)
+    return compiled
+
+
+def _results(opts):
+    '''
+    Return the check results cached for the minion data in opts
+    '''
+    data = _RESULTS['data']
+    if data is None \
+            or data[0] != opts['id'] \
+            or data[1] is not opts.get('grains') \
+            or data[2] is not opts.get('pillar'):
+        _RESULTS['data'] = (opts['id'], opts.get('grains'), opts.get('pillar'))
+        _RESULTS['results'] = {}
+    return _RESULTS['results']
+
+
+def match(tgt, opts=None):
+    '''
+    Runs the compound target check
+    '''
+    if not opts:
+        opts = __opts__
+
+    if not isinstance(tgt, six.string_types) and not isinstance(tgt, (list, tuple)):
+        log.error('Compound target received that is neither string, list nor tuple')
+        return False
+    log.debug('compound_match: %s ? %s', opts['id'], tgt)
+
+    compiled = _compiled(tgt, opts)
+    if compiled is None:
+        return False
+    code, checks = compiled
+
+    matchers = None
+    cached = _results(opts)
+    results = {}
+    for idx, check in enumerate(checks):
+        ret = cached.get(check)
+        if ret is None:
+            if matchers is None:
+                matchers = salt.loader.matchers(opts)
+            engine, pattern, delimiter = check
+            engine_kwargs = {}
+            if delimiter:
+                engine_kwargs['delimiter'] = delimiter
+            ret = bool(matchers['{0}_match.match'.format(engine)](pattern, **engine_kwargs))
+            if engine not in VOLATILE_ENGINES:
+                cached[check] = ret
+        results['_{0}'.format(idx)] = ret
 
-    results = ' '.join(results)
-    log.debug('compound_match %s ? "%s" => "%s"', opts['id'], tgt, results)
     try:
-        return eval(results)  # pylint: disable=W0123
+        ret = eval(code, {'__builtins__': {}}, results)  # pylint: disable=W0123
     except Exception:
         log.error(
             'Invalid compound target: %s for results: %s', tgt, results)
         return False
-    return False
+    log.debug('compound_match %s ? "%s" => "%s"', opts['id'], tgt, ret)
+    return ret
@@ -1392,7 +1392,10 @@ class Minion(MinionBase):
             proxy = None
 
         if grains is None:
+            old_grains = opts.get('grains')
             opts['grains'] = salt.loader.grains(opts, force_refresh, proxy=proxy)
+            if old_grains:
+                self._fire_grains_changed(opts, old_grains)
         self.utils = salt.loader.utils(opts, proxy=proxy)
 
         if opts.get('multimaster', False):
@@ -1448,6 +1451,21 @@ class Minion(MinionBase):
         finally:
             channel.close()
 
+    def _fire_grains_changed(self, opts, old_grains):
+        '''
+        Fire the differences between the old and the refreshed grains on the
+        minion event bus, if there are any
+        '''
+        changes = salt.utils.data.compare_dicts(old_grains, opts['grains'])
+        if not changes:
+            return
+        log.debug('Grains changed: %s', ', '.join(sorted(changes)))
+        try:
+            evt = salt.utils.event.get_event('minion', opts=opts, listen=False)
+            evt.fire_event(changes, tag=salt.defaults.events.MINION_GRAINS_CHANGED)
+        except Exception:  # pylint: disable=broad-except
+            log.debug('Unable to fire the grains changed event', exc_info=True)
+
     def _fire_master(self, data=None, tag=None, events=None, pretag=None, timeout=60, sync=True, timeout_handler=None):
         '''
         Fire an event on the master, or drop message if unable to send.
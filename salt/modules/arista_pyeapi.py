@@ -118,6 +118,7 @@ __proxyenabled__ = ['*']
 # Any Proxy Minion should be able to execute these
 
 __virtualname__ = 'pyeapi'
+__virtual_cacheable__ = True
 # The Execution Module will be identified as ``pyeapi``
 
 # -----------------------------------------------------------------------------
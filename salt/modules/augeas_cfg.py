@@ -50,6 +50,7 @@ log = logging.getLogger(__name__)
 
 # Define the module's virtual name
 __virtualname__ = 'augeas'
+__virtual_cacheable__ = True
 
 METHOD_MAP = {
     'set':    'set',
@@ -61,6 +61,7 @@ except ImportError:
     pass
 
 __virtualname__ = 'azurearm_compute'
+__virtual_cacheable__ = True
 
 log = logging.getLogger(__name__)
 
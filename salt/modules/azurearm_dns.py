@@ -62,6 +62,7 @@ except ImportError:
     pass
 
 __virtualname__ = 'azurearm_dns'
+__virtual_cacheable__ = True
 
 log = logging.getLogger(__name__)
 
@@ -68,6 +68,7 @@ except ImportError:
     pass
 
 __virtualname__ = 'azurearm_network'
+__virtual_cacheable__ = True
 
 log = logging.getLogger(__name__)
 
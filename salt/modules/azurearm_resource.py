@@ -62,6 +62,7 @@ except ImportError:
     pass
 
 __virtualname__ = 'azurearm_resource'
+__virtual_cacheable__ = True
 
 log = logging.getLogger(__name__)
 
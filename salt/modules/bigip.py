@@ -25,6 +25,7 @@ import salt.exceptions
 
 # Define the module's virtual name
 __virtualname__ = 'bigip'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
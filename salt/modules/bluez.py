@@ -34,6 +34,7 @@ __func_alias__ = {
 
 # Define the module's virtual name
 __virtualname__ = 'bluetooth'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
@@ -49,6 +49,7 @@ import salt.utils.files
 # ------------------------------------------------------------------------------
 
 __virtualname__ = 'capirca'
+__virtual_cacheable__ = True
 __proxyenabled__ = ['*']
 # allow any proxy type
 
@@ -100,6 +100,7 @@ SSL_VERSION = 'ssl_version'
 log = logging.getLogger(__name__)
 
 __virtualname__ = 'cassandra_cql'
+__virtual_cacheable__ = True
 
 HAS_DRIVER = False
 try:
@@ -28,6 +28,9 @@ except ImportError:
     HAS_CELERY = False
 
 
+__virtual_cacheable__ = True
+
+
 def __virtual__():
     '''
     Only load if celery libraries exist.
@@ -37,6 +37,7 @@ except ImportError:
 # ------------------------------------------------------------------------------
 
 __virtualname__ = 'ciscoconfparse'
+__virtual_cacheable__ = True
 
 # ------------------------------------------------------------------------------
 # property functions
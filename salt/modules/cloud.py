@@ -29,6 +29,9 @@ __func_alias__ = {
 }
 
 
+__virtual_cacheable__ = True
+
+
 def __virtual__():
     '''
     Only work on POSIX-like systems
@@ -49,6 +49,7 @@ except ImportError:
     HAS_LIBS = False
 
 __virtualname__ = 'etcd'
+__virtual_cacheable__ = True
 
 # Set up logging
 log = logging.getLogger(__name__)
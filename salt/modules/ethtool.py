@@ -69,6 +69,7 @@ for k, v in ethtool_ring_map.items():
 
 # Define the module's virtual name
 __virtualname__ = 'ethtool'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
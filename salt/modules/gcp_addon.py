@@ -35,6 +35,7 @@ except ImportError:
     HAS_LIB = False
 
 __virtualname__ = 'gcp'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
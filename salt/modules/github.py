@@ -54,6 +54,7 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 __virtualname__ = 'github'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
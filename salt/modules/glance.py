@@ -82,6 +82,9 @@ log = logging.getLogger(__name__)
 import pprint
 
 
+__virtual_cacheable__ = True
+
+
 def __virtual__():
     '''
     Only load this module if glance
@@ -36,6 +36,7 @@ except ImportError:
     pass
 
 __virtualname__ = 'glanceng'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
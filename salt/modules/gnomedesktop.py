@@ -27,6 +27,7 @@ log = logging.getLogger(__name__)
 
 # Define the module's virtual name
 __virtualname__ = 'gnome'
+__virtual_cacheable__ = True
 
 # Don't shadow built-in's.
 __func_alias__ = {
@@ -22,6 +22,7 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 __virtualname__ = 'haproxy'
+__virtual_cacheable__ = True
 
 # Default socket location
 DEFAULT_SOCKET_URL = '/var/run/haproxy.sock'
@@ -83,6 +83,9 @@ logging.basicConfig(level=logging.DEBUG)
 log = logging.getLogger(__name__)
 
 
+__virtual_cacheable__ = True
+
+
 def __virtual__():
     '''
     Only load this module if heat
@@ -46,6 +46,7 @@ log = logging.getLogger(__name__)
 
 # name used to refer to this module in __salt__
 __virtualname__ = 'influxdb'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
@@ -38,6 +38,7 @@ log = logging.getLogger(__name__)
 
 # Define the module's virtual name
 __virtualname__ = 'influxdb08'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
@@ -38,6 +38,7 @@ except ImportError:
     HAS_JIRA = False
 
 __virtualname__ = 'jira'
+__virtual_cacheable__ = True
 __proxyenabled__ = ['*']
 
 JIRA = None
@@ -34,6 +34,9 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 
+__virtual_cacheable__ = True
+
+
 def __virtual__():
     '''
     Only load if jsonnet lib is present
@@ -78,6 +78,9 @@ _TENANTS = 'tenants'
 log = logging.getLogger(__name__)
 
 
+__virtual_cacheable__ = True
+
+
 def __virtual__():
     '''
     Only load this module if keystone
@@ -37,6 +37,7 @@ except ImportError:
     pass
 
 __virtualname__ = 'keystoneng'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
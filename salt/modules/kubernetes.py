@@ -87,6 +87,7 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 __virtualname__ = 'kubernetes'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
@@ -62,6 +62,7 @@ log = logging.getLogger(__name__)
 
 # Define the module's virtual name
 __virtualname__ = 'ldap'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
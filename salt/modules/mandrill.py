@@ -34,6 +34,7 @@ except ImportError:
     HAS_REQUESTS = False
 
 __virtualname__ = 'mandrill'
+__virtual_cacheable__ = True
 
 log = logging.getLogger(__file__)
 
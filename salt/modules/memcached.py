@@ -36,6 +36,7 @@ __func_alias__ = {
 }
 
 __virtualname__ = 'memcached'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
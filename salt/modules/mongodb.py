@@ -36,6 +36,9 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 
+__virtual_cacheable__ = True
+
+
 def __virtual__():
     '''
     Only load this module if pymongo is installed
@@ -46,6 +46,9 @@ _DEFAULTS = {
 }
 
 
+__virtual_cacheable__ = True
+
+
 def __virtual__():
     '''
     Only load this module if all imports succeeded bin exists
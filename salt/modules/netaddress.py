@@ -13,6 +13,7 @@ from __future__ import absolute_import, print_function, unicode_literals
 from salt.ext import six
 
 __virtualname__ = 'netaddress'
+__virtual_cacheable__ = True
 
 # Import third party libs
 try:
@@ -48,6 +48,9 @@ __func_alias__ = {
 }
 
 
+__virtual_cacheable__ = True
+
+
 def __virtual__():
     '''
     pynetbox must be installed.
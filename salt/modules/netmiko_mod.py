@@ -212,6 +212,7 @@ __proxyenabled__ = ['*']
 # Any Proxy Minion should be able to execute these (not only netmiko)
 
 __virtualname__ = 'netmiko'
+__virtual_cacheable__ = True
 # The Execution Module will be identified as ``netmiko``
 
 # -----------------------------------------------------------------------------
@@ -105,6 +105,7 @@ __func_alias__ = {
 
 # Define the module's virtual name
 __virtualname__ = 'nova'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
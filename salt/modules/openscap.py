@@ -39,6 +39,9 @@ _XCCDF_MAP = {
 }
 
 
+__virtual_cacheable__ = True
+
+
 def __virtual__():
     return HAS_ARGPARSE, 'argparse module is required.'
 
@@ -74,6 +74,7 @@ VERSION = '1.0.0'
 USER_AGENT_BASE = 'Salt'
 
 __virtualname__ = 'purefa'
+__virtual_cacheable__ = True
 
 # Default symbols to use for passwords. Avoids visually confusing characters.
 # ~6 bits per symbol
@@ -71,6 +71,7 @@ except ImportError:
 __docformat__ = 'restructuredtext en'
 
 __virtualname__ = 'purefb'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
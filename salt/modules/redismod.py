@@ -30,6 +30,7 @@ except ImportError:
     HAS_REDIS = False
 
 __virtualname__ = 'redis'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
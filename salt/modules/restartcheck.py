@@ -83,6 +83,9 @@ LIST_DIRS = [
 ]
 
 
+__virtual_cacheable__ = True
+
+
 def __virtual__():
     '''
     Only run this module if the psutil python module is installed (package python-psutil).
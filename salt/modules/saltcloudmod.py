@@ -18,6 +18,7 @@ except ImportError:
 
 # Define the module's virtual name
 __virtualname__ = 'saltcloud'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
@@ -25,6 +25,7 @@ except ImportError:
 
 __proxyenabled__ = ['*']
 __virtualname__ = 'scp'
+__virtual_cacheable__ = True
 
 log = logging.getLogger(__name__)
 
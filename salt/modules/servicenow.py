@@ -36,6 +36,7 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 __virtualname__ = 'servicenow'
+__virtual_cacheable__ = True
 
 SERVICE_NAME = 'servicenow'
 
@@ -63,6 +63,7 @@ except ImportError:
 
 
 __virtualname__ = 'smtp'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
@@ -42,6 +42,7 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 __virtualname__ = 'splunk'
+__virtual_cacheable__ = True
 
 SERVICE_NAME = "splunk"
 
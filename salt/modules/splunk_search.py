@@ -47,6 +47,7 @@ __func_alias__ = {
 }
 
 __virtualname__ = 'splunk_search'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
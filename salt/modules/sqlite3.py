@@ -12,6 +12,9 @@ except ImportError:
     HAS_SQLITE3 = False
 
 
+__virtual_cacheable__ = True
+
+
 # pylint: disable=C0103
 def __virtual__():
     if not HAS_SQLITE3:
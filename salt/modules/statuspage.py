@@ -39,6 +39,7 @@ from salt.ext import six
 # ----------------------------------------------------------------------------------------------------------------------
 
 __virtualname__ = 'statuspage'
+__virtual_cacheable__ = True
 
 log = logging.getLogger(__file__)
 
@@ -37,6 +37,7 @@ except ImportError:
     HAS_DOCKER = False
 
 __virtualname__ = 'swarm'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
@@ -27,6 +27,7 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 __virtualname__ = 'telegram'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
@@ -45,6 +45,7 @@ except ImportError:
     HAS_REQUESTS = False
 
 __virtualname__ = 'telemetry'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
@@ -44,6 +44,7 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 __virtualname__ = 'textfsm'
+__virtual_cacheable__ = True
 __proxyenabled__ = ['*']
 
 
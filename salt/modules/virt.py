@@ -128,6 +128,9 @@ VIRT_STATE_NAME_MAP = {0: 'running',
                        6: 'crashed'}
 
 
+__virtual_cacheable__ = True
+
+
 def __virtual__():
     if not HAS_LIBVIRT:
         return (False, 'Unable to locate or import python libvirt library.')
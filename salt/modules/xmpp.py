@@ -54,6 +54,7 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 __virtualname__ = 'xmpp'
+__virtual_cacheable__ = True
 
 MUC_DEPRECATED = "Use of send mask waiters is deprecated."
 
@@ -78,6 +78,7 @@ except ImportError:
 import salt.utils.stringutils
 
 __virtualname__ = 'zookeeper'
+__virtual_cacheable__ = True
 
 
 def __virtual__():
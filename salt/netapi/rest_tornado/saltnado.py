@@ -290,6 +290,8 @@ class EventListener(object):
 
         # tag -> list of futures
         self.tag_map = defaultdict(list)
+        # index of the (tag, matcher) keys of tag_map
+        self.tag_index = salt.utils.event.SubscriptionIndex()
 
         # request_obj -> list of (tag, future)
         self.request_map = defaultdict(list)
@@ -327,6 +329,17 @@ class EventListener(object):
             raise TypeError('mtag or tag can not be None')
         return mtag == tag
 
+    @classmethod
+    def _index_type(cls, matcher):
+        '''
+        Return how the tag index can look up tags matched with the matcher
+        '''
+        if matcher is cls.prefix_matcher:
+            return salt.utils.event.SubscriptionIndex.PREFIX
+        if matcher is cls.exact_matcher:
+            return salt.utils.event.SubscriptionIndex.EXACT
+        return None
+
     def get_event(self,
                   request,
                   tag='',
@@ -350,6 +363,8 @@ class EventListener(object):
                 tornado.ioloop.IOLoop.current().add_callback(callback, future)
             future.add_done_callback(handle_future)
         # add this tag and future to the callbacks
+        if (tag, matcher) not in self.tag_map:
+            self.tag_index.add((tag, matcher), tag, matcher, self._index_type(matcher))
         self.tag_map[(tag, matcher)].append(future)
         self.request_map[request].append((tag, matcher, future))
 
@@ -370,6 +385,7 @@ class EventListener(object):
             self.tag_map[(tag, matcher)].remove(future)
         if not self.tag_map[(tag, matcher)]:
             del self.tag_map[(tag, matcher)]
+            self.tag_index.remove((tag, matcher), tag, self._index_type(matcher))
 
     def _handle_event_socket_recv(self, raw):
         '''
@@ -378,16 +394,8 @@ class EventListener(object):
         mtag, data = self.event.unpack(raw, self.event.serial)
 
         # see if we have any futures that need this info:
-        for (tag, matcher), futures in six.iteritems(self.tag_map):
-            try:
-                is_matched = matcher(mtag, tag)
-            except Exception:
-                log.error('Failed to run a matcher.', exc_info=True)
-                is_matched = False
-
-            if not is_matched:
-                continue
-
+        for tag, matcher in self.tag_index.match(mtag):
+            futures = self.tag_map[(tag, matcher)]
             for future in futures:
                 if future.done():
                     continue
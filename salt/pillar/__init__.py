@@ -12,10 +12,13 @@ import collections
 import logging
 import tornado.gen
 import sys
+import threading
+import time
 import traceback
 import inspect
 
 # Import salt libs
+import salt.cache
 import salt.loader
 import salt.fileclient
 import salt.minion
@@ -26,9 +29,15 @@ import salt.utils.cache
 import salt.utils.crypt
 import salt.utils.data
 import salt.utils.dictupdate
+import salt.utils.files
+import salt.utils.hashutils
+import salt.utils.json
+import salt.utils.path
+import salt.utils.stringutils
+import salt.utils.templates
 import salt.utils.url
 from salt.exceptions import SaltClientError
-from salt.template import compile_template
+from salt.template import compile_template, template_shebang
 from salt.utils.odict import OrderedDict
 from salt.version import __version__
 # Even though dictupdate is imported, invoking salt.utils.dictupdate.merge here
@@ -41,6 +50,10 @@ from salt.ext import six
 
 log = logging.getLogger(__name__)
 
+# Renderers whose output only depends on the rendered file and the template
+# context entries tracked by salt.utils.jinja.context_dependencies
+CACHEABLE_RENDERERS = ('jinja', 'yaml', 'yamlex', 'json', 'gpg')
+
 
 def get_pillar(opts, grains, minion_id, saltenv=None, ext=None, funcs=None,
                pillar_override=None, pillarenv=None, extra_minion_data=None):
@@ -60,7 +73,8 @@ def get_pillar(opts, grains, minion_id, saltenv=None, ext=None, funcs=None,
         log.info('Compiling pillar from cache')
         log.debug('get_pillar using pillar cache with ext: %s', ext)
         return PillarCache(opts, grains, minion_id, saltenv, ext=ext, functions=funcs,
-                pillar_override=pillar_override, pillarenv=pillarenv)
+                pillar_override=pillar_override, pillarenv=pillarenv,
+                extra_minion_data=extra_minion_data)
     return ptype(opts, grains, minion_id, saltenv, ext, functions=funcs,
                  pillar_override=pillar_override, pillarenv=pillarenv,
                  extra_minion_data=extra_minion_data)
@@ -271,16 +285,31 @@ class PillarCache(object):
     '''
     Return a cached pillar if it exists, otherwise cache it.
 
-    Pillar caches are structed in two diminensions: minion_id with a dict of
-    saltenvs. Each saltenv contains a pillar dict
+    Pillar caches are structured in two dimensions: minion_id with a dict of
+    pillarenvs. Each pillarenv holds the compiled pillar along with the
+    fingerprint of what it was compiled from: the grains, pillar_override and
+    extra minion data of the minion and the revisions of the pillar sources
+    (the files in the pillar_roots and the refs of the git_pillar repos). A
+    cached pillar is only served while the fingerprint is the same.
 
     Example data structure:
 
     ```
     {'minion_1':
-        {'base': {'pilar_key_1' 'pillar_val_1'}
+        {'base': {'fingerprint': '<sha256>',
+                  'time': <epoch>,
+                  'pillar': {'pilar_key_1' 'pillar_val_1'}}}
     }
+    ```
+
+    With the ``cache`` backend, the pillars of a minion are stored in the
+    ``pillar/<minion_id>`` bank of the master cache, one key per pillarenv, so
+    that they are shared by every master worker and by the masters using the
+    same cache driver.
     '''
+    # (<time>, <revisions>) of the last revision scan
+    _revisions = (0, None)
+
     # TODO ABC?
     def __init__(self, opts, grains, minion_id, saltenv, ext=None, functions=None,
                  pillar_override=None, pillarenv=None, extra_minion_data=None):
@@ -295,6 +324,7 @@ class PillarCache(object):
         self.functions = functions
         self.pillar_override = pillar_override
         self.pillarenv = pillarenv
+        self.extra_minion_data = extra_minion_data
 
         if saltenv is None:
             self.saltenv = 'base'
@@ -302,10 +332,13 @@ class PillarCache(object):
             self.saltenv = saltenv
 
         # Determine caching backend
-        self.cache = salt.utils.cache.CacheFactory.factory(
-                self.opts['pillar_cache_backend'],
-                self.opts['pillar_cache_ttl'],
-                minion_cache_path=self._minion_cache_path(minion_id))
+        if self.opts['pillar_cache_backend'] == 'cache':
+            self.cache = salt.cache.factory(self.opts)
+        else:
+            self.cache = salt.utils.cache.CacheFactory.factory(
+                    self.opts['pillar_cache_backend'],
+                    self.opts['pillar_cache_ttl'],
+                    minion_cache_path=self._minion_cache_path(minion_id))
 
     def _minion_cache_path(self, minion_id):
         '''
@@ -315,6 +348,117 @@ class PillarCache(object):
         '''
         return os.path.join(self.opts['cachedir'], 'pillar_cache', minion_id)
 
+    @classmethod
+    def source_revisions(cls, opts):
+        '''
+        Return a hash of the modification times of the files in the
+        pillar_roots and of the refs of the git_pillar repos. The hash is
+        reused for ``pillar_cache_source_interval`` seconds.
+        '''
+        now = time.time()
+        if now - cls._revisions[0] < opts.get('pillar_cache_source_interval', 60):
+            return cls._revisions[1]
+        revisions = []
+        for saltenv in sorted(opts.get('pillar_roots', {})):
+            for root in opts['pillar_roots'][saltenv]:
+                for dirpath, dirnames, filenames in salt.utils.path.os_walk(root):
+                    dirnames.sort()
+                    for name in sorted(filenames):
+                        path = os.path.join(dirpath, name)
+                        try:
+                            stat = os.stat(path)
+                        except OSError:
+                            continue
+                        revisions.append((path, stat.st_mtime, stat.st_size))
+        git_root = os.path.join(opts['cachedir'], 'git_pillar')
+        if os.path.isdir(git_root):
+            for repo in sorted(os.listdir(git_root)):
+                git_dir = os.path.join(git_root, repo, '.git')
+                refs = [os.path.join(git_dir, 'HEAD'), os.path.join(git_dir, 'packed-refs')]
+                for dirpath, dirnames, filenames in salt.utils.path.os_walk(os.path.join(git_dir, 'refs')):
+                    dirnames.sort()
+                    refs.extend(os.path.join(dirpath, name) for name in sorted(filenames))
+                for ref in refs:
+                    try:
+                        with salt.utils.files.fopen(ref, 'rb') as fp_:
+                            revisions.append((ref, fp_.read()))
+                    except (IOError, OSError):
+                        continue
+        revisions = salt.utils.hashutils.sha256_digest(repr(revisions))
+        cls._revisions = (now, revisions)
+        return revisions
+
+    def fingerprint(self):
+        '''
+        Return the fingerprint of what the pillar of the minion is compiled
+        from
+        '''
+        return salt.utils.hashutils.sha256_digest(salt.utils.json.dumps(
+            [self.grains, self.pillar_override, self.extra_minion_data,
+             self.ext, self.source_revisions(self.opts)],
+            sort_keys=True,
+            default=repr))
+
+    def _fetch(self):
+        '''
+        Return the cache entry of the minion and pillarenv, an empty dict if
+        there is none
+        '''
+        if self.opts['pillar_cache_backend'] == 'cache':
+            entry = self.cache.fetch('pillar/{0}'.format(self.minion_id),
+                                     six.text_type(self.pillarenv))
+        elif self.minion_id in self.cache:  # Keyed by minion_id
+            entry = (self.cache[self.minion_id] or {}).get(self.pillarenv)
+        else:
+            entry = None
+        return entry if isinstance(entry, dict) else {}
+
+    def _store(self, entry):
+        '''
+        Store the cache entry of the minion and pillarenv
+        '''
+        if self.opts['pillar_cache_backend'] == 'cache':
+            self.cache.store('pillar/{0}'.format(self.minion_id),
+                             six.text_type(self.pillarenv),
+                             entry)
+            return
+        entries = (self.cache[self.minion_id] if self.minion_id in self.cache else None) or {}
+        entries[self.pillarenv] = entry
+        self.cache[self.minion_id] = entries
+        self.cache.store()
+
+    @classmethod
+    def clear(cls, opts, minion_id, pillarenv=None):
+        '''
+        Remove the cached pillars of the minion, only the one of the pillarenv
+        if one is passed. Return True if one was removed.
+        '''
+        if opts['pillar_cache_backend'] == 'cache':
+            cache = salt.cache.factory(opts)
+            bank = 'pillar/{0}'.format(minion_id)
+            if pillarenv is None:
+                if not cache.list(bank):
+                    return False
+                cache.flush(bank)
+                return True
+            if not cache.contains(bank, pillarenv):
+                return False
+            cache.flush(bank, pillarenv)
+            return True
+        path = os.path.join(opts['cachedir'], 'pillar_cache', minion_id)
+        if not os.path.isfile(path):
+            return False
+        if pillarenv is None:
+            os.remove(path)
+            return True
+        cache = salt.utils.cache.CacheDisk(opts['pillar_cache_ttl'], path)
+        entries = (cache[minion_id] if minion_id in cache else None) or {}
+        if pillarenv not in entries:
+            return False
+        entries.pop(pillarenv)
+        cache[minion_id] = entries
+        return True
+
     def fetch_pillar(self):
         '''
         In the event of a cache miss, we need to incur the overhead of caching
@@ -327,7 +471,9 @@ class PillarCache(object):
                               self.saltenv,
                               ext=self.ext,
                               functions=self.functions,
-                              pillarenv=self.pillarenv)
+                              pillar_override=self.pillar_override,
+                              pillarenv=self.pillarenv,
+                              extra_minion_data=self.extra_minion_data)
         return fresh_pillar.compile_pillar()
 
     def compile_pillar(self, *args, **kwargs):  # Will likely just be pillar_dirs
@@ -339,45 +485,210 @@ class PillarCache(object):
         :return:
         '''
         log.debug('Scanning pillar cache for information about minion %s and pillarenv %s', self.minion_id, self.pillarenv)
-        log.debug('Scanning cache for minion %s: %s', self.minion_id, self.cache[self.minion_id] or '*empty*')
 
         # Check the cache!
-        if self.minion_id in self.cache:  # Keyed by minion_id
-            # TODO Compare grains, etc?
-            if self.pillarenv in self.cache[self.minion_id]:
-                # We have a cache hit! Send it back.
-                log.debug('Pillar cache hit for minion %s and pillarenv %s', self.minion_id, self.pillarenv)
-                pillar_data = self.cache[self.minion_id][self.pillarenv]
-            else:
-                # We found the minion but not the env. Store it.
-                pillar_data = self.fetch_pillar()
-                self.cache[self.minion_id][self.pillarenv] = pillar_data
-                self.cache.store()
-                log.debug('Pillar cache miss for pillarenv %s for minion %s', self.pillarenv, self.minion_id)
+        fingerprint = self.fingerprint()
+        entry = self._fetch()
+        ttl = self.opts['pillar_cache_ttl']
+        if entry.get('fingerprint') == fingerprint \
+                and (not ttl or time.time() - entry.get('time', 0) <= ttl):
+            # We have a cache hit! Send it back.
+            log.debug('Pillar cache hit for minion %s and pillarenv %s', self.minion_id, self.pillarenv)
+            pillar_data = entry['pillar']
         else:
-            # We haven't seen this minion yet in the cache. Store it.
+            # Either we haven't seen this minion and pillarenv yet or what
+            # the pillar is compiled from changed. Store it.
             pillar_data = self.fetch_pillar()
-            self.cache[self.minion_id] = {self.pillarenv: pillar_data}
-            log.debug('Pillar cache has been added for minion %s', self.minion_id)
-            log.debug('Current pillar cache: %s', self.cache[self.minion_id])
-
-        # we dont want the pillar_override baked into the cached fetch_pillar from above
-        if self.pillar_override:
-            pillar_data = merge(
-                pillar_data,
-                self.pillar_override,
-                self.opts.get('pillar_source_merging_strategy', 'smart'),
-                self.opts.get('renderer', 'yaml'),
-                self.opts.get('pillar_merge_lists', False))
-            pillar_data.update(self.pillar_override)
+            self._store({'fingerprint': fingerprint,
+                         'time': time.time(),
+                         'pillar': pillar_data})
+            log.debug('Pillar cache miss for pillarenv %s for minion %s', self.pillarenv, self.minion_id)
 
+        # The pillar_override is part of the fingerprint, so the cached
+        # pillar already has it merged in
         return pillar_data
 
 
+class RenderCache(object):
+    '''
+    Cache of the data rendered from pillar SLS files, shared by the pillar
+    compilations of every minion.
+
+    Renders are grouped under a dependency key, hashing the environment, name,
+    contents and include defaults of the SLS file. Each group holds the lists
+    of grains, pillar and opts keys and included templates the renders read,
+    and the renders themselves are stored under the hash of the values these
+    had. A minion reuses a render when the values it has for one of the lists
+    are the same.
+
+    Entries are kept in memory and in the ``pillar_render`` bank of the master
+    cache, so that the other worker processes can reuse them too. The time
+    of an entry of the bank is refreshed when it is used, at most every tenth
+    of ``pillar_render_cache_ttl``, and the Maintenance process of the master
+    removes the entries which were not used for ``pillar_render_cache_ttl``
+    seconds.
+
+    Related configuration options:
+
+    :param pillar_render_cache_size:
+        The number of renders kept in memory per process.
+
+    :param pillar_render_cache_ttl:
+        The number of seconds unused entries are kept in the master cache.
+    '''
+    # Dependency lists kept per dependency key
+    max_dependencies = 8
+    # {<dependency key>: [<dependency list>, ...]}
+    dependencies = {}
+    # odict({<render key>: <rendered data>, ...})
+    data = OrderedDict()
+    # {'hit': <int>, 'miss': <int>, 'uncacheable': <int>, 'eviction': <int>,
+    #  'expired': <int>}
+    counters = {'hit': 0, 'miss': 0, 'uncacheable': 0, 'eviction': 0, 'expired': 0}
+    # When the entries known to this process were stored in the master cache
+    # {(<bank>, <key>): <time>, ...}
+    stored = {}
+    _cache = None
+    # When the master cache was last checked for expired entries
+    _expire_clock = 0
+
+    def __init__(self, opts):
+        self.size = opts.get('pillar_render_cache_size', 1024)
+        self.ttl = opts.get('pillar_render_cache_ttl', 86400)
+        if RenderCache._cache is None:
+            RenderCache._cache = salt.cache.factory(opts)
+        self.cache = RenderCache._cache
+
+    @classmethod
+    def stats(cls):
+        '''
+        Return the hit, miss, uncacheable and eviction counters and the number
+        of renders kept in memory in this process
+        '''
+        return dict(cls.counters, items=len(cls.data))
+
+    def _fetch(self, bank, key):
+        try:
+            data = self.cache.fetch(bank, key)
+        except Exception as exc:
+            log.debug('Failed to fetch %s/%s from the cache: %s', bank, key, exc)
+            return {}
+        if data:
+            RenderCache.stored[(bank, key)] = data.get('time', 0)
+        return data
+
+    def _store(self, bank, key, data):
+        data['time'] = time.time()
+        RenderCache.stored[(bank, key)] = data['time']
+        try:
+            self.cache.store(bank, key, data)
+        except Exception as exc:
+            log.debug('Failed to store %s/%s in the cache: %s', bank, key, exc)
+
+    def _refresh(self, bank, key, data):
+        '''
+        Store an entry used from memory again if its time in the master cache
+        is older than a tenth of the TTL, so that it does not expire while used
+        '''
+        if self.ttl and time.time() - RenderCache.stored.get((bank, key), 0) > self.ttl / 10.0:
+            self._store(bank, key, data)
+
+    def expire(self):
+        '''
+        Remove the entries of the master cache unused for longer than the TTL,
+        checking at most every tenth of the TTL
+        '''
+        now = time.time()
+        if not self.ttl or now - RenderCache._expire_clock < self.ttl / 10.0:
+            return
+        RenderCache._expire_clock = now
+        # Only some cache drivers know when a key was stored, the time is
+        # also part of the entries for the others
+        has_updated = '{0}.updated'.format(self.cache.driver) in self.cache.modules
+        for bank in ('pillar_render/dependencies', 'pillar_render/data'):
+            try:
+                keys = self.cache.list(bank)
+            except Exception as exc:
+                log.debug('Failed to list %s in the cache: %s', bank, exc)
+                continue
+            for key in keys:
+                try:
+                    if has_updated:
+                        updated = self.cache.updated(bank, key)
+                        if updated is None:
+                            continue
+                    else:
+                        updated = self._fetch(bank, key).get('time', 0)
+                    if now - updated <= self.ttl:
+                        continue
+                    self.cache.flush(bank, key)
+                except Exception as exc:
+                    log.debug('Failed to expire %s/%s in the cache: %s', bank, key, exc)
+                    continue
+                if bank == 'pillar_render/dependencies':
+                    RenderCache.dependencies.pop(key, None)
+                RenderCache.stored.pop((bank, key), None)
+                RenderCache.counters['expired'] += 1
+
+    def get_dependencies(self, dep_key):
+        '''
+        Return the dependency lists known for the dependency key
+        '''
+        if dep_key not in RenderCache.dependencies:
+            deps = self._fetch('pillar_render/dependencies', dep_key).get('dependencies', [])
+            RenderCache.dependencies[dep_key] = [
+                [tuple(dep) for dep in dep_list] for dep_list in deps
+            ]
+        elif RenderCache.dependencies[dep_key]:
+            self._refresh('pillar_render/dependencies', dep_key,
+                          {'dependencies': RenderCache.dependencies[dep_key]})
+        return RenderCache.dependencies[dep_key]
+
+    def fetch(self, key):
+        '''
+        Return a copy of the data rendered under the render key, None if
+        there is none
+        '''
+        data = RenderCache.data.pop(key, None)
+        if data is None:
+            data = self._fetch('pillar_render/data', key).get('data')
+            if data is None:
+                return None
+        else:
+            self._refresh('pillar_render/data', key, {'data': data})
+        self._remember(key, data)
+        RenderCache.counters['hit'] += 1
+        return copy.deepcopy(data)
+
+    def store(self, dep_key, deps, key, data):
+        '''
+        Store the data rendered with the dependency list under the render key
+        '''
+        data = copy.deepcopy(data)
+        known = self.get_dependencies(dep_key)
+        if deps not in known:
+            known.append(deps)
+            del known[:-self.max_dependencies]
+            self._store('pillar_render/dependencies', dep_key, {'dependencies': known})
+        self._remember(key, data)
+        self._store('pillar_render/data', key, {'data': data})
+
+    def _remember(self, key, data):
+        RenderCache.data[key] = data
+        while len(RenderCache.data) > self.size:
+            evicted, _ = RenderCache.data.popitem(last=False)
+            RenderCache.stored.pop(('pillar_render/data', evicted), None)
+            RenderCache.counters['eviction'] += 1
+
+
 class Pillar(object):
     '''
     Read over the pillar top files and render the pillar data
     '''
+    # {<ext_pillar>: {'runs': <int>, 'total': <float>, 'max': <float>,
+    #                 'failures': <int>, 'timeouts': <int>}, ...}
+    ext_pillar_counters = {}
+
     def __init__(self, opts, grains, minion_id, saltenv, ext=None, functions=None,
                  pillar_override=None, pillarenv=None, extra_minion_data=None):
         self.minion_id = minion_id
@@ -704,6 +1015,131 @@ class Pillar(object):
                             env_matches.append(item)
         return matches
 
+    def _template_path(self, name, saltenv):
+        '''
+        Return the path of the template the Jinja loader finds in the
+        pillar_roots, None if there is none
+        '''
+        for root in self.opts['pillar_roots'].get(saltenv, []):
+            path = os.path.join(root, name)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def _render_dependencies(self, fn_, saltenv, sls):
+        '''
+        Return the sorted list of ``(<context entry>, <key>)`` and
+        ``('file', <template>)`` pairs the rendering of the SLS file depends
+        on, None if the rendering may depend on anything else
+        '''
+        with salt.utils.files.fopen(fn_, 'r') as ifile:
+            contents = salt.utils.stringutils.to_unicode(ifile.read())
+        render_pipe = template_shebang(fn_,
+                                       self.rend,
+                                       self.opts['renderer'],
+                                       self.opts['renderer_blacklist'],
+                                       self.opts['renderer_whitelist'],
+                                       contents)
+        renderers = set(render.__module__.split('.')[-1] for render, _ in render_pipe)
+        if not render_pipe or not renderers.issubset(CACHEABLE_RENDERERS):
+            return None
+        if 'jinja' not in renderers:
+            return []
+        name = None
+        for root in self.opts['pillar_roots'].get(saltenv, []):
+            if fn_.startswith(os.path.join(root, '')):
+                name = os.path.relpath(fn_, root).replace('\\', '/')
+                break
+        deps = set()
+        templates = [(name, contents)]
+        seen = set()
+        while templates:
+            name, contents = templates.pop()
+            try:
+                found = salt.utils.templates.jinja_dependencies(contents, self.opts, sls)
+            except Exception as exc:
+                log.debug('Failed to parse a template of SLS \'%s\': %s', sls, exc)
+                return None
+            if found is None:
+                return None
+            for dep in found:
+                if dep[0] != 'file':
+                    deps.add(dep)
+                    continue
+                template = dep[1]
+                if template.split('/', 1)[0] in ('.', '..'):
+                    if name is None:
+                        return None
+                    template = os.path.normpath(
+                        '/'.join((os.path.dirname(name), template))).replace('\\', '/')
+                if template.split('/', 1)[0] == '..':
+                    return None
+                deps.add(('file', template))
+                if template in seen:
+                    continue
+                seen.add(template)
+                path = self._template_path(template, saltenv)
+                if path is None:
+                    return None
+                with salt.utils.files.fopen(path, 'r') as ifile:
+                    templates.append((template, salt.utils.stringutils.to_unicode(ifile.read())))
+        return sorted(deps, key=repr)
+
+    def _render_key(self, deps, saltenv):
+        '''
+        Return the hash of the values the dependency list has for this minion
+        '''
+        context = {'grains': self.opts.get('grains', {}),
+                   'pillar': self.opts.get('pillar', {}),
+                   'opts': self.opts}
+        values = []
+        for source, key in deps:
+            if source == 'file':
+                path = self._template_path(key, saltenv)
+                values.append(salt.utils.hashutils.get_hash(path, 'sha256') if path else None)
+            elif key is None:
+                values.append(context[source])
+            else:
+                values.append((key in context[source], context[source].get(key)))
+        return salt.utils.hashutils.sha256_digest(repr(values))
+
+    def _compile_sls(self, fn_, saltenv, sls, defaults):
+        '''
+        Render a pillar SLS file, reusing the data rendered for another minion
+        when the pillar_render_cache is enabled and the file reads the same
+        values from the template context
+        '''
+        def _render():
+            return compile_template(fn_,
+                                    self.rend,
+                                    self.opts['renderer'],
+                                    self.opts['renderer_blacklist'],
+                                    self.opts['renderer_whitelist'],
+                                    saltenv,
+                                    sls,
+                                    _pillar_rend=True,
+                                    **defaults)
+        if not self.opts.get('pillar_render_cache', False) \
+                or not isinstance(fn_, six.string_types) or not os.path.isfile(fn_):
+            return _render()
+
+        cache = RenderCache(self.opts)
+        dep_key = salt.utils.hashutils.sha256_digest(repr((
+            saltenv, sls, salt.utils.hashutils.get_hash(fn_, 'sha256'), defaults)))
+        for deps in cache.get_dependencies(dep_key):
+            data = cache.fetch(self._render_key(deps, saltenv))
+            if data is not None:
+                return data
+
+        deps = self._render_dependencies(fn_, saltenv, sls)
+        data = _render()
+        if deps is None:
+            RenderCache.counters['uncacheable'] += 1
+            return data
+        RenderCache.counters['miss'] += 1
+        cache.store(dep_key, deps, self._render_key(deps, saltenv), data)
+        return data
+
     def render_pstate(self, sls, saltenv, mods, defaults=None):
         '''
         Collect a single pillar sls file and render it
@@ -746,15 +1182,7 @@ class Pillar(object):
                 return None, mods, errors
         state = None
         try:
-            state = compile_template(fn_,
-                                     self.rend,
-                                     self.opts['renderer'],
-                                     self.opts['renderer_blacklist'],
-                                     self.opts['renderer_whitelist'],
-                                     saltenv,
-                                     sls,
-                                     _pillar_rend=True,
-                                     **defaults)
+            state = self._compile_sls(fn_, saltenv, sls, defaults)
         except Exception as exc:
             msg = 'Rendering SLS \'{0}\' failed, render error:\n{1}'.format(
                 sls, exc
@@ -965,7 +1393,6 @@ class Pillar(object):
             errors.append('The "ext_pillar" option is malformed')
             log.critical(errors[-1])
             return pillar, errors
-        ext = None
         # Bring in CLI pillar data
         if self.pillar_override:
             pillar = merge(
@@ -975,6 +1402,7 @@ class Pillar(object):
                 self.opts.get('renderer', 'yaml'),
                 self.opts.get('pillar_merge_lists', False))
 
+        runs = []
         for run in self.opts['ext_pillar']:
             if not isinstance(run, dict):
                 errors.append('The "ext_pillar" option is malformed')
@@ -989,21 +1417,31 @@ class Pillar(object):
                         key
                     )
                     continue
+                runs.append((key, val))
+
+        if self.opts.get('ext_pillar_concurrency', 0) > 0 and len(runs) > 1:
+            exts = self._concurrent_external_pillar_data(pillar, runs, errors)
+        else:
+            exts = []
+            for key, val in runs:
+                start = time.time()
                 try:
-                    ext = self._external_pillar_data(pillar,
-                                                     val,
-                                                     key)
+                    exts.append(self._external_pillar_data(pillar, val, key))
                 except Exception as exc:
-                    errors.append(
-                        'Failed to load ext_pillar {0}: {1}'.format(
-                            key,
-                            exc.__str__(),
-                        )
-                    )
-                    log.error(
-                        'Exception caught loading ext_pillar \'%s\':\n%s',
-                        key, ''.join(traceback.format_tb(sys.exc_info()[2]))
-                    )
+                    self._ext_pillar_failed(key, exc, errors)
+                    exts.append(None)
+                else:
+                    self._ext_pillar_done(key, time.time() - start)
+                    if exts[-1]:
+                        pillar = merge(
+                            pillar,
+                            exts[-1],
+                            self.merge_strategy,
+                            self.opts.get('renderer', 'yaml'),
+                            self.opts.get('pillar_merge_lists', False))
+            return pillar, errors
+
+        for ext in exts:
             if ext:
                 pillar = merge(
                     pillar,
@@ -1011,9 +1449,112 @@ class Pillar(object):
                     self.merge_strategy,
                     self.opts.get('renderer', 'yaml'),
                     self.opts.get('pillar_merge_lists', False))
-                ext = None
         return pillar, errors
 
+    @classmethod
+    def ext_pillar_stats(cls):
+        '''
+        Return the runs, mean and max duration, failures and timeouts of every
+        ext_pillar source evaluated in this process
+        '''
+        ret = {}
+        for key, counters in six.iteritems(cls.ext_pillar_counters):
+            ret[key] = dict(counters)
+            ret[key]['mean'] = counters['total'] / counters['runs'] if counters['runs'] else 0
+        return ret
+
+    def _ext_pillar_counters(self, key):
+        return Pillar.ext_pillar_counters.setdefault(
+            key, {'runs': 0, 'total': 0, 'max': 0, 'failures': 0, 'timeouts': 0})
+
+    def _ext_pillar_done(self, key, duration):
+        '''
+        Record the duration of a successful ext_pillar evaluation
+        '''
+        log.profile('Time (in seconds) to evaluate ext_pillar \'%s\': %s', key, duration)
+        counters = self._ext_pillar_counters(key)
+        counters['runs'] += 1
+        counters['total'] += duration
+        counters['max'] = max(counters['max'], duration)
+
+    def _ext_pillar_failed(self, key, exc, errors, timeout=None):
+        '''
+        Record a failed ext_pillar evaluation. The failure is added to the
+        pillar errors unless ext_pillar_fail_policy is ``open``.
+        '''
+        counters = self._ext_pillar_counters(key)
+        if timeout is None:
+            counters['failures'] += 1
+            msg = exc.__str__()
+            log.error(
+                'Exception caught loading ext_pillar \'%s\':\n%s',
+                key, ''.join(traceback.format_tb(sys.exc_info()[2]))
+            )
+        else:
+            counters['timeouts'] += 1
+            msg = 'timed out after {0} seconds'.format(timeout)
+            log.error('ext_pillar \'%s\' %s', key, msg)
+        if self.opts.get('ext_pillar_fail_policy', 'closed') == 'open':
+            log.warning('Compiling the pillar of %s without ext_pillar \'%s\'',
+                        self.minion_id, key)
+            return
+        errors.append('Failed to load ext_pillar {0}: {1}'.format(key, msg))
+
+    def _concurrent_external_pillar_data(self, pillar, runs, errors):
+        '''
+        Evaluate the ext_pillar sources in threads, at most
+        ext_pillar_concurrency at once, and return their data in the
+        configured order. Every source gets the pillar compiled before any of
+        them, instead of the data of the sources before it.
+
+        The threads are started for this compile only. A source which times
+        out is left running in its daemon thread, so that it does not hold up
+        the sources of the later compiles.
+        '''
+        slots = threading.BoundedSemaphore(self.opts['ext_pillar_concurrency'])
+
+        def _run(key, val, result):
+            with slots:
+                start = time.time()
+                try:
+                    result['ext'] = self._external_pillar_data(copy.deepcopy(pillar), val, key)
+                except Exception:
+                    result['exc_info'] = sys.exc_info()
+                result['duration'] = time.time() - start
+            result['done'].set()
+
+        results = []
+        for key, val in runs:
+            results.append({'done': threading.Event()})
+            thread = threading.Thread(target=_run, args=(key, val, results[-1]),
+                                      name='ext_pillar({0})'.format(key))
+            thread.daemon = True
+            thread.start()
+
+        start = time.time()
+        exts = []
+        for (key, _), result in zip(runs, results):
+            timeout = self.opts.get('ext_pillar_timeouts', {}).get(
+                key, self.opts.get('ext_pillar_timeout', 0))
+            if timeout:
+                result['done'].wait(max(start + timeout - time.time(), 0))
+            else:
+                result['done'].wait()
+            if not result['done'].is_set():
+                self._ext_pillar_failed(key, None, errors, timeout=timeout)
+                exts.append(None)
+                continue
+            try:
+                if 'exc_info' in result:
+                    six.reraise(*result['exc_info'])
+            except Exception as exc:
+                self._ext_pillar_failed(key, exc, errors)
+                exts.append(None)
+            else:
+                self._ext_pillar_done(key, result['duration'])
+                exts.append(result['ext'])
+        return exts
+
     def compile_pillar(self, ext=True):
         '''
         Render the pillar data and return
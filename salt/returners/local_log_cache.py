@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+'''
+Return data to a local, log structured job cache
+
+.. versionadded:: Neon
+
+This job cache stores the same information as :mod:`local_cache
+<salt.returners.local_cache>` but, instead of creating a directory per job id
+and another one per returning minion, every load, minion list and return is
+appended as a single record to a segment file in ``<cachedir>/jobs_log``.
+
+A new segment is started every ``local_log_cache.segment_interval`` seconds
+(one hour by default). Each master process keeps an in-memory index of the
+records keyed by job id and only reads the records appended since its last
+lookup, so job lookups never walk the filesystem. Old jobs are expired by
+removing whole segments once they are older than :conf_master:`keep_jobs`.
+
+To use it as the master job cache set the following in the master config:
+
+.. code-block:: yaml
+
+    master_job_cache: local_log_cache
+
+    # Optional, the number of seconds covered by each segment file
+    local_log_cache.segment_interval: 3600
+'''
+from __future__ import absolute_import, print_function, unicode_literals
+
+# Import python libs
+import bisect
+import errno
+import logging
+import os
+import struct
+import time
+
+# Import salt libs
+import salt.payload
+import salt.utils.files
+import salt.utils.jid
+import salt.utils.minions
+import salt.utils.stringutils
+import salt.exceptions
+
+# Import 3rd-party libs
+from salt.ext import six
+
+log = logging.getLogger(__name__)
+
+__virtualname__ = 'local_log_cache'
+
+# Every record is framed as the length of the header and of the payload
+# followed by the serialized header ([kind, jid, minion_id]) and payload
+RECORD_FRAME = struct.Struct(str('>II'))
+SEGMENT_SUFFIX = '.log'
+
+# Record kinds
+JID = 'jid'
+LOAD = 'load'
+MINIONS = 'minions'
+RETURN = 'return'
+ENDTIME = 'endtime'
+
+# Per process index of the job log, see _refresh_index()
+_INDEX = {
+    # {<segment name>: <offset of the first unread record>}
+    'segments': {},
+    # {<segment name>: set([<jid>, ...])}
+    'segment_jids': {},
+    # {<jid>: {<kind>: <location or {<minion_id>: <location>}>,
+    #          'nocache': <bool>}}
+    # with locations being (<segment name>, <payload offset>, <payload size>)
+    'jobs': {},
+}
+
+
+def __virtual__():
+    return __virtualname__
+
+
+def _log_dir():
+    '''
+    Return root of the job log directory
+    '''
+    return os.path.join(__opts__['cachedir'], 'jobs_log')
+
+
+def _active_segment():
+    '''
+    Return the name of the segment new records are appended to
+    '''
+    interval = int(__opts__.get('local_log_cache.segment_interval', 3600)) or 3600
+    return '{0:012d}{1}'.format(int(time.time() // interval) * interval, SEGMENT_SUFFIX)
+
+
+def _serial():
+    return salt.payload.Serial(__opts__)
+
+
+def _index_record(segment, kind, jid, minion_id, location, data=None):
+    '''
+    Add a record found in the log to the index
+    '''
+    job = _INDEX['jobs'].setdefault(jid, {})
+    _INDEX['segment_jids'].setdefault(segment, set()).add(jid)
+    if kind in (MINIONS, RETURN):
+        job.setdefault(kind, {})[minion_id] = location
+    else:
+        job[kind] = location
+    if kind == JID:
+        job['nocache'] = (data or {}).get('nocache', False)
+
+
+def _drop_segment(segment):
+    '''
+    Forget every record stored in a segment which has been removed
+    '''
+    _INDEX['segments'].pop(segment, None)
+    for jid in _INDEX['segment_jids'].pop(segment, ()):
+        job = _INDEX['jobs'].get(jid)
+        if job is None:
+            continue
+        for kind in (JID, LOAD, MINIONS, RETURN, ENDTIME):
+            if kind not in job:
+                continue
+            if kind in (MINIONS, RETURN):
+                for minion_id, location in list(job[kind].items()):
+                    if location[0] == segment:
+                        del job[kind][minion_id]
+                if not job[kind]:
+                    del job[kind]
+            elif job[kind][0] == segment:
+                del job[kind]
+        if not [x for x in job if x != 'nocache']:
+            del _INDEX['jobs'][jid]
+
+
+def _read_segment(segment, serial):
+    '''
+    Index the records appended to a segment since it was last read
+    '''
+    path = os.path.join(_log_dir(), segment)
+    offset = _INDEX['segments'].get(segment, 0)
+    try:
+        with salt.utils.files.fopen(path, 'rb') as rfh:
+            size = os.fstat(rfh.fileno()).st_size
+            rfh.seek(offset)
+            while offset + RECORD_FRAME.size <= size:
+                header_len, payload_len = RECORD_FRAME.unpack(
+                    rfh.read(RECORD_FRAME.size))
+                end = offset + RECORD_FRAME.size + header_len + payload_len
+                if end > size:
+                    # The record is still being written
+                    break
+                kind, jid, minion_id = serial.loads(rfh.read(header_len))
+                location = (segment, end - payload_len, payload_len)
+                if kind == JID:
+                    _index_record(segment, kind, jid, minion_id, location,
+                                  serial.loads(rfh.read(payload_len)))
+                else:
+                    _index_record(segment, kind, jid, minion_id, location)
+                    rfh.seek(end)
+                offset = end
+    except IOError as exc:
+        if exc.errno != errno.ENOENT:
+            raise
+        _drop_segment(segment)
+        return
+    _INDEX['segments'][segment] = offset
+
+
+def _refresh_index():
+    '''
+    Bring the in-memory index up to date with the job log
+    '''
+    log_dir = _log_dir()
+    try:
+        segments = set(x for x in os.listdir(log_dir) if x.endswith(SEGMENT_SUFFIX))
+    except OSError as exc:
+        if exc.errno != errno.ENOENT:
+            raise
+        segments = set()
+    for segment in set(_INDEX['segments']) - segments:
+        _drop_segment(segment)
+    serial = _serial()
+    for segment in sorted(segments):
+        _read_segment(segment, serial)
+
+
+def _read(location):
+    '''
+    Read the payload of a record
+    '''
+    segment, offset, size = location
+    with salt.utils.files.fopen(os.path.join(_log_dir(), segment), 'rb') as rfh:
+        rfh.seek(offset)
+        return _serial().loads(rfh.read(size))
+
+
+def _append(kind, jid, data, minion_id=None, check=None):
+    '''
+    Append a record to the active segment.
+
+    If ``check`` is passed it is called with the up to date index entry of the
+    job while the segment is locked, and the record is only written if it
+    returns True.
+    '''
+    log_dir = _log_dir()
+    try:
+        os.makedirs(log_dir)
+    except OSError as exc:
+        if exc.errno != errno.EEXIST:
+            raise salt.exceptions.SaltCacheError(
+                'The job log directory, {0}, could not be created: {1}'.format(
+                    log_dir, exc
+                )
+            )
+    serial = _serial()
+    header = serial.dumps([kind, jid, minion_id])
+    payload = serial.dumps(data)
+    segment = _active_segment()
+    with salt.utils.files.flopen(os.path.join(log_dir, segment), 'ab') as wfh:
+        if check is not None:
+            _refresh_index()
+            if not check(_INDEX['jobs'].get(jid, {})):
+                return False
+        wfh.write(RECORD_FRAME.pack(len(header), len(payload)) + header + payload)
+    return True
+
+
+def prep_jid(nocache=False, passed_jid=None, recurse_count=0):
+    '''
+    Return a job id and record it in the job log.
+
+    This is the function responsible for making sure jids don't collide (unless
+    it is passed a jid).
+    '''
+    if recurse_count >= 5:
+        err = 'prep_jid could not store a jid after {0} tries.'.format(recurse_count)
+        log.error(err)
+        raise salt.exceptions.SaltCacheError(err)
+    if passed_jid is None:  # this can be a None or an empty string.
+        jid = salt.utils.jid.gen_jid(__opts__)
+    else:
+        jid = passed_jid
+
+    def _unused(job):
+        return passed_jid is not None or JID not in job
+
+    try:
+        if not _append(JID, jid, {'nocache': nocache}, check=_unused):
+            return prep_jid(nocache=nocache, recurse_count=recurse_count+1)
+    except IOError:
+        log.warning(
+            'Could not write out jid record for job %s. Retrying.', jid)
+        time.sleep(0.1)
+        return prep_jid(passed_jid=jid, nocache=nocache,
+                        recurse_count=recurse_count+1)
+    return jid
+
+
+def returner(load):
+    '''
+    Return data to the local job log
+    '''
+    # if a minion is returning a standalone job, get a jobid
+    if load['jid'] == 'req':
+        load['jid'] = prep_jid(nocache=load.get('nocache', False))
+
+    data = dict((key, load[key]) for key in ['return', 'retcode', 'success'] if key in load)
+    if 'out' in load:
+        data['out'] = load['out']
+
+    def _first_return(job):
+        if job.get('nocache'):
+            return False
+        if load['id'] in job.get(RETURN, {}):
+            # Minion has already returned this jid and it should be dropped
+            log.error(
+                'An extra return was detected from minion %s, please verify '
+                'the minion, this could be a replay attack', load['id']
+            )
+            return False
+        return True
+
+    if not _append(RETURN, load['jid'], data, minion_id=load['id'], check=_first_return):
+        return False
+
+
+def save_load(jid, clear_load, minions=None, recurse_count=0):
+    '''
+    Save the load to the specified jid
+
+    minions argument is to provide a pre-computed list of matched minions for
+    the job, for cases when this function can't compute that list itself (such
+    as for salt-ssh)
+    '''
+    if recurse_count >= 5:
+        err = ('save_load could not write job cache file after {0} retries.'
+               .format(recurse_count))
+        log.error(err)
+        raise salt.exceptions.SaltCacheError(err)
+    try:
+        _append(LOAD, jid, clear_load)
+    except IOError as exc:
+        log.warning(
+            'Could not write job invocation cache record: %s', exc
+        )
+        time.sleep(0.1)
+        return save_load(jid=jid, clear_load=clear_load,
+                         recurse_count=recurse_count+1)
+
+    # if you have a tgt, save that for the UI etc
+    if 'tgt' in clear_load and clear_load['tgt'] != '':
+        if minions is None:
+            ckminions = salt.utils.minions.CkMinions(__opts__)
+            # Retrieve the minions list
+            _res = ckminions.check_minions(
+                    clear_load['tgt'],
+                    clear_load.get('tgt_type', 'glob')
+                    )
+            minions = _res['minions']
+        # save the minions to a cache so we can see in the UI
+        save_minions(jid, minions)
+
+
+def save_minions(jid, minions, syndic_id=None):
+    '''
+    Save/update the list of minions for a given job
+    '''
+    # Ensure we have a list for Python 3 compatability
+    minions = list(minions)
+
+    log.debug(
+        'Adding minions for job %s%s: %s',
+        jid,
+        ' from syndic master \'{0}\''.format(syndic_id) if syndic_id else '',
+        minions
+    )
+    try:
+        _append(MINIONS, jid, minions, minion_id=syndic_id)
+    except IOError as exc:
+        log.error(
+            'Failed to write minion list %s for job %s: %s',
+            minions, jid, exc
+        )
+
+
+def get_load(jid):
+    '''
+    Return the load data that marks a specified jid
+    '''
+    _refresh_index()
+    job = _INDEX['jobs'].get(jid, {})
+    if LOAD not in job:
+        return {}
+    ret = _read(job[LOAD]) or {}
+    all_minions = set()
+    for location in six.itervalues(job.get(MINIONS, {})):
+        all_minions.update(_read(location))
+    if all_minions:
+        ret['Minions'] = sorted(all_minions)
+    return ret
+
+
+def get_jid(jid):
+    '''
+    Return the information returned when the specified job id was executed
+    '''
+    _refresh_index()
+    ret = {}
+    for minion_id, location in six.iteritems(
+            _INDEX['jobs'].get(jid, {}).get(RETURN, {})):
+        ret_data = _read(location)
+        if not isinstance(ret_data, dict) or 'return' not in ret_data:
+            ret_data = {'return': ret_data}
+        ret[minion_id] = ret_data
+    return ret
+
+
+def _loads():
+    '''
+    Yield the jid and load of every job in the job log
+    '''
+    _refresh_index()
+    for jid, job in list(_INDEX['jobs'].items()):
+        if LOAD not in job:
+            continue
+        try:
+            load = _read(job[LOAD])
+        except Exception:
+            log.exception('Failed to deserialize the load of job %s', jid)
+            continue
+        if not load:
+            continue
+        yield jid, load
+
+
+def get_jids():
+    '''
+    Return a dict mapping all job ids to job information
+    '''
+    ret = {}
+    for jid, job in _loads():
+        ret[jid] = salt.utils.jid.format_jid_instance(jid, job)
+
+        if __opts__.get('job_cache_store_endtime'):
+            endtime = get_endtime(jid)
+            if endtime:
+                ret[jid]['EndTime'] = endtime
+
+    return ret
+
+
+def get_jids_filter(count, filter_find_job=True):
+    '''
+    Return a list of all jobs information filtered by the given criteria.
+    :param int count: show not more than the count of most recent jobs
+    :param bool filter_find_jobs: filter out 'saltutil.find_job' jobs
+    '''
+    keys = []
+    ret = []
+    for jid, job in _loads():
+        job = salt.utils.jid.format_jid_instance_ext(jid, job)
+        if filter_find_job and job['Function'] == 'saltutil.find_job':
+            continue
+        i = bisect.bisect(keys, jid)
+        if len(keys) == count and i == 0:
+            continue
+        keys.insert(i, jid)
+        ret.insert(i, job)
+        if len(keys) > count:
+            del keys[0]
+            del ret[0]
+    return ret
+
+
+def clean_old_jobs():
+    '''
+    Clean out the old jobs from the job log by removing whole segments
+    '''
+    if __opts__['keep_jobs'] == 0:
+        return
+    log_dir = _log_dir()
+    if not os.path.isdir(log_dir):
+        return
+    active = _active_segment()
+    for segment in os.listdir(log_dir):
+        if not segment.endswith(SEGMENT_SUFFIX) or segment == active:
+            continue
+        path = os.path.join(log_dir, segment)
+        try:
+            hours_difference = (time.time() - os.stat(path).st_mtime) / 3600.0
+            if hours_difference <= __opts__['keep_jobs']:
+                continue
+            os.remove(path)
+        except OSError as err:
+            log.error('Unable to remove %s: %s', path, err)
+            continue
+        _drop_segment(segment)
+
+
+def update_endtime(jid, time):
+    '''
+    Update (or store) the end time for a given job
+    '''
+    try:
+        _append(ENDTIME, jid, salt.utils.stringutils.to_unicode(time))
+    except IOError as exc:
+        log.warning('Could not write job end time record: %s', exc)
+
+
+def get_endtime(jid):
+    '''
+    Retrieve the stored endtime for a given job
+
+    Returns False if no endtime is present
+    '''
+    _refresh_index()
+    location = _INDEX['jobs'].get(jid, {}).get(ENDTIME)
+    if location is None:
+        return False
+    return _read(location)
@@ -120,3 +120,28 @@ def show_pillar(minion='*', **kwargs):
     __salt__['salt.cmd']('sys.reload_modules')
 
     return compiled_pillar
+
+
+def clear_cache(tgt='*', tgt_type='glob', pillarenv=None):
+    '''
+    .. versionadded:: Neon
+
+    Remove the pillars cached by :conf_master:`pillar_cache` for the targeted
+    minions, so that they are compiled again on the next request. Only the
+    pillar of the given pillarenv is removed if one is passed.
+
+    Returns the list of minions a cached pillar was removed for.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run pillar.clear_cache
+        salt-run pillar.clear_cache 'web*'
+        salt-run pillar.clear_cache G@os:Ubuntu tgt_type=compound pillarenv=dev
+    '''
+    minions = salt.utils.minions.CkMinions(__opts__).check_minions(tgt, tgt_type)
+    return sorted(
+        minion for minion in minions['minions']
+        if salt.pillar.PillarCache.clear(__opts__, minion, pillarenv)
+    )
@@ -33,6 +33,7 @@ import salt.minion
 import salt.pillar
 import salt.fileclient
 import salt.utils.args
+import salt.utils.atomicfile
 import salt.utils.crypt
 import salt.utils.data
 import salt.utils.decorators.state
@@ -41,14 +42,18 @@ import salt.utils.event
 import salt.utils.files
 import salt.utils.hashutils
 import salt.utils.immutabletypes as immutabletypes
+import salt.utils.json
 import salt.utils.msgpack as msgpack
 import salt.utils.platform
 import salt.utils.process
+import salt.utils.stringutils
+import salt.utils.templates
 import salt.utils.url
+import salt.version
 import salt.syspaths as syspaths
 import salt.transport.client
 from salt.serializers.msgpack import serialize as msgpack_serialize, deserialize as msgpack_deserialize
-from salt.template import compile_template, compile_template_str
+from salt.template import compile_template, compile_template_str, template_shebang
 from salt.exceptions import (
     SaltRenderError,
     SaltReqTimeoutError
@@ -130,6 +135,9 @@ STATE_RUNTIME_KEYWORDS = frozenset([
 
 STATE_INTERNAL_KEYWORDS = STATE_REQUISITE_KEYWORDS.union(STATE_REQUISITE_IN_KEYWORDS).union(STATE_RUNTIME_KEYWORDS)
 
+# Characters which make a requisite a glob, rather than a plain name
+_GLOB_CHARS = re.compile(r'[*?[]')
+
 
 def _odict_hashable(self):
     return id(self)
@@ -211,6 +219,54 @@ def trim_req(req):
     return req
 
 
+def _match_index(lookup, pattern):
+    '''
+    Return the set of positions stored in an index under the keys which
+    match the pattern, the same way fnmatch.fnmatch would match them
+    '''
+    if not salt.utils.platform.is_windows() and not _GLOB_CHARS.search(pattern):
+        return set(lookup.get(pattern, ()))
+    ret = set()
+    for key, positions in six.iteritems(lookup):
+        if fnmatch.fnmatch(key, pattern):
+            ret.update(positions)
+    return ret
+
+
+def index_high(high):
+    '''
+    Index the high data by the values requisites look states up by, so that
+    find_name and find_sls_ids do not need to scan the whole high data
+    '''
+    index = {'sls': {}, 'sls_first': {}, 'args': {}, 'names': {}}
+    for nid, item in six.iteritems(high):
+        if not isinstance(item, dict):
+            continue
+        if '__sls__' in item:
+            index['sls_first'].setdefault(item['__sls__'], []).append(
+                (nid, next(iter(item))))
+        for state, run in six.iteritems(item):
+            if state.startswith('__'):
+                continue
+            index['sls'].setdefault(item.get('__sls__'), []).append(
+                (nid, state))
+            if not isinstance(run, list):
+                continue
+            for arg in run:
+                if not isinstance(arg, dict):
+                    continue
+                try:
+                    if 'name' in arg:
+                        index['names'].setdefault(arg['name'], (state, nid))
+                    if len(arg) == 1:
+                        index['args'].setdefault(
+                            (state, arg[next(iter(arg))]), []).append(nid)
+                except TypeError:
+                    # Unhashable values cannot be looked up by name
+                    continue
+    return index
+
+
 def state_args(id_, state, high):
     '''
     Return a set of the arguments passed to the named state
@@ -229,15 +285,28 @@ def state_args(id_, state, high):
     return args
 
 
-def find_name(name, state, high):
+def find_name(name, state, high, index=None):
     '''
     Scan high data for the id referencing the given name and return a list of (IDs, state) tuples that match
 
     Note: if `state` is sls, then we are looking for all IDs that match the given SLS
+
+    If an index built by index_high is passed, it is used instead of scanning
+    the high data.
     '''
     ext_id = []
     if name in high:
         ext_id.append((name, state))
+    elif index is not None:
+        try:
+            if state == 'sls':
+                ext_id.extend(index['sls_first'].get(name, ()))
+            else:
+                ext_id.extend(
+                    (nid, state) for nid in index['args'].get((state, name), ()))
+        except TypeError:
+            # Unhashable name, scan the high data instead
+            return find_name(name, state, high)
     # if we are requiring an entire SLS, then we need to add ourselves to everything in that SLS
     elif state == 'sls':
         for nid, item in six.iteritems(high):
@@ -259,10 +328,19 @@ def find_name(name, state, high):
     return ext_id
 
 
-def find_sls_ids(sls, high):
+def find_sls_ids(sls, high, index=None):
     '''
     Scan for all ids in the given sls and return them in a dict; {name: state}
+
+    If an index built by index_high is passed, it is used instead of scanning
+    the high data.
     '''
+    if index is not None:
+        try:
+            return list(index['sls'].get(sls, ()))
+        except TypeError:
+            # Unhashable sls, scan the high data instead
+            pass
     ret = []
     for nid, item in six.iteritems(high):
         try:
@@ -756,6 +834,8 @@ class State(object):
         self.mod_init = set()
         self.pre = {}
         self.__run_num = 0
+        # The chunks list last indexed by index_chunks, its length and index
+        self._chunk_index = (None, 0, None)
         self.jid = jid
         self.instance_id = six.text_type(id(self))
         self.inject_globals = {}
@@ -1446,8 +1526,41 @@ class State(object):
                         live['fun'] = fun
                         chunks.append(live)
         chunks = self.order_chunks(chunks)
+        self.index_chunks(chunks)
         return chunks
 
+    def index_chunks(self, chunks):
+        '''
+        Index the chunks by the keys requisites look them up by, so that
+        resolving a requisite does not need to scan all of the chunks
+        '''
+        index = {'__id__': {}, 'name': {}, '__sls__': {}, 'state': {}}
+        for pos, chunk in enumerate(chunks):
+            for key, lookup in six.iteritems(index):
+                val = chunk.get(key)
+                if isinstance(val, six.string_types):
+                    lookup.setdefault(val, []).append(pos)
+        self._chunk_index = (chunks, len(chunks), index)
+        return index
+
+    def find_chunks(self, chunks, req_key, req_val):
+        '''
+        Return the chunks matched by a requisite, in the order they appear in
+        the chunks list. The index of the chunks list is rebuilt if it is not
+        the one last indexed.
+        '''
+        indexed, length, index = self._chunk_index
+        if indexed is not chunks or length != len(chunks):
+            index = self.index_chunks(chunks)
+        if req_key == 'sls':
+            positions = _match_index(index['__sls__'], req_val)
+        else:
+            positions = _match_index(index['name'], req_val)
+            positions.update(_match_index(index['__id__'], req_val))
+            if req_key != 'id':
+                positions.intersection_update(index['state'].get(req_key, ()))
+        return [chunks[pos] for pos in sorted(positions)]
+
     def reconcile_extend(self, high):
         '''
         Pull the extend data and add it to the respective high data
@@ -1567,6 +1680,7 @@ class State(object):
         disabled_reqs = self.opts.get('disabled_requisites', [])
         if not isinstance(disabled_reqs, list):
             disabled_reqs = [disabled_reqs]
+        index = index_high(high)
         for id_, body in six.iteritems(high):
             if not isinstance(body, dict):
                 continue
@@ -1643,25 +1757,18 @@ class State(object):
                                                      if not x.startswith('__')]
                                         ind = {_ind_high[0]: ind}
                                     else:
-                                        found = False
-                                        for _id in iter(high):
-                                            for state in [state for state
-                                                          in iter(high[_id])
-                                                          if not state.startswith('__')]:
-                                                for j in iter(high[_id][state]):
-                                                    if isinstance(j, dict) and 'name' in j:
-                                                        if j['name'] == ind:
-                                                            ind = {state: _id}
-                                                            found = True
-                                        if not found:
+                                        try:
+                                            _state, _id = index['names'][ind]
+                                        except (KeyError, TypeError):
                                             continue
+                                        ind = {_state: _id}
                                 if not ind:
                                     continue
                                 pstate = next(iter(ind))
                                 pname = ind[pstate]
                                 if pstate == 'sls':
                                     # Expand hinges here
-                                    hinges = find_sls_ids(pname, high)
+                                    hinges = find_sls_ids(pname, high, index)
                                 else:
                                     hinges.append((pname, pstate))
                                 if '.' in pstate:
@@ -1691,7 +1798,7 @@ class State(object):
                                                 )
                                     if key == 'prereq':
                                         # Add prerequired to prereqs
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = find_name(name, _state, high, index)
                                         for ext_id, _req_state in ext_ids:
                                             if ext_id not in extend:
                                                 extend[ext_id] = OrderedDict()
@@ -1704,7 +1811,7 @@ class State(object):
                                     if key == 'use_in':
                                         # Add the running states args to the
                                         # use_in states
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = find_name(name, _state, high, index)
                                         for ext_id, _req_state in ext_ids:
                                             if not ext_id:
                                                 continue
@@ -1731,7 +1838,7 @@ class State(object):
                                     if key == 'use':
                                         # Add the use state's args to the
                                         # running state
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = find_name(name, _state, high, index)
                                         for ext_id, _req_state in ext_ids:
                                             if not ext_id:
                                                 continue
@@ -2198,6 +2305,14 @@ class State(object):
                         chunks.remove(low)
                         break
         running = {}
+        # Parallel processes return through the job cache, so a jid is needed
+        if self.opts.get('state_parallel_workers', 0) > 0 and self.jid:
+            running = self._call_chunks_parallel(chunks, running)
+            if '__FAILHARD__' in running:
+                running.pop('__FAILHARD__')
+                return running
+            ret = dict(list(disabled.items()) + list(running.items()))
+            return ret
         for low in chunks:
             if '__FAILHARD__' in running:
                 running.pop('__FAILHARD__')
@@ -2219,6 +2334,157 @@ class State(object):
         ret = dict(list(disabled.items()) + list(running.items()))
         return ret
 
+    def _parallel_eligible(self, low):
+        '''
+        Return True if the chunk can be run in a separate process by the
+        parallel scheduler
+        '''
+        if low['state'] in self.opts.get('state_parallel_exclude', []):
+            return False
+        if low.get('parallel') is False or low.get('__prereq__'):
+            return False
+        # watch needs the result in process to decide on calling mod_watch,
+        # prereq runs the required chunk in test mode first
+        for req in ('watch', 'watch_any', 'prereq', 'prerequired'):
+            if low.get(req):
+                return False
+        return True
+
+    def _order_group(self, low):
+        '''
+        Return the group of the chunk for the parallel scheduler, which only
+        starts the chunks of a group once the chunks of the lower groups have
+        finished. The orders state_auto_order gives to the states, from 10000
+        on, only follow their position in the SLS files and share a group, so
+        that only the explicit orders (``first``, ``last`` and numbers) are
+        kept by the scheduler.
+        '''
+        order = low.get('order', 0)
+        if not isinstance(order, (int, float)):
+            return 0
+        if 10000 <= order < 1000000:
+            return 10000
+        return order
+
+    def _call_chunks_parallel(self, chunks, running):
+        '''
+        Run the chunks as soon as the chunks they require have finished,
+        running up to ``state_parallel_workers`` of them at a time in separate
+        processes. Chunks are started in order, a chunk whose requisites are
+        not finished yet is passed over until they are, and the chunks of an
+        order group wait for the chunks of the lower groups.
+        '''
+        workers = self.opts['state_parallel_workers']
+        disabled_reqs = self.opts.get('disabled_requisites', [])
+        if not isinstance(disabled_reqs, list):
+            disabled_reqs = [disabled_reqs]
+        r_states = [r_state for r_state in
+                    ('require', 'require_any', 'watch', 'watch_any',
+                     'onfail', 'onfail_any', 'onfail_all', 'onchanges',
+                     'onchanges_any', 'prerequired')
+                    if r_state not in disabled_reqs]
+        groups = dict((_gen_tag(low), self._order_group(low)) for low in chunks)
+        deps = {}
+        for low in chunks:
+            reqs = self._requisite_chunks(low, chunks, dict((r_state, []) for r_state in r_states))
+            # Unresolvable requisites are reported by call_chunk
+            deps[_gen_tag(low)] = [] if reqs is None else [
+                _gen_tag(chunk) for req_chunks in six.itervalues(reqs) for chunk in req_chunks
+            ]
+
+        def _finished(tag):
+            return tag in running and 'proc' not in running[tag]
+
+        start = time.time()
+        pending = list(chunks)
+        failhard = False
+        while pending and not failhard:
+            self.reconcile_procs(running)
+            for low in chunks:
+                tag = _gen_tag(low)
+                if _finished(tag) and self.check_failhard(low, running):
+                    failhard = True
+            if failhard or '__FAILHARD__' in running:
+                break
+            # The lowest order group with chunks left to run or finish
+            barrier = min(
+                [groups[_gen_tag(low)] for low in pending] +
+                [groups[tag] for tag, ret in six.iteritems(running)
+                 if 'proc' in ret and tag in groups])
+            progressed = False
+            for low in list(pending):
+                tag = _gen_tag(low)
+                if tag in running:
+                    # Already run as the requisite of another chunk
+                    pending.remove(low)
+                    progressed = True
+                    continue
+                if groups[tag] > barrier:
+                    # The chunks are sorted by order
+                    break
+                if not all(_finished(dep) for dep in deps[tag] if dep != tag):
+                    continue
+                parallel = self._parallel_eligible(low)
+                if parallel and sum('proc' in ret for ret in six.itervalues(running)) >= workers:
+                    break
+                pending.remove(low)
+                progressed = True
+                # Check if this low chunk is paused
+                if self.check_pause(low) == 'kill':
+                    pending = []
+                    break
+                if parallel:
+                    low = dict(low, parallel=True)
+                running = self.call_chunk(low, running, chunks)
+                self.active = set()
+                if not parallel and self.check_failhard(low, running):
+                    failhard = True
+                    break
+                if '__FAILHARD__' in running:
+                    break
+            if not progressed and pending:
+                if any('proc' in ret for ret in six.itervalues(running)):
+                    time.sleep(0.01)
+                else:
+                    # Nothing is running and nothing is ready, let call_chunk
+                    # resolve what is left in order
+                    low = pending.pop(0)
+                    running = self.call_chunk(low, running, chunks)
+                    self.active = set()
+                    if self.check_failhard(low, running):
+                        failhard = True
+        while True:
+            if self.reconcile_procs(running):
+                break
+            time.sleep(0.01)
+        if failhard:
+            running['__FAILHARD__'] = True
+        self._critical_path(running, deps, start)
+        return running
+
+    def _critical_path(self, running, deps, start):
+        '''
+        Record in each chunk return the duration of the longest chain of
+        requisites ending with it, and log the wall time of the run against
+        the longest chain of all
+        '''
+        paths = {}
+        # Chunks are run after their requisites, so walking them in
+        # __run_num__ order sees the requisites first
+        for tag in sorted((tag for tag in running if tag in deps),
+                          key=lambda tag: running[tag].get('__run_num__', 0)):
+            longest = max([paths.get(dep, 0) for dep in deps[tag] if dep != tag] or [0])
+            paths[tag] = longest + running[tag].get('duration', 0)
+            running[tag]['__critical_path__'] = paths[tag]
+        wall_time = (time.time() - start) * 1000
+        log.info(
+            'Parallel state run: wall time %.3f ms, critical path %.3f ms, '
+            'sum of state durations %.3f ms',
+            wall_time,
+            max(list(paths.values()) or [0]),
+            sum(running[tag].get('duration', 0) for tag in paths),
+        )
+
     def check_failhard(self, low, running):
         '''
         Check if the low data chunk should send a failhard signal
@@ -2309,6 +2575,32 @@ class State(object):
                     retset.add(False)
         return False not in retset
 
+    def _requisite_chunks(self, low, chunks, reqs):
+        '''
+        Fill the reqs dict, keyed by requisite type, with the chunks the
+        requisites of that type in the low chunk point to. Returns None if
+        any of the requisites cannot be found.
+        '''
+        for r_state in reqs:
+            if r_state in low and low[r_state] is not None:
+                for req in low[r_state]:
+                    if isinstance(req, six.string_types):
+                        req = {'id': req}
+                    req = trim_req(req)
+                    req_key = next(iter(req))
+                    req_val = req[req_key]
+                    if req_val is None or not chunks:
+                        return None
+                    if not isinstance(req_val, six.string_types):
+                        raise SaltRenderError(
+                            'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
+                                req_key, chunks[0]['name']))
+                    found = self.find_chunks(chunks, req_key, req_val)
+                    if not found:
+                        return None
+                    reqs[r_state].extend(found)
+        return reqs
+
     def check_requisite(self, low, running, chunks, pre=False):
         '''
         Look into the running data to check the status of all requisite
@@ -2369,49 +2661,13 @@ class State(object):
                 'onchanges_any': []}
         if pre:
             reqs['prerequired'] = []
-        for r_state in reqs:
-            if r_state in low and low[r_state] is not None:
-                if r_state in disabled_reqs:
-                    log.warning('The %s requisite has been disabled, Ignoring.', r_state)
-                    continue
-                for req in low[r_state]:
-                    if isinstance(req, six.string_types):
-                        req = {'id': req}
-                    req = trim_req(req)
-                    found = False
-                    for chunk in chunks:
-                        req_key = next(iter(req))
-                        req_val = req[req_key]
-                        if req_val is None:
-                            continue
-                        if req_key == 'sls':
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk['__sls__'], req_val):
-                                found = True
-                                reqs[r_state].append(chunk)
-                            continue
-                        try:
-                            if isinstance(req_val, six.string_types):
-                                if (fnmatch.fnmatch(chunk['name'], req_val) or
-                                    fnmatch.fnmatch(chunk['__id__'], req_val)):
-                                    if req_key == 'id' or chunk['state'] == req_key:
-                                        found = True
-                                        reqs[r_state].append(chunk)
-                            else:
-                                raise KeyError
-                        except KeyError as exc:
-                            raise SaltRenderError(
-                                'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
-                                    req_key, chunk['name']))
-                        except TypeError:
-                            # On Python 2, the above req_val, being an OrderedDict, will raise a KeyError,
-                            # however on Python 3 it will raise a TypeError
-                            # This was found when running tests.unit.test_state.StateCompilerTestCase.test_render_error_on_invalid_requisite
-                            raise SaltRenderError(
-                                'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
-                                    req_key, chunk['name']))
-                    if not found:
-                        return 'unmet', ()
+        for r_state in disabled_reqs:
+            if r_state in reqs and low.get(r_state) is not None:
+                log.warning('The %s requisite has been disabled, Ignoring.', r_state)
+                reqs.pop(r_state)
+        reqs = self._requisite_chunks(low, chunks, reqs)
+        if reqs is None:
+            return 'unmet', ()
         fun_stats = set()
         for r_state, chunks in six.iteritems(reqs):
             req_stats = set()
@@ -2420,8 +2676,11 @@ class State(object):
             else:
                 run_dict = running
 
+            # Only wait on the parallel processes of the required chunks
+            tags = [_gen_tag(chunk) for chunk in chunks]
             while True:
-                if self.reconcile_procs(run_dict):
+                self.reconcile_procs(run_dict)
+                if not any('proc' in run_dict.get(tag, {}) for tag in tags):
                     break
                 time.sleep(0.01)
 
@@ -2573,26 +2832,14 @@ class State(object):
                     found = False
                     req_key = next(iter(req))
                     req_val = req[req_key]
-                    for chunk in chunks:
-                        if req_val is None:
-                            continue
-                        if req_key == 'sls':
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk['__sls__'], req_val):
-                                if requisite == 'prereq':
-                                    chunk['__prereq__'] = True
-                                reqs.append(chunk)
-                                found = True
-                            continue
-                        if (fnmatch.fnmatch(chunk['name'], req_val) or
-                            fnmatch.fnmatch(chunk['__id__'], req_val)):
-                            if req_key == 'id' or chunk['state'] == req_key:
-                                if requisite == 'prereq':
-                                    chunk['__prereq__'] = True
-                                elif requisite == 'prerequired':
-                                    chunk['__prerequired__'] = True
-                                reqs.append(chunk)
-                                found = True
+                    if req_val is not None:
+                        for chunk in self.find_chunks(chunks, req_key, req_val):
+                            if requisite == 'prereq':
+                                chunk['__prereq__'] = True
+                            elif requisite == 'prerequired' and req_key != 'sls':
+                                chunk['__prerequired__'] = True
+                            reqs.append(chunk)
+                            found = True
                     if not found:
                         lost[requisite].append(req)
             if lost['require'] or lost['watch'] or lost['prereq'] \
@@ -2771,30 +3018,51 @@ class State(object):
         '''
         listeners = []
         crefs = {}
+        # The first chunk with a given ID or name
+        first = {}
         for chunk in chunks:
             crefs[(chunk['state'], chunk['__id__'], chunk['name'])] = chunk
+            for key in ('__id__', 'name'):
+                try:
+                    first.setdefault(chunk[key], chunk)
+                except TypeError:
+                    # Unhashable name
+                    continue
             if 'listen' in chunk:
                 listeners.append({(chunk['state'], chunk['__id__'], chunk['name']): chunk['listen']})
             if 'listen_in' in chunk:
                 for l_in in chunk['listen_in']:
                     for key, val in six.iteritems(l_in):
                         listeners.append({(key, val, 'lookup'): [{chunk['state']: chunk['__id__']}]})
+        # The chunk references matching a state and any of its ID or name
+        cref_index = {}
+        for cref in crefs:
+            for val in cref:
+                try:
+                    matches = cref_index.setdefault((cref[0], val), [])
+                except TypeError:
+                    # Unhashable name
+                    continue
+                if not matches or matches[-1] is not cref:
+                    matches.append(cref)
         mod_watchers = []
         errors = {}
         for l_dict in listeners:
             for key, val in six.iteritems(l_dict):
                 for listen_to in val:
                     if not isinstance(listen_to, dict):
-                        found = False
-                        for chunk in chunks:
-                            if chunk['__id__'] == listen_to or \
-                               chunk['name'] == listen_to:
-                                listen_to = {chunk['state']: chunk['__id__']}
-                                found = True
-                        if not found:
+                        try:
+                            chunk = first[listen_to]
+                        except (KeyError, TypeError):
                             continue
+                        listen_to = {chunk['state']: chunk['__id__']}
                     for lkey, lval in six.iteritems(listen_to):
-                        if not any(lkey == cref[0] and lval in cref for cref in crefs):
+                        try:
+                            to_crefs = cref_index.get((lkey, lval), [])
+                        except TypeError:
+                            to_crefs = [cref for cref in crefs
+                                        if lkey == cref[0] and lval in cref]
+                        if not to_crefs:
                             rerror = {_l_tag(lkey, lval):
                                       {
                                           'comment': 'Referenced state {0}: {1} does not exist'.format(lkey, lval),
@@ -2804,14 +3072,17 @@ class State(object):
                                       }}
                             errors.update(rerror)
                             continue
-                        to_tags = [
-                            _gen_tag(data) for cref, data in six.iteritems(crefs) if lkey == cref[0] and lval in cref
-                        ]
+                        to_tags = [_gen_tag(crefs[cref]) for cref in to_crefs]
                         for to_tag in to_tags:
                             if to_tag not in running:
                                 continue
                             if running[to_tag]['changes']:
-                                if not any(key[0] == cref[0] and key[1] in cref for cref in crefs):
+                                try:
+                                    from_crefs = cref_index.get((key[0], key[1]), [])
+                                except TypeError:
+                                    from_crefs = [cref for cref in crefs
+                                                  if key[0] == cref[0] and key[1] in cref]
+                                if not from_crefs:
                                     rerror = {_l_tag(key[0], key[1]):
                                                  {'comment': 'Referenced state {0}: {1} does not exist'.format(key[0], key[1]),
                                                   'name': 'listen_{0}:{1}'.format(key[0], key[1]),
@@ -2820,7 +3091,7 @@ class State(object):
                                     errors.update(rerror)
                                     continue
 
-                                new_chunks = [data for cref, data in six.iteritems(crefs) if key[0] == cref[0] and key[1] in cref]
+                                new_chunks = [crefs[cref] for cref in from_crefs]
                                 for chunk in new_chunks:
                                     low = chunk.copy()
                                     low['sfun'] = chunk['fun']
@@ -2860,9 +3131,10 @@ class State(object):
                 if needs_default:
                     state[state_ref].insert(-1, '__call__')
 
-    def call_high(self, high, orchestration_jid=None):
+    def compile_lowstate(self, high, orchestration_jid=None):
         '''
-        Process a high data call and ensure the defined states.
+        Compile high data into the low chunks call_lowstate runs, returns the
+        chunks and a list of errors
         '''
         self.inject_default_call(high)
         errors = []
@@ -2871,20 +3143,29 @@ class State(object):
         errors.extend(ext_errors)
         errors.extend(self.verify_high(high))
         if errors:
-            return errors
+            return [], errors
         high, req_in_errors = self.requisite_in(high)
         errors.extend(req_in_errors)
         high = self.apply_exclude(high)
         # Verify that the high data is structurally sound
         if errors:
-            return errors
+            return [], errors
         # Compile and verify the raw chunks
-        chunks = self.compile_high_data(high, orchestration_jid)
+        return self.compile_high_data(high, orchestration_jid), errors
 
-        # If there are extensions in the highstate, process them and update
-        # the low data chunks
+    def call_high(self, high, orchestration_jid=None):
+        '''
+        Process a high data call and ensure the defined states.
+        '''
+        chunks, errors = self.compile_lowstate(high, orchestration_jid)
         if errors:
             return errors
+        return self.call_lowstate(chunks)
+
+    def call_lowstate(self, chunks):
+        '''
+        Ensure the states of low chunks compiled by compile_lowstate
+        '''
         ret = self.call_chunks(chunks)
         ret = self.call_listen(chunks, ret)
 
@@ -3036,6 +3317,9 @@ class BaseHighState(object):
         self.avail = self.__gather_avail()
         self.serial = salt.payload.Serial(self.opts)
         self.building_highstate = OrderedDict()
+        # What the SLS files rendered so far depend on, when they are
+        # rendered to be stored in the lowstate cache
+        self._lowstate_deps = None
 
     def __gather_avail(self):
         '''
@@ -3569,6 +3853,24 @@ class BaseHighState(object):
                 'fileserver'.format(sls, saltenv)
             )
         else:
+            if self._lowstate_deps is not None:
+                deps = None
+                if not local:
+                    deps = self._render_dependencies(
+                        fn_, saltenv, sls, state_data['source'])
+                if deps is None:
+                    log.debug(
+                        'The rendering of SLS \'%s:%s\' may depend on more '
+                        'than its files, grains, pillar and opts, the '
+                        'lowstate will not be cached', saltenv, sls
+                    )
+                    self._lowstate_deps = None
+                else:
+                    self._lowstate_deps.update(deps)
+                    self._lowstate_deps.add(
+                        ('file', saltenv, state_data['source']))
+                    # Includes may be globs, matched against the file list
+                    self._lowstate_deps.add(('file_list', saltenv, None))
             try:
                 state = compile_template(fn_,
                                          self.state.rend,
@@ -3985,6 +4287,124 @@ class BaseHighState(object):
                     ret_matches[env].append(sls)
         return ret_matches
 
+    def _render_dependencies(self, fn_, saltenv, sls, source):
+        '''
+        Return the set of ``(<context entry>, <key>)`` pairs and
+        ``('file', <saltenv>, <url>)`` tuples for the templates the rendering
+        of the SLS file depends on, None if the rendering may depend on
+        anything else
+        '''
+        with salt.utils.files.fopen(fn_, 'r') as ifile:
+            contents = salt.utils.stringutils.to_unicode(ifile.read())
+        render_pipe = template_shebang(fn_,
+                                       self.state.rend,
+                                       self.state.opts['renderer'],
+                                       self.state.opts['renderer_blacklist'],
+                                       self.state.opts['renderer_whitelist'],
+                                       contents)
+        renderers = set(render.__module__.split('.')[-1] for render, _ in render_pipe)
+        if not render_pipe or not renderers.issubset(salt.pillar.CACHEABLE_RENDERERS):
+            return None
+        deps = set()
+        if 'jinja' not in renderers:
+            return deps
+        templates = [(salt.utils.url.parse(source)[0], contents)]
+        seen = set()
+        while templates:
+            name, contents = templates.pop()
+            try:
+                found = salt.utils.templates.jinja_dependencies(contents, self.state.opts, sls)
+            except Exception as exc:
+                log.debug('Failed to parse a template of SLS \'%s\': %s', sls, exc)
+                return None
+            if found is None:
+                return None
+            for dep in found:
+                if dep[0] != 'file':
+                    deps.add(dep)
+                    continue
+                template = dep[1]
+                if template.split('/', 1)[0] in ('.', '..'):
+                    template = os.path.normpath(
+                        '/'.join((os.path.dirname(name), template))).replace('\\', '/')
+                if template.split('/', 1)[0] == '..':
+                    return None
+                url = salt.utils.url.create(template)
+                deps.add(('file', saltenv, url))
+                if template in seen:
+                    continue
+                seen.add(template)
+                path = self.client.cache_file(url, saltenv)
+                if not path:
+                    return None
+                with salt.utils.files.fopen(path, 'r') as ifile:
+                    templates.append((template, salt.utils.stringutils.to_unicode(ifile.read())))
+        return deps
+
+    def _lowstate_fingerprint(self, matches, exclude, deps):
+        '''
+        Return the fingerprint of what the lowstate for the top file matches
+        is compiled from: the grains, the pillar, and the hashes of the SLS
+        files and templates and the values from the template context listed
+        in the dependencies
+        '''
+        context = {'grains': self.state.opts.get('grains', {}),
+                   'pillar': self.state.opts.get('pillar', {}),
+                   'opts': self.state.opts}
+        values = []
+        for dep in deps:
+            if dep[0] == 'file':
+                hsum = self.client.hash_file(dep[2], dep[1])
+                values.append(hsum.get('hsum') if isinstance(hsum, dict) else None)
+            elif dep[0] == 'file_list':
+                values.append(sorted(self.client.file_list(dep[1])))
+            elif dep[1] is None:
+                values.append(context[dep[0]])
+            else:
+                values.append((dep[1] in context[dep[0]], context[dep[0]].get(dep[1])))
+        return salt.utils.hashutils.sha256_digest(salt.utils.json.dumps(
+            [salt.version.__version__, matches, exclude, context['grains'],
+             context['pillar'], deps, values],
+            sort_keys=True,
+            default=repr))
+
+    def _load_lowstate(self, cfn, matches, exclude):
+        '''
+        Return the chunks stored in the lowstate cache file, None if there are
+        none or their fingerprint does not match
+        '''
+        try:
+            with salt.utils.files.fopen(cfn, 'rb') as fp_:
+                entry = self.serial.load(fp_)
+            if entry['fingerprint'] == self._lowstate_fingerprint(
+                    matches, exclude, entry['deps']):
+                log.debug('Using the lowstate cached in %s', cfn)
+                return entry['chunks']
+        except (IOError, OSError):
+            pass
+        except Exception as exc:
+            log.debug('Unable to load the lowstate cache file %s: %s', cfn, exc)
+        return None
+
+    def _store_lowstate(self, cfn, matches, exclude, chunks):
+        '''
+        Store the chunks in the lowstate cache file, along with the fingerprint
+        of what they are compiled from
+        '''
+        deps = sorted(self._lowstate_deps, key=repr)
+        entry = {'fingerprint': self._lowstate_fingerprint(matches, exclude, deps),
+                 'deps': deps,
+                 'chunks': chunks}
+        with salt.utils.files.set_umask(0o077):
+            try:
+                with salt.utils.atomicfile.atomic_open(cfn, 'w+b') as fp_:
+                    self.serial.dump(entry, fp_)
+            except TypeError:
+                # Can't serialize pydsl
+                pass
+            except (IOError, OSError):
+                log.error('Unable to write to the lowstate cache file %s', cfn)
+
     def call_highstate(self, exclude=None, cache=None, cache_name='highstate',
                        force=False, whitelist=None, orchestration_jid=None):
         '''
@@ -4030,11 +4450,28 @@ class BaseHighState(object):
             return ret
         matches = self.matches_whitelist(matches, whitelist)
         self.load_dynamic(matches)
+        lowstate_cfn = None
+        if self.opts.get('state_lowstate_cache', False) \
+                and orchestration_jid is None:
+            lowstate_cfn = os.path.join(
+                    self.opts['cachedir'],
+                    '{0}.lowstate.p'.format(cache_name)
+            )
+            if isinstance(exclude, six.string_types):
+                exclude = exclude.split(',')
         if not self._check_pillar(force):
             err += ['Pillar failed to render with the following messages:']
             err += self.state.opts['pillar']['_errors']
         else:
-            high, errors = self.render_highstate(matches)
+            if lowstate_cfn and not err:
+                chunks = self._load_lowstate(lowstate_cfn, matches, exclude)
+                if chunks is not None:
+                    return self.state.call_lowstate(chunks)
+                self._lowstate_deps = set()
+            try:
+                high, errors = self.render_highstate(matches)
+            finally:
+                deps, self._lowstate_deps = self._lowstate_deps, None
             if exclude:
                 if isinstance(exclude, six.string_types):
                     exclude = exclude.split(',')
@@ -4064,6 +4501,16 @@ class BaseHighState(object):
             except (IOError, OSError):
                 log.error('Unable to write to "state.highstate" cache file %s', cfn)
 
+        if lowstate_cfn and deps is not None:
+            chunks, errors = self.state.compile_lowstate(high)
+            if errors:
+                return errors
+            self._lowstate_deps = deps
+            try:
+                self._store_lowstate(lowstate_cfn, matches, exclude, chunks)
+            finally:
+                self._lowstate_deps = None
+            return self.state.call_lowstate(chunks)
         return self.state.call_high(high, orchestration_jid)
 
     def compile_highstate(self):
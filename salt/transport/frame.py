@@ -7,6 +7,22 @@ from __future__ import absolute_import, print_function, unicode_literals
 import salt.utils.msgpack
 from salt.ext import six
 
+# The most a stream reader asks for in one IOStream.read_bytes(partial=True)
+# call. A partial read returns whatever is already buffered, so a large bound
+# lets a multi-megabyte message reach the unpacker in a handful of chunks
+# instead of thousands of 4K reads, each a trip through the io loop.
+READ_SIZE = 1024 * 1024
+
+# The buffer size handed to the stream unpackers. msgpack >= 0.6 otherwise
+# caps strings unpacked from a stream at 1MB, which breaks multi-megabyte
+# messages such as large returns.
+MAX_BUFFER_SIZE = 2 ** 31 - 1
+
+# The most a peer which has not proven it holds the session key may have
+# buffered at once, so that an unauthenticated connection cannot make a
+# server hold up to MAX_BUFFER_SIZE bytes of it.
+PRE_AUTH_MAX_BUFFER_SIZE = 10 * 1024 * 1024
+
 
 def frame_msg(body, header=None, raw_body=False):  # pylint: disable=unused-argument
     '''
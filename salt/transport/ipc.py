@@ -177,10 +177,10 @@ class IPCServer(object):
             encoding = None
         else:
             encoding = 'utf-8'
-        unpacker = msgpack.Unpacker(encoding=encoding)
+        unpacker = msgpack.Unpacker(encoding=encoding, max_buffer_size=salt.transport.frame.MAX_BUFFER_SIZE)
         while not stream.closed():
             try:
-                wire_bytes = yield stream.read_bytes(4096, partial=True)
+                wire_bytes = yield stream.read_bytes(salt.transport.frame.READ_SIZE, partial=True)
                 unpacker.feed(wire_bytes)
                 for framed_msg in unpacker:
                     body = framed_msg['body']
@@ -296,7 +296,7 @@ class IPCClient(object):
             encoding = None
         else:
             encoding = 'utf-8'
-        self.unpacker = msgpack.Unpacker(encoding=encoding)
+        self.unpacker = msgpack.Unpacker(encoding=encoding, max_buffer_size=salt.transport.frame.MAX_BUFFER_SIZE)
 
     def __init__(self, socket_path, io_loop=None):
         # Handled by singleton __new__
@@ -536,6 +536,8 @@ class IPCMessagePublisher(object):
         self.io_loop = io_loop or IOLoop.current()
         self._closing = False
         self.streams = set()
+        # stream -> tuple of the tag prefixes its subscriber registered
+        self.stream_filters = {}
 
     def start(self):
         '''
@@ -580,9 +582,41 @@ class IPCMessagePublisher(object):
                 stream.close()
             self.streams.discard(stream)
 
-    def publish(self, msg):
+    @tornado.gen.coroutine
+    def _read_tag_filter(self, stream):
         '''
-        Send message to all connected sockets
+        Read the tag prefixes the subscriber on the other end of the stream
+        registers, a list of prefixes or None to receive every message
+        '''
+        if six.PY2:
+            encoding = None
+        else:
+            encoding = 'utf-8'
+        unpacker = msgpack.Unpacker(encoding=encoding, max_buffer_size=salt.transport.frame.MAX_BUFFER_SIZE)
+        try:
+            while not stream.closed():
+                wire_bytes = yield stream.read_bytes(salt.transport.frame.READ_SIZE, partial=True)
+                unpacker.feed(wire_bytes)
+                for framed_msg in unpacker:
+                    body = framed_msg['body']
+                    if not isinstance(body, dict) or 'tags' not in body:
+                        continue
+                    if body['tags'] is None:
+                        self.stream_filters.pop(stream, None)
+                    else:
+                        self.stream_filters[stream] = tuple(body['tags'])
+        except tornado.iostream.StreamClosedError:
+            pass
+        except Exception as exc:
+            log.error('Exception occurred while reading the tag filter of '
+                      'an IPC subscriber: %s', exc)
+        finally:
+            self.stream_filters.pop(stream, None)
+
+    def publish(self, msg, tag=None):
+        '''
+        Send message to all connected sockets, or when the tag of the message
+        is passed, to the sockets whose subscriber registered a prefix of it
         '''
         if not self.streams:
             return
@@ -590,6 +624,9 @@ class IPCMessagePublisher(object):
         pack = salt.transport.frame.frame_msg_ipc(msg, raw_body=True)
 
         for stream in self.streams:
+            if tag is not None and stream in self.stream_filters \
+                    and not tag.startswith(self.stream_filters[stream]):
+                continue
             self.io_loop.spawn_callback(self._write, stream, pack)
 
     def handle_connection(self, connection, address):
@@ -608,8 +645,10 @@ class IPCMessagePublisher(object):
 
             def discard_after_closed():
                 self.streams.discard(stream)
+                self.stream_filters.pop(stream, None)
 
             stream.set_close_callback(discard_after_closed)
+            self.io_loop.spawn_callback(self._read_tag_filter, stream)
         except Exception as exc:
             log.error('IPC streaming error: %s', exc)
 
@@ -625,6 +664,7 @@ class IPCMessagePublisher(object):
         for stream in self.streams:
             stream.close()
         self.streams.clear()
+        self.stream_filters.clear()
         if hasattr(self.sock, 'close'):
             self.sock.close()
 
@@ -680,6 +720,49 @@ class IPCMessageSubscriber(IPCClient):
         self._sync_read_in_progress = Semaphore()
         self.callbacks = set()
         self.reading = False
+        self.tag_filter = None
+
+    def connect(self, callback=None, timeout=None):
+        '''
+        Connect to the IPC socket, and register the tag filter with the
+        publisher once connected
+        '''
+        future = super(IPCMessageSubscriber, self).connect(callback=callback, timeout=timeout)
+        if self.tag_filter is not None:
+            future.add_done_callback(
+                lambda future: self.io_loop.spawn_callback(self._send_tag_filter))
+        return future
+
+    def filter_tags(self, tags):
+        '''
+        Only receive the messages whose tag starts with one of the prefixes,
+        or every message when ``tags`` is None. The publisher starts applying
+        the filter shortly after this returns, so messages which do not match
+        may still be received for a while.
+
+        The subscriber is shared by everything using the same socket path and
+        IO loop, so the filter must cover what all of them read.
+        '''
+        if tags is not None:
+            tags = sorted(set(tags))
+        if tags == self.tag_filter:
+            return
+        self.tag_filter = tags
+        if self.connected():
+            self.io_loop.spawn_callback(self._send_tag_filter)
+
+    @tornado.gen.coroutine
+    def _send_tag_filter(self):
+        if not self.connected():
+            return
+        try:
+            yield self.stream.write(
+                salt.transport.frame.frame_msg_ipc({'tags': self.tag_filter}))
+        except tornado.iostream.StreamClosedError:
+            log.trace('Subscriber disconnected from IPC %s', self.socket_path)
+        except Exception as exc:
+            log.error('Exception occurred while sending the tag filter of a '
+                      'Subscriber: %s', exc)
 
     @tornado.gen.coroutine
     def _read_sync(self, timeout):
@@ -690,7 +773,7 @@ class IPCMessageSubscriber(IPCClient):
         try:
             while True:
                 if self._read_stream_future is None:
-                    self._read_stream_future = self.stream.read_bytes(4096, partial=True)
+                    self._read_stream_future = self.stream.read_bytes(salt.transport.frame.READ_SIZE, partial=True)
 
                 if timeout is None:
                     wire_bytes = yield self._read_stream_future
@@ -766,7 +849,7 @@ class IPCMessageSubscriber(IPCClient):
     def _read_async(self, callback):
         while not self.stream.closed():
             try:
-                self._read_stream_future = self.stream.read_bytes(4096, partial=True)
+                self._read_stream_future = self.stream.read_bytes(salt.transport.frame.READ_SIZE, partial=True)
                 self.reading = True
                 wire_bytes = yield self._read_stream_future
                 self._read_stream_future = None
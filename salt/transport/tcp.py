@@ -693,6 +693,11 @@ class TCPReqServerChannel(salt.transport.mixins.auth.AESReqServerMixin, salt.tra
                     'payload and load must be a dict', header=header))
                 raise tornado.gen.Return()
 
+            if payload['enc'] == 'aes':
+                # The client holds the session key, lift the buffer limit of
+                # its stream so it can send large loads such as job returns
+                self.req_server.set_authenticated(stream)
+
             try:
                 id_ = payload['load'].get('id', '')
                 if str('\0') in id_:
@@ -754,14 +759,25 @@ class SaltMessageServer(tornado.tcpserver.TCPServer, object):
     '''
     Raw TCP server which will receive all of the TCP streams and re-assemble
     messages that are sent through to us
+
+    Until the message handler reports a stream as authenticated, the partial
+    message buffered for it may not exceed PRE_AUTH_MAX_BUFFER_SIZE, and the
+    stream is closed when it does.
     '''
     def __init__(self, message_handler, *args, **kwargs):
         super(SaltMessageServer, self).__init__(*args, **kwargs)
         self.io_loop = tornado.ioloop.IOLoop.current()
 
         self.clients = []
+        self.authenticated = set()
         self.message_handler = message_handler
 
+    def set_authenticated(self, stream):
+        '''
+        Allow the stream to send messages up to MAX_BUFFER_SIZE
+        '''
+        self.authenticated.add(stream)
+
     @tornado.gen.coroutine
     def handle_stream(self, stream, address):
         '''
@@ -769,10 +785,22 @@ class SaltMessageServer(tornado.tcpserver.TCPServer, object):
         '''
         log.trace('Req client %s connected', address)
         self.clients.append((stream, address))
-        unpacker = msgpack.Unpacker()
+        unpacker = msgpack.Unpacker(max_buffer_size=salt.transport.frame.MAX_BUFFER_SIZE)
+        fed = 0
         try:
             while True:
-                wire_bytes = yield stream.read_bytes(4096, partial=True)
+                wire_bytes = yield stream.read_bytes(salt.transport.frame.READ_SIZE, partial=True)
+                fed += len(wire_bytes)
+                if stream not in self.authenticated \
+                        and fed - unpacker.tell() > salt.transport.frame.PRE_AUTH_MAX_BUFFER_SIZE:
+                    log.warning(
+                        'Req client %s sent more than %s bytes of a message '
+                        'before authenticating, closing the connection',
+                        address, salt.transport.frame.PRE_AUTH_MAX_BUFFER_SIZE
+                    )
+                    self.clients.remove((stream, address))
+                    stream.close()
+                    break
                 unpacker.feed(wire_bytes)
                 for framed_msg in unpacker:
                     if six.PY3:
@@ -789,6 +817,8 @@ class SaltMessageServer(tornado.tcpserver.TCPServer, object):
             log.trace('other master-side exception: %s', e)
             self.clients.remove((stream, address))
             stream.close()
+        finally:
+            self.authenticated.discard(stream)
 
     def shutdown(self):
         '''
@@ -1040,10 +1070,10 @@ class SaltMessageClient(object):
                     not self._connecting_future.done() or
                     self._connecting_future.result() is not True):
                 yield self._connecting_future
-            unpacker = msgpack.Unpacker()
+            unpacker = msgpack.Unpacker(max_buffer_size=salt.transport.frame.MAX_BUFFER_SIZE)
             while not self._closing:
                 try:
-                    self._read_until_future = self._stream.read_bytes(4096, partial=True)
+                    self._read_until_future = self._stream.read_bytes(salt.transport.frame.READ_SIZE, partial=True)
                     wire_bytes = yield self._read_until_future
                     unpacker.feed(wire_bytes)
                     for framed_msg in unpacker:
@@ -1224,29 +1254,95 @@ class Subscriber(object):
         self.close()
 
 
+def _presence_events(opts):
+    '''
+    Return True if the TCP publisher fires the presence events, which it only
+    does when every configured transport is TCP. Otherwise the 'Maintenance'
+    process handles them.
+    '''
+    if not opts.get('presence_events', False):
+        return False
+    for transport, _ in iter_transport_opts(opts):
+        if transport != 'tcp':
+            return False
+    return True
+
+
+class ShardPresence(object):
+    '''
+    Merge the minions connected to each publish shard, so that the presence
+    events list every minion connected to the master and not only those of the
+    shard where a minion connected or disconnected
+    '''
+    def __init__(self, opts):
+        self.event = salt.utils.event.get_event(
+            'master',
+            opts=opts,
+            listen=False
+        )
+        self.shards = {}
+        # The number of shards each minion is connected to
+        self.present = {}
+
+    def update(self, data):
+        '''
+        Apply a change of the minions connected to a shard, and fire the
+        presence events if the minions connected to the master changed
+        '''
+        connected = self.shards.setdefault(data['shard'], set())
+        new = []
+        lost = []
+        if data.get('reset'):
+            # The shard restarted and lost its connections
+            for id_ in connected:
+                self._remove(id_, lost)
+            connected.clear()
+        for id_ in data.get('new', ()):
+            if id_ not in connected:
+                connected.add(id_)
+                self.present[id_] = self.present.get(id_, 0) + 1
+                if self.present[id_] == 1:
+                    new.append(id_)
+        for id_ in data.get('lost', ()):
+            if id_ in connected:
+                connected.remove(id_)
+                self._remove(id_, lost)
+        if new or lost:
+            self.event.fire_event(
+                {'new': new, 'lost': lost},
+                salt.utils.event.tagify('change', 'presence')
+            )
+            self.event.fire_event(
+                {'present': list(self.present.keys())},
+                salt.utils.event.tagify('present', 'presence')
+            )
+
+    def _remove(self, id_, lost):
+        self.present[id_] -= 1
+        if not self.present[id_]:
+            del self.present[id_]
+            lost.append(id_)
+
+
 class PubServer(tornado.tcpserver.TCPServer, object):
     '''
     TCP publisher
     '''
-    def __init__(self, opts, io_loop=None):
+    def __init__(self, opts, io_loop=None, shard=0, sharded=False):
         super(PubServer, self).__init__(ssl_options=opts.get('ssl'))
         self.io_loop = io_loop
         self.opts = opts
+        self.shard = shard
+        self.sharded = sharded
         self._closing = False
         self.clients = set()
+        self.publishes = 0
+        # Writes handed to the subscriber streams and not yet flushed
+        self.backlog = 0
+        self.backlog_bytes = 0
         self.aes_funcs = salt.master.AESFuncs(self.opts)
         self.present = {}
-        self.presence_events = False
-        if self.opts.get('presence_events', False):
-            tcp_only = True
-            for transport, _ in iter_transport_opts(self.opts):
-                if transport != 'tcp':
-                    tcp_only = False
-            if tcp_only:
-                # Only when the transport is TCP only, the presence events will
-                # be handled here. Otherwise, it will be handled in the
-                # 'Maintenance' process.
-                self.presence_events = True
+        self.presence_events = _presence_events(self.opts)
 
         if self.presence_events:
             self.event = salt.utils.event.get_event(
@@ -1254,6 +1350,12 @@ class PubServer(tornado.tcpserver.TCPServer, object):
                 opts=self.opts,
                 listen=False
             )
+            if self.sharded:
+                # Drop the minions the shard had before it restarted
+                self.event.fire_event(
+                    {'shard': self.shard, 'reset': True},
+                    salt.utils.event.tagify(['shard', self.shard], 'presence')
+                )
 
     def close(self):
         if self._closing:
@@ -1263,6 +1365,26 @@ class PubServer(tornado.tcpserver.TCPServer, object):
     def __del__(self):
         self.close()
 
+    def _fire_presence(self, new, lost):
+        if self.sharded:
+            # The shard dispatcher merges the minions of all the shards
+            self.event.fire_event(
+                {'shard': self.shard, 'new': new, 'lost': lost},
+                salt.utils.event.tagify(['shard', self.shard], 'presence')
+            )
+            return
+        data = {'new': new,
+                'lost': lost}
+        self.event.fire_event(
+            data,
+            salt.utils.event.tagify('change', 'presence')
+        )
+        data = {'present': list(self.present.keys())}
+        self.event.fire_event(
+            data,
+            salt.utils.event.tagify('present', 'presence')
+        )
+
     def _add_client_present(self, client):
         id_ = client.id_
         if id_ in self.present:
@@ -1271,17 +1393,7 @@ class PubServer(tornado.tcpserver.TCPServer, object):
         else:
             self.present[id_] = {client}
             if self.presence_events:
-                data = {'new': [id_],
-                        'lost': []}
-                self.event.fire_event(
-                    data,
-                    salt.utils.event.tagify('change', 'presence')
-                )
-                data = {'present': list(self.present.keys())}
-                self.event.fire_event(
-                    data,
-                    salt.utils.event.tagify('present', 'presence')
-                )
+                self._fire_presence([id_], [])
 
     def _remove_client_present(self, client):
         id_ = client.id_
@@ -1302,24 +1414,15 @@ class PubServer(tornado.tcpserver.TCPServer, object):
         if not clients:
             del self.present[id_]
             if self.presence_events:
-                data = {'new': [],
-                        'lost': [id_]}
-                self.event.fire_event(
-                    data,
-                    salt.utils.event.tagify('change', 'presence')
-                )
-                data = {'present': list(self.present.keys())}
-                self.event.fire_event(
-                    data,
-                    salt.utils.event.tagify('present', 'presence')
-                )
+                self._fire_presence([], [id_])
 
     @tornado.gen.coroutine
     def _stream_read(self, client):
-        unpacker = msgpack.Unpacker()
+        # Subscribers only send their id and token
+        unpacker = msgpack.Unpacker(max_buffer_size=salt.transport.frame.PRE_AUTH_MAX_BUFFER_SIZE)
         while not self._closing:
             try:
-                client._read_until_future = client.stream.read_bytes(4096, partial=True)
+                client._read_until_future = client.stream.read_bytes(salt.transport.frame.READ_SIZE, partial=True)
                 wire_bytes = yield client._read_until_future
                 unpacker.feed(wire_bytes)
                 for framed_msg in unpacker:
@@ -1345,6 +1448,14 @@ class PubServer(tornado.tcpserver.TCPServer, object):
                 self._remove_client_present(client)
                 self.clients.discard(client)
                 break
+            except msgpack.BufferFull:
+                log.warning('Subscriber %s sent a message larger than %s '
+                            'bytes, closing the connection', client.address,
+                            salt.transport.frame.PRE_AUTH_MAX_BUFFER_SIZE)
+                client.close()
+                self._remove_client_present(client)
+                self.clients.discard(client)
+                break
             except Exception as e:
                 log.error('Exception parsing response from %s', client.address, exc_info=True)
                 continue
@@ -1355,11 +1466,39 @@ class PubServer(tornado.tcpserver.TCPServer, object):
         self.clients.add(client)
         self.io_loop.spawn_callback(self._stream_read, client)
 
+    def _write(self, client, payload):
+        '''
+        Write the packed payload to a subscriber, counting it in the backlog
+        until the stream has flushed it
+        '''
+        f = client.stream.write(payload)
+        self.backlog += 1
+        self.backlog_bytes += len(payload)
+
+        def _flushed(f):
+            self.backlog -= 1
+            self.backlog_bytes -= len(payload)
+        self.io_loop.add_future(f, _flushed)
+
+    def stats(self):
+        '''
+        Return the subscriber and backlog counters of this publisher
+        '''
+        return {'shard': self.shard,
+                'clients': len(self.clients),
+                'present': len(self.present),
+                'publishes': self.publishes,
+                'backlog': self.backlog,
+                'backlog_bytes': self.backlog_bytes}
+
     # TODO: ACK the publish through IPC
     @tornado.gen.coroutine
     def publish_payload(self, package, _):
-        log.debug('TCP PubServer sending payload: %s', package)
-        payload = salt.transport.frame.frame_msg(package['payload'])
+        # The payload arrives already framed, the same bytes are written to
+        # every subscriber stream
+        payload = package['payload']
+        log.debug('TCP PubServer sending payload. size=%d', len(payload))
+        self.publishes += 1
 
         to_remove = []
         if 'topic_lst' in package:
@@ -1374,8 +1513,7 @@ class PubServer(tornado.tcpserver.TCPServer, object):
                     for client in self.present[topic]:
                         try:
                             # Write the packed str
-                            f = client.stream.write(payload)
-                            self.io_loop.add_future(f, lambda f: True)
+                            self._write(client, payload)
                         except StreamClosedError:
                             to_remove.append(client)
                 else:
@@ -1384,8 +1522,7 @@ class PubServer(tornado.tcpserver.TCPServer, object):
             for client in self.clients:
                 try:
                     # Write the packed str
-                    f = client.stream.write(payload)
-                    self.io_loop.add_future(f, lambda f: True)
+                    self._write(client, payload)
                 except StreamClosedError:
                     to_remove.append(client)
         for client in to_remove:
@@ -1415,11 +1552,11 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         return {'opts': self.opts,
                 'secrets': salt.master.SMaster.secrets}
 
-    def _publish_daemon(self, **kwargs):
+    def _setup_process(self, name, kwargs):
         '''
-        Bind to the interface specified in the configuration file
+        Set up logging and the io loop in a freshly started publisher process
         '''
-        salt.utils.process.appendproctitle(self.__class__.__name__)
+        salt.utils.process.appendproctitle(name)
 
         log_queue = kwargs.get('log_queue')
         if log_queue is not None:
@@ -1433,10 +1570,35 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         if self.io_loop is None:
             self.io_loop = tornado.ioloop.IOLoop.current()
 
-        # Spin up the publisher
-        pub_server = PubServer(self.opts, io_loop=self.io_loop)
+    def _shard_count(self):
+        '''
+        The number of processes the subscriber streams are spread over
+        '''
+        shards = max(int(self.opts.get('tcp_publish_shards', 1)), 1)
+        if shards > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+            log.warning(
+                'tcp_publish_shards is set to %s but this platform does not '
+                'support SO_REUSEPORT, publishing from a single process',
+                shards
+            )
+            shards = 1
+        return shards
+
+    def _shard_uri(self):
+        if self.opts.get('ipc_mode', '') == 'tcp':
+            return int(self.opts.get('tcp_master_publish_shards', 4516))
+        return os.path.join(self.opts['sock_dir'], 'publish_shards.ipc')
+
+    def _start_pub_server(self, pub_server, shared=False):
+        '''
+        Bind the publish port and hand it to the PubServer. Sharded publishers
+        all bind the port and the kernel spreads the minion connections
+        between them.
+        '''
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if shared:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         _set_tcp_keepalive(sock, self.opts)
         sock.setblocking(0)
         sock.bind((self.opts['interface'], int(self.opts['publish_port'])))
@@ -1444,6 +1606,46 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         # pub_server will take ownership of the socket
         pub_server.add_socket(sock)
 
+        if self.opts.get('master_stats'):
+            event = salt.utils.event.get_master_event(self.opts, self.opts['sock_dir'], listen=False)
+
+            def _fire_stats():
+                event.fire_event(
+                    pub_server.stats(),
+                    salt.utils.event.tagify('publish_shard_{0}'.format(pub_server.shard), 'stats')
+                )
+            with salt.utils.asynchronous.current_ioloop(self.io_loop):
+                tornado.ioloop.PeriodicCallback(
+                    _fire_stats,
+                    self.opts['master_stats_event_iter'] * 1000
+                ).start()
+
+    def _publish_daemon(self, **kwargs):
+        '''
+        Bind to the interface specified in the configuration file
+        '''
+        self._setup_process(self.__class__.__name__, kwargs)
+
+        if self._shard_count() > 1:
+            # Hand every publish to the shard processes, which hold the
+            # subscriber streams
+            shard_pub = salt.transport.ipc.IPCMessagePublisher(
+                self.opts,
+                self._shard_uri(),
+                io_loop=self.io_loop,
+            )
+            log.info('Starting the Salt Publisher shard dispatcher on %s', self._shard_uri())
+            with salt.utils.files.set_umask(0o177):
+                shard_pub.start()
+            payload_handler = lambda package, _: shard_pub.publish(package)
+            if _presence_events(self.opts):
+                self._merge_shard_presence()
+        else:
+            # Spin up the publisher
+            pub_server = PubServer(self.opts, io_loop=self.io_loop)
+            self._start_pub_server(pub_server)
+            payload_handler = pub_server.publish_payload
+
         # Set up Salt IPC server
         if self.opts.get('ipc_mode', '') == 'tcp':
             pull_uri = int(self.opts.get('tcp_master_publish_pull', 4514))
@@ -1454,7 +1656,7 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
             self.opts,
             pull_uri,
             io_loop=self.io_loop,
-            payload_handler=pub_server.publish_payload,
+            payload_handler=payload_handler,
         )
 
         # Securely create socket
@@ -1468,6 +1670,61 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         except (KeyboardInterrupt, SystemExit):
             salt.log.setup.shutdown_multiprocessing_logging()
 
+    def _merge_shard_presence(self):
+        '''
+        Fire the presence events of the master from the changes of the minions
+        connected to each shard
+        '''
+        prefix = salt.utils.event.tagify('shard', 'presence') + '/'
+        presence = ShardPresence(self.opts)
+        event = salt.utils.event.get_event(
+            'master',
+            opts=self.opts,
+            io_loop=self.io_loop,
+            listen=True
+        )
+        event.filter_tags([prefix])
+
+        def _handle_event(raw):
+            tag, data = event.unpack(raw, event.serial)
+            if tag.startswith(prefix):
+                presence.update(data)
+        event.set_event_handler(_handle_event)
+
+    @tornado.gen.coroutine
+    def _read_shard_publishes(self, subscriber, shard):
+        '''
+        Hand the publishes of the shard dispatcher to the shard PubServer,
+        connecting to the dispatcher again whenever the connection is lost
+        '''
+        while True:
+            yield subscriber.read_async()
+            log.warning(
+                'Publish shard %s lost its connection to the shard dispatcher '
+                'on %s, reconnecting', shard, self._shard_uri()
+            )
+            yield tornado.gen.sleep(1)
+
+    def _publish_shard(self, shard, **kwargs):
+        '''
+        Serve a share of the minion connections, publishing what the shard
+        dispatcher in the publish daemon sends
+        '''
+        self._setup_process('{0}-Shard-{1}'.format(self.__class__.__name__, shard), kwargs)
+
+        pub_server = PubServer(self.opts, io_loop=self.io_loop, shard=shard, sharded=True)
+        self._start_pub_server(pub_server, shared=True)
+
+        subscriber = salt.transport.ipc.IPCMessageSubscriber(self._shard_uri(), io_loop=self.io_loop)
+        subscriber.callbacks.add(lambda package: pub_server.publish_payload(package, None))
+        self.io_loop.spawn_callback(self._read_shard_publishes, subscriber, shard)
+
+        # run forever
+        try:
+            self.io_loop.start()
+        except (KeyboardInterrupt, SystemExit):
+            salt.log.setup.shutdown_multiprocessing_logging()
+
     def pre_fork(self, process_manager, kwargs=None):
         '''
         Do anything necessary pre-fork. Since this is on the master side this will
@@ -1475,6 +1732,10 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         do the actual publishing
         '''
         process_manager.add_process(self._publish_daemon, kwargs=kwargs)
+        shards = self._shard_count()
+        if shards > 1:
+            for shard in range(shards):
+                process_manager.add_process(self._publish_shard, args=(shard,), kwargs=kwargs)
 
     def publish(self, load):
         '''
@@ -1501,7 +1762,8 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         )
         pub_sock.connect()
 
-        int_payload = {'payload': self.serial.dumps(payload)}
+        # Frame the payload here so the publisher does not repack it
+        int_payload = {'payload': salt.transport.frame.frame_msg(self.serial.dumps(payload))}
 
         # add some targeting stuff for lists only (for now)
         if load['tgt_type'] == 'list':
@@ -12,6 +12,7 @@ import errno
 import signal
 import socket
 import hashlib
+import time
 import logging
 import weakref
 import threading
@@ -831,6 +832,42 @@ def _set_tcp_keepalive(zmq_socket, opts):
             )
 
 
+class PublishLatencyHistogram(object):
+    '''
+    Track the time between a load being handed to ``publish`` and the publish
+    daemon sending it to the minions, bucketed by upper bound in seconds
+    '''
+    BOUNDS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self):
+        self.clock = time.time()
+        self.reset()
+
+    def reset(self):
+        self.buckets = [0] * (len(self.BOUNDS) + 1)
+        self.runs = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency):
+        idx = 0
+        for bound in self.BOUNDS:
+            if latency <= bound:
+                break
+            idx += 1
+        self.buckets[idx] += 1
+        self.runs += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def stats(self):
+        labels = ['le_{0}'.format(bound) for bound in self.BOUNDS] + ['inf']
+        return {'runs': self.runs,
+                'mean': self.total / self.runs if self.runs else 0,
+                'max': self.max,
+                'histogram': dict(zip(labels, self.buckets))}
+
+
 class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
     '''
     Encapsulate synchronous operations for a publisher channel
@@ -842,6 +879,20 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
         self.opts = opts
         self.serial = salt.payload.Serial(self.opts)  # TODO: in init?
         self.ckminions = salt.utils.minions.CkMinions(self.opts)
+        self._crypticle = None
+        self._crypticle_key = None
+
+    @property
+    def crypticle(self):
+        '''
+        The Crypticle for the current AES key, rebuilt only when the key
+        is rotated
+        '''
+        key = salt.master.SMaster.secrets['aes']['secret'].value
+        if self._crypticle is None or key != self._crypticle_key:
+            self._crypticle = salt.crypt.Crypticle(self.opts, key)
+            self._crypticle_key = key
+        return self._crypticle
 
     def connect(self):
         return tornado.gen.sleep(5)
@@ -898,49 +949,69 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
         with salt.utils.files.set_umask(0o177):
             pull_sock.bind(pull_uri)
 
+        stats = event = None
+        if self.opts.get('master_stats'):
+            stats = PublishLatencyHistogram()
+            event = salt.utils.event.get_master_event(self.opts, self.opts['sock_dir'], listen=False)
+
         try:
             while True:
                 # Catch and handle EINTR from when this process is sent
                 # SIGUSR1 gracefully so we don't choke and die horribly
                 try:
                     log.debug('Publish daemon getting data from puller %s', pull_uri)
-                    package = pull_sock.recv()
-                    log.debug('Publish daemon received payload. size=%d', len(package))
-
-                    unpacked_package = salt.payload.unpackage(package)
-                    if six.PY3:
-                        unpacked_package = salt.transport.frame.decode_embedded_strs(unpacked_package)
-                    payload = unpacked_package['payload']
+                    frames = pull_sock.recv_multipart(copy=False)
+                    if len(frames) == 1:
+                        # A single frame package from an older publisher,
+                        # split it into the header and the payload
+                        unpacked_package = salt.payload.unpackage(frames[0].bytes)
+                        if six.PY3:
+                            unpacked_package = salt.transport.frame.decode_embedded_strs(unpacked_package)
+                        payload = unpacked_package.pop('payload')
+                        header = unpacked_package
+                        if 'topic_lst' in header:
+                            header['topic_lst'] = [
+                                hashlib.sha1(salt.utils.stringutils.to_bytes(topic)).hexdigest()
+                                for topic in header['topic_lst']
+                            ]
+                    else:
+                        # Only the small header frame is decoded, the payload
+                        # is forwarded to the minions untouched
+                        header = self.serial.loads(frames[0].bytes)
+                        payload = frames[1]
+                    log.debug('Publish daemon received payload. size=%d', len(payload))
                     log.trace('Accepted unpacked package from puller')
                     if self.opts['zmq_filtering']:
                         # if you have a specific topic list, use that
-                        if 'topic_lst' in unpacked_package:
-                            for topic in unpacked_package['topic_lst']:
-                                log.trace('Sending filtered data over publisher %s', pub_uri)
-                                # zmq filters are substring match, hash the topic
-                                # to avoid collisions
-                                htopic = salt.utils.stringutils.to_bytes(hashlib.sha1(topic).hexdigest())
-                                pub_sock.send(htopic, flags=zmq.SNDMORE)
-                                pub_sock.send(payload)
-                                log.trace('Filtered data has been sent')
+                        if 'topic_lst' in header:
+                            log.trace('Sending filtered data over publisher %s', pub_uri)
+                            for htopic in header['topic_lst']:
+                                # The topics have been hashed by the publisher
+                                # since zmq filters are substring match
+                                pub_sock.send(salt.utils.stringutils.to_bytes(htopic), flags=zmq.SNDMORE)
+                                pub_sock.send(payload, copy=False)
+                            log.trace('Filtered data has been sent')
 
                             # Syndic broadcast
                             if self.opts.get('order_masters'):
                                 log.trace('Sending filtered data to syndic')
                                 pub_sock.send(b'syndic', flags=zmq.SNDMORE)
-                                pub_sock.send(payload)
+                                pub_sock.send(payload, copy=False)
                                 log.trace('Filtered data has been sent to syndic')
                         # otherwise its a broadcast
                         else:
                             # TODO: constants file for "broadcast"
                             log.trace('Sending broadcasted data over publisher %s', pub_uri)
                             pub_sock.send(b'broadcast', flags=zmq.SNDMORE)
-                            pub_sock.send(payload)
+                            pub_sock.send(payload, copy=False)
                             log.trace('Broadcasted data has been sent')
                     else:
                         log.trace('Sending ZMQ-unfiltered data over publisher %s', pub_uri)
-                        pub_sock.send(payload)
+                        pub_sock.send(payload, copy=False)
                         log.trace('Unfiltered data has been sent')
+                    if stats is not None and 'ts' in header:
+                        stats.add(time.time() - header['ts'])
+                        self._post_stats(stats, event)
                 except zmq.ZMQError as exc:
                     if exc.errno == errno.EINTR:
                         continue
@@ -955,6 +1026,21 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
             pull_sock.close()
         if context.closed is False:
             context.term()
+        if event is not None:
+            event.destroy()
+
+    def _post_stats(self, stats, event):
+        '''
+        Fire an event with the publish latency histogram if it's time
+        '''
+        end_time = time.time()
+        if end_time - stats.clock > self.opts['master_stats_event_iter']:
+            event.fire_event({'time': end_time - stats.clock,
+                              'worker': self.__class__.__name__,
+                              'latency': stats.stats()},
+                             salt.utils.event.tagify('publish_daemon', 'stats'))
+            stats.reset()
+            stats.clock = end_time
 
     def pre_fork(self, process_manager, kwargs=None):
         '''
@@ -1017,38 +1103,46 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
 
         :param dict load: A load to be sent across the wire to minions
         '''
+        start = time.time()
         payload = {'enc': 'aes'}
-        crypticle = salt.crypt.Crypticle(self.opts, salt.master.SMaster.secrets['aes']['secret'].value)
-        payload['load'] = crypticle.dumps(load)
+        payload['load'] = self.crypticle.dumps(load)
         if self.opts['sign_pub_messages']:
             master_pem_path = os.path.join(self.opts['pki_dir'], 'master.pem')
             log.debug("Signing data packet")
             payload['sig'] = salt.crypt.sign_message(master_pem_path, payload['load'])
-        int_payload = {'payload': self.serial.dumps(payload)}
-
-        # add some targeting stuff for lists only (for now)
-        if load['tgt_type'] == 'list':
-            int_payload['topic_lst'] = load['tgt']
-
-        # If zmq_filtering is enabled, target matching has to happen master side
-        match_targets = ["pcre", "glob", "list"]
-        if self.opts['zmq_filtering'] and load['tgt_type'] in match_targets:
-            # Fetch a list of minions that match
-            _res = self.ckminions.check_minions(load['tgt'],
-                                                tgt_type=load['tgt_type'])
-            match_ids = _res['minions']
-
-            log.debug("Publish Side Match: %s", match_ids)
-            # Send list of miions thru so zmq can target them
-            int_payload['topic_lst'] = match_ids
-        payload = self.serial.dumps(int_payload)
+        payload = self.serial.dumps(payload)
+        header = {'ts': start}
+
+        if self.opts['zmq_filtering']:
+            topic_lst = None
+            # add some targeting stuff for lists only (for now)
+            if load['tgt_type'] == 'list':
+                topic_lst = load['tgt']
+
+            # If zmq_filtering is enabled, target matching has to happen master side
+            match_targets = ["pcre", "glob", "list"]
+            if load['tgt_type'] in match_targets:
+                # Fetch a list of minions that match
+                _res = self.ckminions.check_minions(load['tgt'],
+                                                    tgt_type=load['tgt_type'])
+                topic_lst = _res['minions']
+                log.debug("Publish Side Match: %s", topic_lst)
+
+            if topic_lst is not None:
+                # Send the hashed list of minions thru so zmq can target them,
+                # hashing here spreads the work over the calling processes
+                # rather than the single publish daemon
+                header['topic_lst'] = [
+                    hashlib.sha1(salt.utils.stringutils.to_bytes(topic)).hexdigest()
+                    for topic in topic_lst
+                ]
         log.debug(
             'Sending payload to publish daemon. jid=%s size=%d',
             load.get('jid', None), len(payload),
         )
         if not self.pub_sock:
             self.pub_connect()
-        self.pub_sock.send(payload)
+        self.pub_sock.send_multipart([self.serial.dumps(header), payload], copy=False)
         log.debug('Sent payload to publish daemon.')
 
 
@@ -55,11 +55,14 @@ from __future__ import absolute_import, unicode_literals, print_function
 # Import python libs
 import os
 import time
+import re
 import fnmatch
 import hashlib
 import logging
 import datetime
 import sys
+import threading
+import collections
 
 try:
     from collections.abc import MutableMapping
@@ -78,6 +81,7 @@ import tornado.iostream
 import salt.config
 import salt.payload
 import salt.utils.asynchronous
+import salt.utils.atomicfile
 import salt.utils.cache
 import salt.utils.dicttrim
 import salt.utils.files
@@ -201,6 +205,33 @@ def tagify(suffix='', prefix='', base=SALT):
     return TAGPARTER.join([part for part in parts if part])
 
 
+def tag_prefixes(patterns):
+    '''
+    Return the literal prefixes of a list of glob patterns, which the tags the
+    patterns match start with, or None when a pattern may match any tag
+    '''
+    prefixes = set()
+    for pattern in patterns:
+        prefix = re.split(r'[*?[]', pattern, 1)[0]
+        if not prefix:
+            return None
+        prefixes.add(prefix)
+    return sorted(prefixes)
+
+
+def _package_tag(package):
+    '''
+    Return the tag of a packed event, None if it can not be found
+    '''
+    if isinstance(package, six.text_type):
+        tag, sep, _ = package.partition(TAGEND)
+    else:
+        tag, sep, _ = package.partition(salt.utils.stringutils.to_bytes(TAGEND))
+    if not sep:
+        return None
+    return salt.utils.stringutils.to_str(tag)
+
+
 def update_stats(stats, start_time, data):
     '''
     Calculate the master stats and return the updated stat info
@@ -227,6 +258,88 @@ def update_stats(stats, start_time, data):
     return stats
 
 
+class SubscriptionIndex(object):
+    '''
+    An index of event tag subscriptions, returning the subscriptions an event
+    tag matches without running it through every subscribed tag.
+
+    Prefix subscriptions are kept in a trie, walked once per event tag, and
+    exact subscriptions in a dict. Subscriptions using any other match
+    function are checked one after the other.
+    '''
+    PREFIX = 'startswith'
+    EXACT = 'exact'
+
+    def __init__(self):
+        self._trie = {}
+        self._exact = {}
+        self._other = {}
+
+    def add(self, key, tag, match_func, match_type=None):
+        '''
+        Add the subscription ``key`` to the tag, ``match_type`` being
+        ``startswith`` or ``exact`` when ``match_func`` matches the prefix of
+        or the whole event tag
+        '''
+        if match_type == self.PREFIX:
+            node = self._trie
+            for char in tag:
+                node = node.setdefault(char, {})
+            node.setdefault(None, []).append(key)
+        elif match_type == self.EXACT:
+            self._exact.setdefault(tag, []).append(key)
+        else:
+            self._other[key] = (tag, match_func)
+
+    def remove(self, key, tag, match_type=None):
+        '''
+        Remove the subscription ``key`` added with the same tag and match type
+        '''
+        if match_type == self.PREFIX:
+            path = []
+            node = self._trie
+            for char in tag:
+                path.append((node, char))
+                node = node.get(char)
+                if node is None:
+                    return
+            if key in node.get(None, ()):
+                node[None].remove(key)
+                if not node[None]:
+                    del node[None]
+            for parent, char in reversed(path):
+                if parent[char]:
+                    break
+                del parent[char]
+        elif match_type == self.EXACT:
+            if key in self._exact.get(tag, ()):
+                self._exact[tag].remove(key)
+                if not self._exact[tag]:
+                    del self._exact[tag]
+        else:
+            self._other.pop(key, None)
+
+    def match(self, event_tag):
+        '''
+        Return the subscriptions matching the event tag
+        '''
+        node = self._trie
+        ret = list(node.get(None, ()))
+        for char in event_tag:
+            node = node.get(char)
+            if node is None:
+                break
+            ret.extend(node.get(None, ()))
+        ret.extend(self._exact.get(event_tag, ()))
+        for key, (tag, match_func) in six.iteritems(self._other):
+            try:
+                if match_func(event_tag, tag):
+                    ret.append(key)
+            except Exception:
+                log.error('Failed to run a matcher.', exc_info=True)
+        return ret
+
+
 class SaltEvent(object):
     '''
     Warning! Use the get_event function or the code will not be
@@ -277,8 +390,13 @@ class SaltEvent(object):
         if salt.utils.platform.is_windows() and 'ipc_mode' not in opts:
             self.opts['ipc_mode'] = 'tcp'
         self.puburi, self.pulluri = self.__load_uri(sock_dir, node)
-        self.pending_tags = []
-        self.pending_events = []
+        # (tag, match_func) -> [subscribe count, queue of pending events]
+        self.pending_tags = {}
+        self.pending_index = SubscriptionIndex()
+        # seq -> [seq, event, number of subscription queues holding it]
+        self.pending_events = collections.OrderedDict()
+        self._pending_seq = 0
+        self.tag_filter = None
         self.__load_cache_regex()
         if listen and not self.cpub:
             # Only connect to the publisher at initialization time if
@@ -351,7 +469,18 @@ class SaltEvent(object):
         if tag is None:
             return
         match_func = self._get_match_func(match_type)
-        self.pending_tags.append([tag, match_func])
+        key = (tag, match_func)
+        if key in self.pending_tags:
+            self.pending_tags[key][0] += 1
+            return
+        # Queue the events already cached for other subscriptions
+        queue = collections.deque()
+        for entry in six.itervalues(self.pending_events):
+            if match_func(entry[1]['tag'], tag):
+                entry[2] += 1
+                queue.append(entry)
+        self.pending_tags[key] = [1, queue]
+        self.pending_index.add(key, tag, match_func, self._get_index_type(match_func))
 
     def unsubscribe(self, tag, match_type=None):
         '''
@@ -360,14 +489,35 @@ class SaltEvent(object):
         if tag is None:
             return
         match_func = self._get_match_func(match_type)
+        key = (tag, match_func)
+        if key not in self.pending_tags:
+            raise ValueError('{0!r} is not subscribed'.format(tag))
+        self.pending_tags[key][0] -= 1
+        if self.pending_tags[key][0]:
+            return
+        count, queue = self.pending_tags.pop(key)
+        self.pending_index.remove(key, tag, self._get_index_type(match_func))
 
-        self.pending_tags.remove([tag, match_func])
+        # Drop the cached events no other subscription wants
+        for entry in queue:
+            entry[2] -= 1
+            if not entry[2]:
+                self.pending_events.pop(entry[0], None)
 
-        old_events = self.pending_events
-        self.pending_events = []
-        for evt in old_events:
-            if any(pmatch_func(evt['tag'], ptag) for ptag, pmatch_func in self.pending_tags):
-                self.pending_events.append(evt)
+    def filter_tags(self, tags):
+        '''
+        Ask the event publisher to only send the events whose tag starts with
+        one of the prefixes, or every event when ``tags`` is None. The events
+        are then filtered before they are sent out, instead of being unpacked
+        and dropped here.
+
+        Events whose tag does not start with one of the prefixes are never
+        returned, whatever tag is later passed to get_event. Use tag_prefixes
+        to turn glob patterns into prefixes.
+        '''
+        self.tag_filter = tags
+        if self.subscriber is not None:
+            self.subscriber.filter_tags(tags)
 
     def connect_pub(self, timeout=None):
         '''
@@ -383,6 +533,8 @@ class SaltEvent(object):
                     self.puburi,
                     io_loop=self.io_loop
                 )
+                    if self.tag_filter is not None:
+                        self.subscriber.filter_tags(self.tag_filter)
                 try:
                     self.io_loop.run_sync(
                         lambda: self.subscriber.connect(timeout=timeout))
@@ -395,6 +547,8 @@ class SaltEvent(object):
                 self.puburi,
                 io_loop=self.io_loop
             )
+                if self.tag_filter is not None:
+                    self.subscriber.filter_tags(self.tag_filter)
 
             # For the asynchronous case, the connect will be defered to when
             # set_event_handler() is invoked.
@@ -410,7 +564,9 @@ class SaltEvent(object):
 
         self.subscriber.close()
         self.subscriber = None
-        self.pending_events = []
+        self.pending_events.clear()
+        for _, queue in six.itervalues(self.pending_tags):
+            queue.clear()
         self.cpub = False
 
     def connect_pull(self, timeout=1):
@@ -464,32 +620,62 @@ class SaltEvent(object):
             match_type = self.opts['event_match_type']
         return getattr(self, '_match_tag_{0}'.format(match_type), None)
 
+    def _get_index_type(self, match_func):
+        '''
+        Return how the subscription index can look up tags matched with the
+        match function
+        '''
+        if match_func is self._match_tag_startswith:
+            return SubscriptionIndex.PREFIX
+        return None
+
+    def _cache_pending(self, evt):
+        '''
+        Queue an event for every subscription matching its tag, return False
+        if there is none
+        '''
+        keys = self.pending_index.match(evt['tag'])
+        if not keys:
+            return False
+        self._pending_seq += 1
+        # [seq, event, number of subscription queues holding it]
+        entry = [self._pending_seq, evt, len(keys)]
+        self.pending_events[entry[0]] = entry
+        for key in keys:
+            self.pending_tags[key][1].append(entry)
+        return True
+
     def _check_pending(self, tag, match_func=None):
-        """Check the pending_events list for events that match the tag
+        """Check the pending events for the first one that matches the tag
+
+        An event is only returned once, even when more than one subscription
+        matches it.
 
         :param tag: The tag to search for
         :type tag: str
-        :param tags_regex: List of re expressions to search for also
-        :type tags_regex: list[re.compile()]
+        :param match_func: The function matching the event tags with the tag
         :return:
         """
         if match_func is None:
             match_func = self._get_match_func()
-        old_events = self.pending_events
-        self.pending_events = []
-        ret = None
-        for evt in old_events:
-            if match_func(evt['tag'], tag):
-                if ret is None:
-                    ret = evt
-                    log.trace('get_event() returning cached event = %s', ret)
-                else:
-                    self.pending_events.append(evt)
-            elif any(pmatch_func(evt['tag'], ptag) for ptag, pmatch_func in self.pending_tags):
-                self.pending_events.append(evt)
-            else:
-                log.trace('get_event() discarding cached event that no longer has any subscriptions = %s', evt)
-        return ret
+        sub = self.pending_tags.get((tag, match_func))
+        if sub is not None:
+            # The queue of the subscription holds exactly the events matching
+            # the tag, skip the ones returned through another subscription
+            queue = sub[1]
+            while queue:
+                entry = queue.popleft()
+                entry[2] -= 1
+                if self.pending_events.pop(entry[0], None) is not None:
+                    log.trace('get_event() returning cached event = %s', entry[1])
+                    return entry[1]
+            return None
+        for seq, entry in six.iteritems(self.pending_events):
+            if match_func(entry[1]['tag'], tag):
+                del self.pending_events[seq]
+                log.trace('get_event() returning cached event = %s', entry[1])
+                return entry[1]
+        return None
 
     @staticmethod
     def _match_tag_startswith(event_tag, search_tag):
@@ -575,9 +761,8 @@ class SaltEvent(object):
 
             if not match_func(ret['tag'], tag):
                 # tag not match
-                if any(pmatch_func(ret['tag'], ptag) for ptag, pmatch_func in self.pending_tags):
+                if self._cache_pending(ret):
                     log.trace('get_event() caching unwanted event = %s', ret)
-                    self.pending_events.append(ret)
                 if wait:  # only update the wait timeout if we had one
                     wait = timeout_at - time.time()
                 continue
@@ -1047,7 +1232,7 @@ class AsyncEventPublisher(object):
         Get something from epull, publish it out epub, and return the package (or None)
         '''
         try:
-            self.publisher.publish(package)
+            self.publisher.publish(package, tag=_package_tag(package))
             return package
         # Add an extra fallback in case a forked process leeks through
         except Exception:
@@ -1151,7 +1336,7 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
         Get something from epull, publish it out epub, and return the package (or None)
         '''
         try:
-            self.publisher.publish(package)
+            self.publisher.publish(package, tag=_package_tag(package))
             return package
         # Add an extra fallback in case a forked process leeks through
         except Exception:
@@ -1178,6 +1363,210 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
         self.close()
 
 
+def _compile_tag_patterns(patterns):
+    '''
+    Compile a list of glob patterns into a single regular expression matching
+    the tags any of them matches, None if the list is empty
+    '''
+    if not patterns:
+        return None
+    return re.compile('|'.join(
+        '(?:{0})'.format(fnmatch.translate(pattern)) for pattern in patterns))
+
+
+class EventReturnFlusher(threading.Thread):
+    '''
+    A thread which passes the batches of events queued by an EventReturn to a
+    single event returner, so that a slow returner holds up neither the
+    master event bus listener nor the other returners.
+
+    When ``event_return_spool_max`` is set, each batch is written to a spool
+    directory in the master cachedir before it is queued, and only removed
+    once the returner has stored it. Batches the returner fails to store are
+    retried, waiting twice as long after each attempt, and set aside after
+    ``event_return_spool_retries`` attempts. The batches set aside stay in the
+    spool, and are stored again with the other batches left there when the
+    master starts again. When the spool holds more than
+    ``event_return_spool_max`` events, the oldest batches set aside are
+    dropped first, then the oldest batches waiting on the returner.
+    '''
+    # The longest wait between two attempts to store a spooled batch
+    max_retry_interval = 300
+
+    def __init__(self, opts, name, returner):
+        super(EventReturnFlusher, self).__init__(
+            name='EventReturnFlusher({0})'.format(name))
+        self.daemon = True
+        self.opts = opts
+        self.returner_name = name
+        self.returner = returner
+        self.spool_max = opts.get('event_return_spool_max', 0)
+        self.retry_interval = max(opts.get('event_return_flush_interval', 0), 1)
+        self.retries = opts.get('event_return_spool_retries', 10)
+        self.serial = salt.payload.Serial(opts)
+        self.stats = {'events': 0, 'batches': 0, 'failures': 0,
+                      'spooled': 0, 'dropped': 0, 'failed': 0, 'time': 0.0}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._spool = collections.deque()
+        # The batches which failed every attempt, until the next start
+        self._failed = collections.deque()
+        self._seq = 0
+        if self.spool_max:
+            # The queue only carries the names of the spooled batches
+            self.queue = six.moves.queue.Queue()
+            self.spool_dir = os.path.join(opts['cachedir'], 'event_return', name)
+            if not os.path.isdir(self.spool_dir):
+                os.makedirs(self.spool_dir)
+            for fn_ in sorted(os.listdir(self.spool_dir)):
+                if fn_.startswith('.___atomic_write'):
+                    # Left by a write interrupted when the master stopped
+                    try:
+                        os.remove(os.path.join(self.spool_dir, fn_))
+                    except OSError:
+                        pass
+                    continue
+                try:
+                    seq, count = [int(part) for part in fn_[:-2].split('-')]
+                except ValueError:
+                    continue
+                self._seq = max(self._seq, seq)
+                self._spool.append((os.path.join(self.spool_dir, fn_), count))
+                self.queue.put(self._spool[-1])
+                self.stats['spooled'] += count
+        else:
+            # Hold up the listener once a batch is waiting on the returner
+            self.queue = six.moves.queue.Queue(maxsize=1)
+
+    def put(self, events, timeout=None):
+        '''
+        Queue a batch of events for the returner. Without a spool, the batch is
+        dropped if the returner is still busy with the previous one after
+        ``timeout`` seconds.
+        '''
+        if not self.spool_max:
+            try:
+                self.queue.put(list(events), timeout=timeout)
+            except six.moves.queue.Full:
+                self.stats['dropped'] += len(events)
+                log.warning('Event returner \'%s\' is busy, dropped %s events',
+                            self.returner_name, len(events))
+            return
+        with self._lock:
+            self._seq = max(self._seq + 1, int(time.time() * 1000000))
+            item = (os.path.join(self.spool_dir,
+                                 '{0:020d}-{1}.p'.format(self._seq, len(events))),
+                    len(events))
+            with salt.utils.atomicfile.atomic_open(item[0], 'wb') as fp_:
+                self.serial.dump(list(events), fp_)
+            self._spool.append(item)
+            self.stats['spooled'] += len(events)
+            while self.stats['spooled'] > self.spool_max and (
+                    self._failed or len(self._spool) > 1):
+                if self._failed:
+                    path, count = self._failed.popleft()
+                else:
+                    path, count = self._spool.popleft()
+                if self._remove(path, count):
+                    self.stats['dropped'] += count
+                    log.warning('The event return spool of returner \'%s\' is '
+                                'full, dropped %s events', self.returner_name, count)
+        self.queue.put(item)
+
+    def _remove(self, path, count):
+        '''
+        Remove a batch from the spool, the lock must be held
+        '''
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        self.stats['spooled'] -= count
+        return True
+
+    def _fail(self, path, count):
+        '''
+        Set aside a batch the returner could not store until the next start,
+        the lock must be held
+        '''
+        if not os.path.exists(path):
+            # Dropped from the full spool
+            return
+        self._failed.append((path, count))
+        self.stats['failed'] += count
+        log.error('Event returner \'%s\' failed to store %s events %s times, '
+                  'keeping them in %s until the master restarts',
+                  self.returner_name, count, self.retries, self.spool_dir)
+
+    def stop(self, timeout=None):
+        '''
+        Store the queued batches and stop the thread. Batches still queued
+        after the timeout are dropped, or left in the spool for the next start.
+        '''
+        try:
+            self.queue.put(None, timeout=timeout)
+        except six.moves.queue.Full:
+            # The returner is still busy with a batch
+            pass
+        self.join(timeout)
+        self._stopping.set()
+        self.join(1)
+
+    def _store(self, events):
+        '''
+        Pass a batch of events to the returner, return True if it stored them
+        '''
+        start = time.time()
+        try:
+            self.returner(events)
+        except Exception as exc:
+            log.error('Could not store events - returner \'%s\' raised '
+                      'exception: %s', self.returner_name, exc)
+            # don't waste processing power unnecessarily on converting a
+            # potentially huge dataset to a string
+            if log.level <= logging.DEBUG:
+                log.debug('Event data that caused an exception: %s', events)
+            self.stats['failures'] += 1
+            return False
+        finally:
+            self.stats['time'] += time.time() - start
+        self.stats['events'] += len(events)
+        self.stats['batches'] += 1
+        return True
+
+    def run(self):
+        while not self._stopping.is_set():
+            item = self.queue.get()
+            if item is None or self._stopping.is_set():
+                break
+            if not self.spool_max:
+                self._store(item)
+                continue
+            path, count = item
+            try:
+                with salt.utils.files.fopen(path, 'rb') as fp_:
+                    events = self.serial.load(fp_)
+            except (IOError, OSError):
+                # Dropped from the full spool
+                continue
+            stored = self._store(events)
+            attempts = 1
+            wait = self.retry_interval
+            while not stored and (not self.retries or attempts < self.retries):
+                if self._stopping.wait(wait):
+                    return
+                wait = min(wait * 2, self.max_retry_interval)
+                stored = self._store(events)
+                attempts += 1
+            with self._lock:
+                if self._spool and self._spool[0][0] == path:
+                    self._spool.popleft()
+                if stored:
+                    self._remove(path, count)
+                else:
+                    self._fail(path, count)
+
+
 class EventReturn(salt.utils.process.SignalHandlingMultiprocessingProcess):
     '''
     A dedicated process which listens to the master event bus and queues
@@ -1203,10 +1592,17 @@ class EventReturn(salt.utils.process.SignalHandlingMultiprocessingProcess):
 
         self.opts = opts
         self.event_return_queue = self.opts['event_return_queue']
+        self.flush_interval = self.opts.get('event_return_flush_interval', 0)
         local_minion_opts = self.opts.copy()
         local_minion_opts['file_client'] = 'local'
         self.minion = salt.minion.MasterMinion(local_minion_opts)
         self.event_queue = []
+        self.flushers = None
+        self.flush_clock = time.time()
+        self.stat_clock = time.time()
+        self.stats = {'received': 0, 'filtered': 0}
+        self.whitelist = _compile_tag_patterns(self.opts['event_return_whitelist'])
+        self.blacklist = _compile_tag_patterns(self.opts['event_return_blacklist'])
         self.stop = False
 
     # __setstate__ and __getstate__ are only used on Windows.
@@ -1230,42 +1626,73 @@ class EventReturn(salt.utils.process.SignalHandlingMultiprocessingProcess):
     def _handle_signals(self, signum, sigframe):
         # Flush and terminate
         if self.event_queue:
-            self.flush_events()
+            self.flush_events(timeout=self._stop_timeout())
+        self._stop_flushers()
         self.stop = True
         super(EventReturn, self)._handle_signals(signum, sigframe)
 
-    def flush_events(self):
-        if isinstance(self.opts['event_return'], list):
-            # Multiple event returners
-            for r in self.opts['event_return']:
-                log.debug('Calling event returner %s, one of many.', r)
-                event_return = '{0}.event_return'.format(r)
-                self._flush_event_single(event_return)
-        else:
-            # Only a single event returner
-            log.debug('Calling event returner %s, only one configured.',
-                      self.opts['event_return'])
-            event_return = '{0}.event_return'.format(
-                self.opts['event_return']
-                )
-            self._flush_event_single(event_return)
+    def _start_flushers(self):
+        '''
+        Start a flusher thread for each configured event returner
+        '''
+        self.flushers = {}
+        returners = self.opts['event_return']
+        if not isinstance(returners, list):
+            returners = [returners]
+        for name in returners:
+            event_return = '{0}.event_return'.format(name)
+            if event_return not in self.minion.returners:
+                log.error('Could not store return for event(s) - returner '
+                          '\'%s\' not found.', event_return)
+                continue
+            flusher = EventReturnFlusher(self.opts, name,
+                                         self.minion.returners[event_return])
+            flusher.start()
+            self.flushers[name] = flusher
+
+    def _stop_timeout(self):
+        '''
+        The number of seconds to wait on each event returner when stopping
+        '''
+        return self.opts.get('event_return_flush_interval') or 5
+
+    def _stop_flushers(self):
+        '''
+        Let the flusher threads store the queued batches and stop them
+        '''
+        for flusher in six.itervalues(self.flushers or {}):
+            flusher.stop(timeout=self._stop_timeout())
+        self.flushers = {}
+
+    def flush_events(self, timeout=None):
+        '''
+        Hand the queued events to the flusher of each event returner, waiting
+        at most ``timeout`` seconds on a busy returner
+        '''
+        if self.flushers is None:
+            self._start_flushers()
+        for name, flusher in six.iteritems(self.flushers):
+            log.debug('Queueing %s events for event returner %s.',
+                      len(self.event_queue), name)
+            flusher.put(self.event_queue, timeout=timeout)
         del self.event_queue[:]
+        self.flush_clock = time.time()
 
-    def _flush_event_single(self, event_return):
-        if event_return in self.minion.returners:
-            try:
-                self.minion.returners[event_return](self.event_queue)
-            except Exception as exc:
-                log.error('Could not store events - returner \'%s\' raised '
-                          'exception: %s', event_return, exc)
-                # don't waste processing power unnecessarily on converting a
-                # potentially huge dataset to a string
-                if log.level <= logging.DEBUG:
-                    log.debug('Event data that caused an exception: %s',
-                              self.event_queue)
-        else:
-            log.error('Could not store return for event(s) - returner '
-                      '\'%s\' not found.', event_return)
+    def _post_stats(self):
+        '''
+        Fire an event with the throughput of the event returners if it's time
+        '''
+        end_time = time.time()
+        if end_time - self.stat_clock > self.opts['master_stats_event_iter']:
+            returners = {}
+            for name, flusher in six.iteritems(self.flushers or {}):
+                returners[name] = dict(flusher.stats, queued=flusher.queue.qsize())
+            self.event.fire_event({'time': end_time - self.stat_clock,
+                                   'stats': self.stats,
+                                   'returners': returners},
+                                  tagify('EventReturn', 'stats'))
+            self.stats = {'received': 0, 'filtered': 0}
+            self.stat_clock = end_time
 
     def run(self):
         '''
@@ -1273,21 +1700,38 @@ class EventReturn(salt.utils.process.SignalHandlingMultiprocessingProcess):
         '''
         salt.utils.process.appendproctitle(self.__class__.__name__)
         self.event = get_event('master', opts=self.opts, listen=True)
-        events = self.event.iter_events(full=True)
+        if self.opts['event_return_whitelist']:
+            # Have the publisher drop the events the whitelist never matches
+            prefixes = tag_prefixes(self.opts['event_return_whitelist'])
+            if prefixes is not None:
+                self.event.filter_tags(prefixes + ['salt/event/exit'])
+        self._start_flushers()
         self.event.fire_event({}, 'salt/event_listen/start')
         try:
-            for event in events:
-                if event['tag'] == 'salt/event/exit':
-                    self.stop = True
-                if self._filter(event):
-                    self.event_queue.append(event)
-                if len(self.event_queue) >= self.event_return_queue:
+            while not self.stop:
+                wait = 5
+                if self.flush_interval and self.event_queue:
+                    wait = max(self.flush_clock + self.flush_interval - time.time(), 0.01)
+                event = self.event.get_event(wait=wait, full=True)
+                if event is not None:
+                    self.stats['received'] += 1
+                    if event['tag'] == 'salt/event/exit':
+                        self.stop = True
+                    if self._filter(event):
+                        self.event_queue.append(event)
+                    else:
+                        self.stats['filtered'] += 1
+                if self.event_queue and (
+                        len(self.event_queue) >= self.event_return_queue or
+                        (self.flush_interval and
+                         time.time() - self.flush_clock >= self.flush_interval)):
                     self.flush_events()
-                if self.stop:
-                    break
+                if self.opts['master_stats']:
+                    self._post_stats()
         finally:  # flush all we have at this moment
             if self.event_queue:
-                self.flush_events()
+                self.flush_events(timeout=self._stop_timeout())
+            self._stop_flushers()
 
     def _filter(self, event):
         '''
@@ -1296,19 +1740,11 @@ class EventReturn(salt.utils.process.SignalHandlingMultiprocessingProcess):
         Returns True if event should be stored, else False
         '''
         tag = event['tag']
-        if self.opts['event_return_whitelist']:
-            ret = False
-        else:
-            ret = True
-        for whitelist_match in self.opts['event_return_whitelist']:
-            if fnmatch.fnmatch(tag, whitelist_match):
-                ret = True
-                break
-        for blacklist_match in self.opts['event_return_blacklist']:
-            if fnmatch.fnmatch(tag, blacklist_match):
-                ret = False
-                break
-        return ret
+        if self.whitelist is not None and not self.whitelist.match(tag):
+            return False
+        if self.blacklist is not None and self.blacklist.match(tag):
+            return False
+        return True
 
 
 class StateFire(object):
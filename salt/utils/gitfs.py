@@ -5,6 +5,7 @@ Classes which provide the shared base for GitFS, git_pillar, and winrepo
 
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import binascii
 import copy
 import contextlib
 import errno
@@ -60,6 +61,14 @@ GLOBAL_ONLY = ()
 
 SYMLINK_RECURSE_DEPTH = 100
 
+# The total size of the blobs GitFS keeps in memory when serving from the
+# object database, and the number of blob hashes it keeps
+BLOB_CACHE_SIZE = 32 * 1024 * 1024
+BLOB_HASHES_MAX = 10000
+# Larger blobs are written to the gitfs cache and served from there, even when
+# serving from the object database
+BLOB_SERVE_MAX_SIZE = 4 * 1024 * 1024
+
 # Auth support (auth params can be global or per-remote, too)
 AUTH_PROVIDERS = ('pygit2',)
 AUTH_PARAMS = ('user', 'password', 'pubkey', 'privkey', 'passphrase',
@@ -1100,6 +1109,18 @@ class GitProvider(object):
         self.credentials = None
         return True
 
+    def read_blob(self, blob_hexsha):
+        '''
+        This function must be overridden in a sub-class
+        '''
+        raise NotImplementedError()
+
+    def tree_hexsha(self, tree):
+        '''
+        This function must be overridden in a sub-class
+        '''
+        raise NotImplementedError()
+
     def write_file(self, blob, dest):
         '''
         This function must be overridden in a sub-class
@@ -1390,6 +1411,18 @@ class GitPython(GitProvider):
         except (gitdb.exc.ODBError, AttributeError):
             return None
 
+    def read_blob(self, blob_hexsha):
+        '''
+        Return the contents of a blob, read straight from the object database
+        '''
+        return self.repo.odb.stream(binascii.unhexlify(blob_hexsha)).read()
+
+    def tree_hexsha(self, tree):
+        '''
+        Return the SHA of a git.Tree object
+        '''
+        return tree.hexsha
+
     def write_file(self, blob, dest):
         '''
         Using the blob object, write the file to the destination path
@@ -2053,6 +2086,18 @@ class Pygit2(GitProvider):
             )
             failhard(self.role)
 
+    def read_blob(self, blob_hexsha):
+        '''
+        Return the contents of a blob, read straight from the object database
+        '''
+        return self.repo[blob_hexsha].data
+
+    def tree_hexsha(self, tree):
+        '''
+        Return the SHA of a pygit2.Tree object
+        '''
+        return six.text_type(tree.id)
+
     def write_file(self, blob, dest):
         '''
         Using the blob object, write the file to the destination path
@@ -2692,6 +2737,14 @@ class GitFS(GitBase):
             # we're initializing remotes, so we won't get here unless io_loop
             # is something other than None.
             obj = object.__new__(cls)
+            # File lists of each remote and saltenv, along with the SHA of the
+            # tree they were built from
+            obj.tree_lists = {}
+            # Blobs read from the object database, least recently used
+            # first, their total size, and blob hashes
+            obj.blob_data = OrderedDict()
+            obj.blob_data_size = 0
+            obj.blob_hashes = OrderedDict()
             super(GitFS, obj).__init__(
                 opts,
                 remotes if remotes is not None else [],
@@ -2742,6 +2795,24 @@ class GitFS(GitBase):
             ret.update([x for x in repo_envs if repo.env_is_exposed(x)])
         return sorted(ret)
 
+    def _find_blob(self, path, tgt_env):
+        '''
+        Find the first blob to match the path and ref, returning the remote it
+        was found in along with the blob, its SHA and its mode
+        '''
+        for repo in self.remotes:
+            if repo.mountpoint(tgt_env) \
+                    and not path.startswith(repo.mountpoint(tgt_env) + os.sep):
+                continue
+            repo_path = path[len(repo.mountpoint(tgt_env)):].lstrip(os.sep)
+            if repo.root(tgt_env):
+                repo_path = salt.utils.path.join(repo.root(tgt_env), repo_path)
+
+            blob, blob_hexsha, blob_mode = repo.find_file(repo_path, tgt_env)
+            if blob is not None:
+                return repo, blob, blob_hexsha, blob_mode
+        return None, None, None, None
+
     def find_file(self, path, tgt_env='base', **kwargs):  # pylint: disable=W0613
         '''
         Find the first file to match the path and ref, read the file out of git
@@ -2754,6 +2825,20 @@ class GitFS(GitBase):
             return fnd
 
         dest = salt.utils.path.join(self.cache_root, 'refs', tgt_env, path)
+        repo, blob, blob_hexsha, blob_mode = self._find_blob(path, tgt_env)
+        if self.opts.get('gitfs_serve_from_odb', False) \
+                and (repo is None or blob.size <= BLOB_SERVE_MAX_SIZE):
+            # Serve the blob straight from the object database. The path is
+            # not written to, it only identifies the file to other code.
+            if repo is not None:
+                fnd['rel'] = path
+                fnd['path'] = dest
+                fnd['remote'] = repo.id
+                fnd['blob'] = blob_hexsha
+                if blob_mode is not None:
+                    fnd['stat'] = [blob_mode]
+            return fnd
+
         hashes_glob = salt.utils.path.join(self.hash_cachedir,
                                            tgt_env,
                                            '{0}.hash.*'.format(path))
@@ -2780,17 +2865,7 @@ class GitFS(GitBase):
                 os.remove(hashdir)
                 os.makedirs(hashdir)
 
-        for repo in self.remotes:
-            if repo.mountpoint(tgt_env) \
-                    and not path.startswith(repo.mountpoint(tgt_env) + os.sep):
-                continue
-            repo_path = path[len(repo.mountpoint(tgt_env)):].lstrip(os.sep)
-            if repo.root(tgt_env):
-                repo_path = salt.utils.path.join(repo.root(tgt_env), repo_path)
-
-            blob, blob_hexsha, blob_mode = repo.find_file(repo_path, tgt_env)
-            if blob is None:
-                continue
+        if repo is not None:
 
             def _add_file_stat(fnd, mode):
                 '''
@@ -2842,6 +2917,28 @@ class GitFS(GitBase):
         # so the calling function knows the file could not be found.
         return fnd
 
+    def _read_blob(self, fnd):
+        '''
+        Return the contents of a blob found when serving from the object
+        database. The blobs last read are kept in memory, up to
+        BLOB_CACHE_SIZE bytes, since files are served in several chunks and
+        minions often fetch the same files at the same time. Only blobs of at
+        most BLOB_SERVE_MAX_SIZE bytes are served from the object database.
+        '''
+        blob = self.blob_data.pop(fnd['blob'], None)
+        if blob is None:
+            for repo in self.remotes:
+                if repo.id == fnd['remote']:
+                    blob = repo.read_blob(fnd['blob'])
+                    break
+            if blob is None:
+                return None
+            self.blob_data_size += len(blob)
+        self.blob_data[fnd['blob']] = blob
+        while self.blob_data_size > BLOB_CACHE_SIZE and len(self.blob_data) > 1:
+            self.blob_data_size -= len(self.blob_data.popitem(last=False)[1])
+        return blob
+
     def serve_file(self, load, fnd):
         '''
         Return a chunk from a file based on the data received
@@ -2861,6 +2958,25 @@ class GitFS(GitBase):
             return ret
         if not fnd['path']:
             return ret
+        if 'blob' in fnd:
+            blob = self._read_blob(fnd)
+            if blob is None:
+                return ret
+            ret['dest'] = fnd['rel']
+            data = blob[load['loc']:load['loc'] + self.opts['file_buffer_size']]
+            if data and six.PY3:
+                try:
+                    binary = salt.utils.stringutils.is_binary(
+                        blob[:2048].decode(__salt_system_encoding__))
+                except UnicodeDecodeError:
+                    binary = True
+                if not binary:
+                    data = data.decode(__salt_system_encoding__)
+            if load.get('gzip') and data:
+                data = salt.utils.gzip_util.compress(data, load['gzip'])
+                ret['gzip'] = load['gzip']
+            ret['data'] = data
+            return ret
         ret['dest'] = fnd['rel']
         gzip = load.get('gzip', None)
         fpath = os.path.normpath(fnd['path'])
@@ -2886,6 +3002,20 @@ class GitFS(GitBase):
         if not all(x in load for x in ('path', 'saltenv')):
             return '', None
         ret = {'hash_type': self.opts['hash_type']}
+        if 'blob' in fnd:
+            # Blobs are immutable, so their hashes never need to be refreshed
+            key = (fnd['blob'], self.opts['hash_type'])
+            hsum = self.blob_hashes.pop(key, None)
+            if hsum is None:
+                blob = self._read_blob(fnd)
+                if blob is None:
+                    return ''
+                hsum = hashlib.new(self.opts['hash_type'], blob).hexdigest()
+            self.blob_hashes[key] = hsum
+            while len(self.blob_hashes) > BLOB_HASHES_MAX:
+                self.blob_hashes.popitem(last=False)
+            ret['hsum'] = hsum
+            return ret
         relpath = fnd['rel']
         path = fnd['path']
         hashdest = salt.utils.path.join(self.hash_cachedir,
@@ -2919,6 +3049,10 @@ class GitFS(GitBase):
             # "env" is not supported; Use "saltenv".
             load.pop('env')
 
+        if self.opts.get('gitfs_serve_from_odb', False):
+            return self._tree_file_lists(load['saltenv']).get(
+                form, {} if form == 'symlinks' else [])
+
         if not os.path.isdir(self.file_list_cachedir):
             try:
                 os.makedirs(self.file_list_cachedir)
@@ -2962,6 +3096,38 @@ class GitFS(GitBase):
         # Shouldn't get here, but if we do, this prevents a TypeError
         return {} if form == 'symlinks' else []
 
+    def _tree_file_lists(self, saltenv):
+        '''
+        Return a dict containing the file lists for files, symlinks and dirs,
+        only walking the trees of the remotes whose ref has moved since the
+        last call.
+        '''
+        ret = {'files': set(), 'symlinks': {}, 'dirs': set()}
+        if not salt.utils.stringutils.is_hex(saltenv) \
+                and saltenv not in self.envs():
+            return ret
+        for repo in self.remotes:
+            key = (repo.id, saltenv)
+            tree = repo.get_tree(saltenv)
+            if tree is None:
+                self.tree_lists.pop(key, None)
+                continue
+            tree_hexsha = repo.tree_hexsha(tree)
+            cached = self.tree_lists.get(key)
+            if cached is None or cached[0] != tree_hexsha:
+                repo_files, repo_symlinks = repo.file_list(saltenv)
+                cached = (tree_hexsha,
+                          repo_files,
+                          repo_symlinks,
+                          repo.dir_list(saltenv))
+                self.tree_lists[key] = cached
+            ret['files'].update(cached[1])
+            ret['symlinks'].update(cached[2])
+            ret['dirs'].update(cached[3])
+        ret['files'] = sorted(ret['files'])
+        ret['dirs'] = sorted(ret['dirs'])
+        return ret
+
     def file_list(self, load):
         '''
         Return a list of all files on the file server in a specified
@@ -646,6 +646,117 @@ def show_full_context(ctx):
     return salt.utils.data.simple_types_filter({key: value for key, value in ctx.items()})
 
 
+# Template context entries whose reads are tracked by context_dependencies
+TRACKED_CONTEXT = ('grains', 'pillar', 'opts')
+
+# Execution functions reading a single key of a tracked context entry
+TRACKED_FUNCTIONS = {'grains.get': 'grains'}
+
+# Globals and filters whose result depends on more than their arguments and
+# the tracked context entries
+VOLATILE_GLOBALS = frozenset(('salt', 'proxy', 'show_full_context', 'lipsum'))
+VOLATILE_FILTERS = frozenset((
+    'connection_check', 'date_format', 'dns_check', 'file_hashsum', 'gen_mac',
+    'get_uid', 'http_query', 'is_bin_file', 'is_text_file', 'list_files',
+    'random', 'random_hash', 'random_str', 'strftime', 'which',
+))
+
+
+def _const_str(node):
+    '''
+    Return the value of a constant string node, None for any other node
+    '''
+    if isinstance(node, nodes.Const) and isinstance(node.value, six.string_types):
+        return node.value
+    return None
+
+
+def _tracked_call(node):
+    '''
+    Return the ``(<context entry>, <key>)`` read by a ``grains.get('key')`` or
+    ``salt['grains.get']('key')`` call, None for any other call
+    '''
+    key = _const_str(node.args[0]) if node.args else None
+    if key is None:
+        return None
+    func = node.node
+    if isinstance(func, nodes.Getattr) and func.attr == 'get' \
+            and isinstance(func.node, nodes.Name) \
+            and func.node.name in TRACKED_CONTEXT:
+        return func.node.name, key
+    if node.kwargs or node.dyn_args or node.dyn_kwargs:
+        return None
+    if isinstance(func, nodes.Getitem) and isinstance(func.node, nodes.Name):
+        name = func.node.name, _const_str(func.arg)
+    elif isinstance(func, nodes.Getattr) and isinstance(func.node, nodes.Getattr) \
+            and isinstance(func.node.node, nodes.Name):
+        name = func.node.node.name, '{0}.{1}'.format(func.node.attr, func.attr)
+    else:
+        return None
+    if name[0] == 'salt' and name[1] in TRACKED_FUNCTIONS:
+        return TRACKED_FUNCTIONS[name[1]], key.split(':')[0]
+    return None
+
+
+def _context_dependencies(node, deps):
+    '''
+    Add the dependencies of the node to deps, return False if the output of
+    the node can not be tracked
+    '''
+    if isinstance(node, nodes.Name):
+        if node.ctx != 'load':
+            return True
+        if node.name in TRACKED_CONTEXT:
+            deps.add((node.name, None))
+        return node.name not in VOLATILE_GLOBALS
+    if isinstance(node, (nodes.Filter, nodes.Test)) and node.name in VOLATILE_FILTERS:
+        return False
+    if isinstance(node, (nodes.Include, nodes.Import, nodes.FromImport, nodes.Extends)):
+        template = _const_str(node.template)
+        if template is None:
+            return False
+        deps.add(('file', template))
+        return True
+    children = None
+    if isinstance(node, nodes.Getitem) and isinstance(node.node, nodes.Name) \
+            and node.node.name in TRACKED_CONTEXT and _const_str(node.arg) is not None:
+        deps.add((node.node.name, node.arg.value))
+        return True
+    if isinstance(node, nodes.Getattr) and isinstance(node.node, nodes.Name) \
+            and node.node.name in TRACKED_CONTEXT and not hasattr(dict, node.attr):
+        # Jinja falls back to the item for attributes dicts do not have
+        deps.add((node.node.name, node.attr))
+        return True
+    if isinstance(node, nodes.Call):
+        dep = _tracked_call(node)
+        if dep is not None:
+            deps.add(dep)
+            children = [child for child in node.iter_child_nodes()
+                        if child is not node.node]
+    if children is None:
+        children = node.iter_child_nodes()
+    for child in children:
+        if not _context_dependencies(child, deps):
+            return False
+    return True
+
+
+def context_dependencies(ast):
+    '''
+    Return the set of ``(<context entry>, <key>)`` pairs a parsed template
+    reads from the grains, pillar and opts, ``<key>`` being ``None`` when the
+    template uses the whole entry, along with a ``('file', <name>)`` pair for
+    every template it includes or imports.
+
+    Return ``None`` when the output of the template may depend on anything
+    else, such as execution functions, the time or random values.
+    '''
+    deps = set()
+    if not _context_dependencies(ast, deps):
+        return None
+    return deps
+
+
 class SerializerExtension(Extension, object):
     '''
     Yaml and Json manipulation.
@@ -6,9 +6,12 @@ expected to return
 
 # Import python libs
 from __future__ import absolute_import, unicode_literals
+import bisect
+import itertools
 import os
 import fnmatch
 import re
+import time
 import logging
 
 # Import salt libs
@@ -46,6 +49,11 @@ TARGET_REX = re.compile(
         (?P<pattern>.+)$'''                # The pattern passed to the target engine
     )
 
+# Process wide minion data indexes, see get_minion_data_index()
+_MINION_DATA_INDEXES = {}
+# Process wide accepted key indexes, see get_pki_key_index()
+_PKI_KEY_INDEXES = {}
+
 
 def parse_target(target_expression):
     '''Parse `target_expressing` splitting it into `engine`, `delimiter`,
@@ -88,6 +96,290 @@ def get_minion_data(minion, opts):
     return minion if minion else None, grains, pillar
 
 
+class MinionDataIndex(object):
+    '''
+    In-memory inverted index of the grains and pillar data held in the minion
+    data cache.
+
+    Every value that ``salt.utils.data.subdict_match`` could compare a target
+    pattern against (scalar values, list members and dict keys) is recorded
+    under the top-level key it was found beneath. Grain and pillar targets
+    are first resolved against these distinct values, which yields a small
+    candidate set of minions, and only the candidates are then verified with
+    ``subdict_match`` against the in-memory copy of their data. Neither step
+    touches the cache backend.
+
+    The index is kept up to date incrementally by the master as minion data
+    lands in the cache, and is reconciled with the cache backend every
+    ``minion_data_index_refresh`` seconds so that updates received by other
+    worker processes are picked up.
+    '''
+    SEARCH_TYPES = ('grains', 'pillar')
+
+    def __init__(self):
+        # {<minion_id>: {'grains': {...}, 'pillar': {...}}}
+        self.data = {}
+        # {<search_type>: {<top_key>: {<token>: set([<minion_id>, ...])}}}
+        self.tokens = dict((stype, {}) for stype in self.SEARCH_TYPES)
+        # {<minion_id>: <last updated epoch reported by the cache>}
+        self.updated = {}
+        self.last_refresh = None
+
+    @staticmethod
+    def _text(value):
+        try:
+            return six.text_type(value).lower()
+        except UnicodeDecodeError:
+            return salt.utils.stringutils.to_unicode(value).lower()
+
+    def _tokenize(self, value, tokens, in_list=False):
+        '''
+        Collect every string ``subdict_match`` may compare a pattern against
+        '''
+        if isinstance(value, dict):
+            if in_list:
+                tokens.add(self._text(value))
+            for key, val in six.iteritems(value):
+                tokens.add(self._text(key))
+                self._tokenize(val, tokens)
+        elif isinstance(value, (list, tuple)):
+            if in_list:
+                tokens.add(self._text(value))
+            for item in value:
+                self._tokenize(item, tokens, in_list=True)
+        else:
+            tokens.add(self._text(value))
+
+    def _drop(self, minion_id):
+        mdata = self.data.pop(minion_id, None)
+        if not mdata:
+            return
+        for stype in self.SEARCH_TYPES:
+            search_data = mdata.get(stype)
+            if not isinstance(search_data, dict):
+                continue
+            index = self.tokens[stype]
+            for top in search_data:
+                tokens = set()
+                self._tokenize(search_data[top], tokens)
+                for token in tokens:
+                    ids = index.get(top, {}).get(token)
+                    if ids is None:
+                        continue
+                    ids.discard(minion_id)
+                    if not ids:
+                        del index[top][token]
+                if top in index and not index[top]:
+                    del index[top]
+
+    def update(self, minion_id, mdata, updated=None):
+        '''
+        Replace the indexed data for a minion
+        '''
+        self._drop(minion_id)
+        if not isinstance(mdata, dict):
+            mdata = {}
+        self.data[minion_id] = mdata
+        self.updated[minion_id] = updated
+        for stype in self.SEARCH_TYPES:
+            search_data = mdata.get(stype)
+            if not isinstance(search_data, dict):
+                continue
+            index = self.tokens[stype]
+            for top in search_data:
+                tokens = set()
+                self._tokenize(search_data[top], tokens)
+                top_index = index.setdefault(top, {})
+                for token in tokens:
+                    top_index.setdefault(token, set()).add(minion_id)
+
+    def remove(self, minion_id):
+        '''
+        Remove a minion from the index
+        '''
+        self._drop(minion_id)
+        self.updated.pop(minion_id, None)
+
+    def refresh(self, cache, interval=0):
+        '''
+        Reconcile the index with the minion data cache. With cache drivers
+        implementing ``updated``, only minions whose cache entry changed since
+        the last refresh are fetched again, with the others every minion is.
+        '''
+        now = time.time()
+        if self.last_refresh is not None and now - self.last_refresh < interval:
+            return
+        self.last_refresh = now
+        cached = set(cache.list('minions') or [])
+        for minion_id in set(self.data) - cached:
+            self.remove(minion_id)
+        has_updated = '{0}.updated'.format(cache.driver) in cache.modules
+        for minion_id in cached:
+            try:
+                updated = None
+                if has_updated:
+                    updated = cache.updated('minions/{0}'.format(minion_id), 'data')
+                if minion_id in self.data and updated is not None \
+                        and updated == self.updated.get(minion_id):
+                    continue
+                mdata = cache.fetch('minions/{0}'.format(minion_id), 'data')
+            except SaltCacheError:
+                continue
+            if mdata is None:
+                self.remove(minion_id)
+            else:
+                self.update(minion_id, mdata, updated)
+
+    def _candidates(self, search_type, expr, delimiter, regex_match, exact_match):
+        '''
+        Return a superset of the minions matching ``expr``, or None if the
+        expression cannot be narrowed down using the index
+        '''
+        splits = expr.split(delimiter)
+        if len(splits) == 1:
+            return set()
+        index = self.tokens[search_type]
+        if splits[0] == '*' or delimiter != DEFAULT_TARGET_DELIM:
+            return None
+        top_index = index.get(splits[0])
+        if not top_index:
+            return set()
+        suffixes = [self._text(delimiter.join(splits[idx:]))
+                    for idx in range(1, len(splits))]
+        if [x for x in suffixes if x == '*' or x.startswith('*:')]:
+            # Key existence checks, every minion holding the key qualifies
+            ret = set()
+            for ids in six.itervalues(top_index):
+                ret.update(ids)
+            return ret
+
+        ret = set()
+        for suffix in suffixes:
+            ret.update(top_index.get(suffix, ()))
+            if exact_match:
+                continue
+            if regex_match:
+                try:
+                    rex = re.compile(suffix)
+                except Exception:
+                    continue
+                matcher = rex.match
+            elif [x for x in '*?[' if x in suffix]:
+                matcher = lambda token, pat=suffix: fnmatch.fnmatch(token, pat)  # pylint: disable=cell-var-from-loop
+            else:
+                continue
+            for token, ids in six.iteritems(top_index):
+                if matcher(token):
+                    ret.update(ids)
+        return ret
+
+    def match(self, search_type, expr, delimiter=DEFAULT_TARGET_DELIM,
+              regex_match=False, exact_match=False):
+        '''
+        Return the set of indexed minions matching the target expression
+        '''
+        candidates = self._candidates(search_type,
+                                      expr,
+                                      delimiter,
+                                      regex_match,
+                                      exact_match)
+        if candidates is None:
+            candidates = self.data
+        ret = set()
+        for minion_id in candidates:
+            search_results = self.data[minion_id].get(search_type)
+            if salt.utils.data.subdict_match(search_results,
+                                             expr,
+                                             delimiter=delimiter,
+                                             regex_match=regex_match,
+                                             exact_match=exact_match):
+                ret.add(minion_id)
+        return ret
+
+
+def get_minion_data_index(opts, cache):
+    '''
+    Return the process wide :class:`MinionDataIndex` for the given minion data
+    cache, loading it from the cache on first use
+    '''
+    storage_id = (cache.driver, cache.cachedir)
+    index = _MINION_DATA_INDEXES.get(storage_id)
+    if index is None:
+        index = _MINION_DATA_INDEXES[storage_id] = MinionDataIndex()
+    index.refresh(cache, opts.get('minion_data_index_refresh', 60))
+    return index
+
+
+class PkiKeyIndex(object):
+    '''
+    Sorted index of the accepted minion keys in a PKI directory.
+
+    The directory is only listed again when its modification time changes,
+    which happens whenever a key is accepted, rejected or deleted. Lookups of
+    unchanged directories therefore cost a single ``stat`` call, and globs
+    starting with a literal prefix (like ``web-*``) only match the ids
+    sharing that prefix.
+    '''
+    def __init__(self, path):
+        self.path = path
+        # (st_mtime, st_ino) of the directory when it was last listed
+        self.stamp = None
+        # Accepted ids sorted ignoring case, as returned by _pki_minions
+        self.keys = []
+        # Accepted ids in code point order, for prefix lookups
+        self.sorted = []
+        self.ids = frozenset()
+
+    def refresh(self):
+        '''
+        List the directory again if it changed since it was last listed
+        '''
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime, stat.st_ino)
+        if stamp == self.stamp:
+            return
+        listed_at = time.time()
+        keys = [fn_ for fn_ in os.listdir(self.path)
+                if not fn_.startswith('.')
+                and os.path.isfile(os.path.join(self.path, fn_))]
+        self.keys = salt.utils.data.sorted_ignorecase(keys)
+        self.sorted = sorted(keys)
+        self.ids = frozenset(keys)
+        # Modification times may have a resolution of one second, only trust
+        # the stamp if the directory was not modified during the last second
+        self.stamp = stamp if stat.st_mtime < listed_at - 1 else None
+
+    def glob(self, expr):
+        '''
+        Return the ids matching a glob
+        '''
+        prefix = re.split(r'[*?[]', expr, 1)[0]
+        if not prefix or os.path.normcase('A') != 'A':
+            # No literal prefix, or globs are case-insensitive on this platform
+            return fnmatch.filter(self.keys, expr)
+        if prefix == expr:
+            return [expr] if expr in self.ids else []
+        candidates = []
+        for id_ in itertools.islice(self.sorted,
+                                    bisect.bisect_left(self.sorted, prefix),
+                                    None):
+            if not id_.startswith(prefix):
+                break
+            candidates.append(id_)
+        return salt.utils.data.sorted_ignorecase(fnmatch.filter(candidates, expr))
+
+
+def get_pki_key_index(path):
+    '''
+    Return the process wide, up to date :class:`PkiKeyIndex` of a PKI directory
+    '''
+    index = _PKI_KEY_INDEXES.get(path)
+    if index is None:
+        index = _PKI_KEY_INDEXES[path] = PkiKeyIndex(path)
+    index.refresh()
+    return index
+
+
 def nodegroup_comp(nodegroup, nodegroups, skip=None, first_call=True):
     '''
     Recursively expand ``nodegroup`` from ``nodegroups``; ignore nodegroups in ``skip``
@@ -198,6 +490,28 @@ class CkMinions(object):
         else:
             self.acc = 'accepted'
 
+    def _data_index(self):
+        '''
+        Return the minion data index if it is enabled, otherwise None
+        '''
+        if not self.opts.get('minion_data_cache', False) \
+                or not self.opts.get('minion_data_index', False):
+            return None
+        return get_minion_data_index(self.opts, self.cache)
+
+    def update_data_index(self, minion_id, mdata):
+        '''
+        Update the minion data index, if enabled, with data that has just been
+        stored in the minion data cache
+        '''
+        if not self.opts.get('minion_data_cache', False) \
+                or not self.opts.get('minion_data_index', False):
+            return
+        storage_id = (self.cache.driver, self.cache.cachedir)
+        index = _MINION_DATA_INDEXES.get(storage_id)
+        if index is not None:
+            index.update(minion_id, mdata)
+
     def _check_nodegroup_minions(self, expr, greedy):  # pylint: disable=unused-argument
         '''
         Return minions found by looking at nodegroups
@@ -210,6 +524,10 @@ class CkMinions(object):
         '''
         Return the minions found by looking via globs
         '''
+        index = self._pki_index()
+        if index is not None:
+            return {'minions': index.glob(expr),
+                    'missing': []}
         return {'minions': fnmatch.filter(self._pki_minions(), expr),
                 'missing': []}
 
@@ -219,7 +537,8 @@ class CkMinions(object):
         '''
         if isinstance(expr, six.string_types):
             expr = [m for m in expr.split(',') if m]
-        minions = self._pki_minions()
+        index = self._pki_index()
+        minions = index.ids if index is not None else self._pki_minions()
         return {'minions': [x for x in expr if x in minions],
                 'missing': [] if ignore_missing else [x for x in expr if x not in minions]}
 
@@ -231,6 +550,29 @@ class CkMinions(object):
         return {'minions': [m for m in self._pki_minions() if reg.match(m)],
                 'missing': []}
 
+    def _pki_index(self):
+        '''
+        Return the accepted key index, or None if the key cache is configured
+        or the PKI dir is not configured or can not be read
+        '''
+        if self.opts.get('key_cache') or not self.opts.get('pki_dir'):
+            return None
+        try:
+            return get_pki_key_index(os.path.join(self.opts['pki_dir'], self.acc))
+        except OSError as exc:
+            log.error(
+                'Encountered OSError while evaluating minions in PKI dir: %s',
+                exc
+            )
+            return None
+
+    def _accepted_minions(self):
+        '''
+        Return the ids of the accepted keys listed from the PKI dir, ignoring
+        the key cache, like matching every minion always did
+        '''
+        return list(get_pki_key_index(os.path.join(self.opts['pki_dir'], self.acc)).keys)
+
     def _pki_minions(self):
         '''
         Retreive complete minion list from PKI dir.
@@ -252,10 +594,7 @@ class CkMinions(object):
                     with salt.utils.files.fopen(pki_cache_fn, mode='rb') as fn_:
                         return self.serial.load(fn_)
             else:
-                for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(os.path.join(self.opts['pki_dir'], self.acc))):
-                    if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], self.acc, fn_)):
-                        minions.append(fn_)
-            return minions
+                return list(get_pki_key_index(os.path.join(self.opts['pki_dir'], self.acc)).keys)
         except OSError as exc:
             log.error(
                 'Encountered OSError while evaluating minions in PKI dir: %s',
@@ -280,11 +619,25 @@ class CkMinions(object):
         def list_cached_minions():
             return self.cache.list('minions')
 
+        index = self._data_index()
+        if index is not None:
+            matched = index.match(search_type,
+                                  expr,
+                                  delimiter=delimiter,
+                                  regex_match=regex_match,
+                                  exact_match=exact_match)
+            if not greedy:
+                return {'minions': list(matched),
+                        'missing': []}
+            if not index.data:
+                return {'minions': self._accepted_minions(),
+                        'missing': []}
+            return {'minions': [x for x in self._accepted_minions()
+                                if x in matched or x not in index.data],
+                    'missing': []}
+
         if greedy:
-            minions = []
-            for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(os.path.join(self.opts['pki_dir'], self.acc))):
-                if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], self.acc, fn_)):
-                    minions.append(fn_)
+            minions = self._accepted_minions()
         elif cache_enabled:
             minions = list_cached_minions()
         else:
@@ -438,11 +791,7 @@ class CkMinions(object):
             )
             cache_enabled = self.opts.get('minion_data_cache', False)
             if greedy:
-                mlist = []
-                for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(os.path.join(self.opts['pki_dir'], self.acc))):
-                    if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], self.acc, fn_)):
-                        mlist.append(fn_)
-                return {'minions': mlist,
+                return {'minions': self._accepted_minions(),
                         'missing': []}
             elif cache_enabled:
                 return {'minions': self.cache.list('minions'),
@@ -496,6 +845,14 @@ class CkMinions(object):
             unmatched = []
             opers = ['and', 'or', 'not', '(', ')']
             missing = []
+            # The expression is evaluated as set operations over named
+            # operands rather than over the repr of each (possibly huge) set
+            operands = {}
+
+            def _set_ref(matched):
+                name = '_s{0}'.format(len(operands))
+                operands[name] = set(matched)
+                return name
 
             if isinstance(expr, six.string_types):
                 words = expr.split()
@@ -517,7 +874,7 @@ class CkMinions(object):
                             if not results[-1] in ('&', '|', '('):
                                 results.append('&')
                             results.append('(')
-                            results.append(six.text_type(set(minions)))
+                            results.append(_set_ref(minions))
                             results.append('-')
                             unmatched.append('-')
                         elif word == 'and':
@@ -546,7 +903,7 @@ class CkMinions(object):
                         # seq start with oper, fail
                         if word == 'not':
                             results.append('(')
-                            results.append(six.text_type(set(minions)))
+                            results.append(_set_ref(minions))
                             results.append('-')
                             unmatched.append('-')
                         elif word == '(':
@@ -588,7 +945,7 @@ class CkMinions(object):
                     if 'L' == target_info['engine']:
                         engine_args.append(results and results[-1] == '-')
                     _results = engine(*engine_args)
-                    results.append(six.text_type(set(_results['minions'])))
+                    results.append(_set_ref(_results['minions']))
                     missing.extend(_results['missing'])
                     if unmatched and unmatched[-1] == '-':
                         results.append(')')
@@ -597,7 +954,7 @@ class CkMinions(object):
                 else:
                     # The match is not explicitly defined, evaluate as a glob
                     _results = self._check_glob_minions(word, True)
-                    results.append(six.text_type(set(_results['minions'])))
+                    results.append(_set_ref(_results['minions']))
                     if unmatched and unmatched[-1] == '-':
                         results.append(')')
                         unmatched.pop()
@@ -609,7 +966,7 @@ class CkMinions(object):
             log.debug('Evaluating final compound matching expr: %s',
                       results)
             try:
-                minions = list(eval(results))  # pylint: disable=W0123
+                minions = list(eval(results, {'__builtins__': {}}, operands))  # pylint: disable=W0123
                 return {'minions': minions, 'missing': missing}
             except Exception:
                 log.error('Invalid compound target: %s', expr)
@@ -683,11 +1040,7 @@ class CkMinions(object):
         '''
         Return a list of all minions that have auth'd
         '''
-        mlist = []
-        for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(os.path.join(self.opts['pki_dir'], self.acc))):
-            if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], self.acc, fn_)):
-                mlist.append(fn_)
-        return {'minions': mlist, 'missing': []}
+        return {'minions': self._accepted_minions(), 'missing': []}
 
     def check_minions(self,
                       expr,
@@ -287,25 +287,11 @@ def _get_jinja_error(trace, context=None):
     return line, out
 
 
-def render_jinja_tmpl(tmplstr, context, tmplpath=None):
-    opts = context['opts']
-    saltenv = context['saltenv']
-    loader = None
-    newline = False
-
-    if tmplstr and not isinstance(tmplstr, six.text_type):
-        # http://jinja.pocoo.org/docs/api/#unicode
-        tmplstr = tmplstr.decode(SLS_ENCODING)
-
-    if tmplstr.endswith(os.linesep):
-        newline = True
-
-    if not saltenv:
-        if tmplpath:
-            loader = jinja2.FileSystemLoader(os.path.dirname(tmplpath))
-    else:
-        loader = salt.utils.jinja.SaltCacheLoader(opts, saltenv, pillar_rend=context.get('_pillar_rend', False))
-
+def _jinja_environment(opts, loader, sls_env):
+    '''
+    Return the Jinja environment used to render templates, sls_env tells
+    whether the template is a SLS file
+    '''
     env_args = {'extensions': [], 'loader': loader}
 
     if hasattr(jinja2.ext, 'with_'):
@@ -346,7 +332,7 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
             else:
                 log.warning('Jinja2 environment %s is not recognized', k)
 
-    if 'sls' in context and context['sls'] != '':
+    if sls_env:
         opt_jinja_env_helper(opt_jinja_sls_env, 'jinja_sls_env')
     else:
         opt_jinja_env_helper(opt_jinja_env, 'jinja_env')
@@ -371,6 +357,30 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
 
     jinja_env.tests['list'] = salt.utils.data.is_list
 
+    return jinja_env
+
+
+def render_jinja_tmpl(tmplstr, context, tmplpath=None):
+    opts = context['opts']
+    saltenv = context['saltenv']
+    loader = None
+    newline = False
+
+    if tmplstr and not isinstance(tmplstr, six.text_type):
+        # http://jinja.pocoo.org/docs/api/#unicode
+        tmplstr = tmplstr.decode(SLS_ENCODING)
+
+    if tmplstr.endswith(os.linesep):
+        newline = True
+
+    if not saltenv:
+        if tmplpath:
+            loader = jinja2.FileSystemLoader(os.path.dirname(tmplpath))
+    else:
+        loader = salt.utils.jinja.SaltCacheLoader(opts, saltenv, pillar_rend=context.get('_pillar_rend', False))
+
+    jinja_env = _jinja_environment(opts, loader, 'sls' in context and context['sls'] != '')
+
     decoded_context = {}
     for key, value in six.iteritems(context):
         if not isinstance(value, six.string_types):
@@ -448,6 +458,19 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
     return output
 
 
+def jinja_dependencies(tmplstr, opts, sls=''):
+    '''
+    Return the context entries and templates a Jinja template reads, see
+    :py:func:`salt.utils.jinja.context_dependencies`. Raises
+    ``jinja2.exceptions.TemplateSyntaxError`` if the template can not be
+    parsed.
+    '''
+    if tmplstr and not isinstance(tmplstr, six.text_type):
+        tmplstr = tmplstr.decode(SLS_ENCODING)
+    jinja_env = _jinja_environment(opts, None, sls != '')
+    return salt.utils.jinja.context_dependencies(jinja_env.parse(tmplstr))
+
+
 # pylint: disable=3rd-party-module-not-gated
 def render_mako_tmpl(tmplstr, context, tmplpath=None):
     import mako.exceptions
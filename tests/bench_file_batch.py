@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+'''
+Time the caching of many small files from the fileserver, one request per
+file and in batches of ``file_batch_size`` files
+
+The files are served by the master fileserver in the same process, through a
+channel which serializes every request and reply as the transports do and
+optionally waits for a simulated round trip time. Each batch size is timed on
+an empty minion cache, then once more with every file already cached.
+
+    python tests/bench_file_batch.py -f 10000 -b 0,100,500 -l 0.2
+'''
+# Import python libs
+from __future__ import absolute_import, print_function
+import optparse
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt libs
+import salt.config
+import salt.fileclient
+import salt.fileserver
+import salt.payload
+import salt.utils.files
+
+
+class LoopbackChan(salt.fileserver.FSChan):
+    '''
+    A fileserver channel serializing the requests and replies, and counting
+    the round trips
+    '''
+    def __init__(self, opts, latency=0, **kwargs):
+        super(LoopbackChan, self).__init__(opts, **kwargs)
+        self.serial = salt.payload.Serial(opts)
+        self.latency = latency
+        self.requests = 0
+
+    def send(self, load, tries=None, timeout=None, raw=False):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        load = self.serial.loads(self.serial.dumps(load))
+        ret = super(LoopbackChan, self).send(load, tries, timeout, raw)
+        return self.serial.loads(self.serial.dumps(ret))
+
+
+def parse():
+    '''
+    Parse command line options
+    '''
+    parser = optparse.OptionParser()
+    parser.add_option('-f',
+            '--files',
+            dest='files',
+            default=10000,
+            type='int',
+            help='Number of files to cache')
+    parser.add_option('-s',
+            '--size',
+            dest='size',
+            default=512,
+            type='int',
+            help='Size of each file in bytes')
+    parser.add_option('-b',
+            '--batch-sizes',
+            dest='batch_sizes',
+            default='0,100,500',
+            help='Comma separated values of file_batch_size to time, 0 '
+                 'requesting the files one at a time')
+    parser.add_option('-l',
+            '--latency',
+            dest='latency',
+            default=0.0,
+            type='float',
+            help='Simulated round trip time of a request, in milliseconds')
+    options, _ = parser.parse_args()
+    return options
+
+
+def make_files(root, count, size):
+    '''
+    Write ``count`` files of ``size`` bytes spread over directories of 100
+    files, return their salt:// URLs
+    '''
+    paths = []
+    for num in range(count):
+        rel_path = 'bench/{0}/file{1}.txt'.format(num // 100, num)
+        path = os.path.join(root, *rel_path.split('/'))
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with salt.utils.files.fopen(path, 'wb') as fp_:
+            fp_.write(os.urandom(size))
+        paths.append('salt://' + rel_path)
+    return paths
+
+
+def run(options):
+    tmp = tempfile.mkdtemp()
+    try:
+        file_root = os.path.join(tmp, 'file_root')
+        opts = salt.config.minion_config(None)
+        opts['file_client'] = 'local'
+        opts['file_roots'] = {'base': [file_root]}
+        opts['fileserver_backend'] = ['roots']
+        opts['cachedir'] = os.path.join(tmp, 'cache')
+        paths = make_files(file_root, options.files, options.size)
+        print('{0} files of {1} bytes, {2:.2f}ms round trip time'.format(
+            options.files, options.size, options.latency))
+        for batch in [int(batch) for batch in options.batch_sizes.split(',')]:
+            opts['file_batch_size'] = batch
+            client = salt.fileclient.FSClient(opts)
+            client.channel = LoopbackChan(opts, latency=options.latency / 1000.0)
+            shutil.rmtree(os.path.join(opts['cachedir'], 'files'),
+                          ignore_errors=True)
+            timings = []
+            for _ in ('cold', 'warm'):
+                client.channel.requests = 0
+                start = time.time()
+                ret = client.cache_files(paths, 'base')
+                timings.append((time.time() - start, client.channel.requests,
+                                len([fn_ for fn_ in ret if not fn_])))
+            print('file_batch_size {0}: cold {1[0]:.2f}s in {1[1]} requests, '
+                  'warm {2[0]:.2f}s in {2[1]} requests, {3} failed'.format(
+                      batch, timings[0], timings[1],
+                      timings[0][2] + timings[1][2]))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    run(parse())
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+'''
+Time ``salt-call --local test.ping`` without the loader manifest, with a cold
+manifest and with a warm one
+
+Every run is a new ``salt-call`` process, so that the in-memory caches of the
+loader do not carry over. The cold runs remove the manifests left by the
+previous run before starting, the warm runs start from the manifests written
+by the run before them. The time taken to build the file mapping of the
+execution module loader is also measured in this process, since it is only a
+small part of a ``salt-call`` run.
+
+    python tests/bench_loader.py -r 10
+'''
+# Import python libs
+from __future__ import absolute_import, print_function
+import optparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Import Salt libs
+import salt.config
+import salt.loader
+import salt.utils.files
+import salt.utils.yaml
+
+SALT_CALL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'scripts', 'salt-call')
+
+
+def parse():
+    '''
+    Parse command line options
+    '''
+    parser = optparse.OptionParser()
+    parser.add_option('-r',
+            '--runs',
+            dest='runs',
+            default=10,
+            type='int',
+            help='Number of salt-call runs to time for each case')
+    parser.add_option('-f',
+            '--function',
+            dest='function',
+            default='test.ping',
+            help='The function salt-call runs')
+    options, _ = parser.parse_args()
+    return options
+
+
+def write_config(root, manifest):
+    '''
+    Write a masterless minion config under ``root``, return its directory
+    '''
+    conf_dir = os.path.join(root, 'conf')
+    if not os.path.isdir(conf_dir):
+        os.makedirs(conf_dir)
+    config = {'id': 'bench',
+              'root_dir': root,
+              'cachedir': os.path.join(root, 'cache'),
+              'pki_dir': os.path.join(root, 'pki'),
+              'sock_dir': os.path.join(root, 'sock'),
+              'log_file': os.path.join(root, 'minion.log'),
+              'file_client': 'local',
+              'loader_manifest': manifest}
+    with salt.utils.files.fopen(os.path.join(conf_dir, 'minion'), 'w') as fp_:
+        salt.utils.yaml.safe_dump(config, fp_, default_flow_style=False)
+    return conf_dir
+
+
+def call(conf_dir, function):
+    '''
+    Run salt-call once, return the time it took
+    '''
+    start = time.time()
+    subprocess.check_call(
+        [sys.executable, SALT_CALL, '--local', '-c', conf_dir, '-l', 'quiet',
+         '--out', 'quiet', function])
+    return time.time() - start
+
+
+def map_modules(conf_dir):
+    '''
+    Build the file mapping of the execution module loader, return the time it
+    took
+    '''
+    opts = salt.config.minion_config(os.path.join(conf_dir, 'minion'))
+    salt.loader.LazyLoader._manifests.clear()
+    start = time.time()
+    salt.loader.LazyLoader(salt.loader._module_dirs(opts, 'modules', 'module'),
+                           opts, tag='module')
+    return time.time() - start
+
+
+def run(options):
+    tmp = tempfile.mkdtemp()
+    try:
+        print('{0} runs of salt-call --local {1}'.format(options.runs,
+                                                        options.function))
+        for case, manifest in (('no manifest', False),
+                               ('cold manifest', True),
+                               ('warm manifest', True)):
+            conf_dir = write_config(tmp, manifest)
+            loader_cache = os.path.join(tmp, 'cache', 'loader')
+            # The first run writes the grains cache and, when enabled, the
+            # manifests, it is not timed
+            shutil.rmtree(loader_cache, ignore_errors=True)
+            call(conf_dir, options.function)
+            timings = []
+            mappings = []
+            for _ in range(options.runs):
+                if case == 'cold manifest':
+                    shutil.rmtree(loader_cache, ignore_errors=True)
+                    mappings.append(map_modules(conf_dir))
+                    shutil.rmtree(loader_cache, ignore_errors=True)
+                else:
+                    mappings.append(map_modules(conf_dir))
+                timings.append(call(conf_dir, options.function))
+            print('{0}: salt-call min {1:.3f}s, mean {2:.3f}s, module file '
+                  'mapping min {3:.1f}ms'.format(
+                      case, min(timings), sum(timings) / len(timings),
+                      min(mappings) * 1000))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    run(parse())
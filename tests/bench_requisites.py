@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+'''
+Time the compilation and the run of high data made of long requisite chains
+
+Every state requires the one before it, and every tenth state also adds
+itself to the requisites of the state after it with require_in, so that both
+the requisite_in expansion and the requisite lookups of the state run are
+exercised. The states are ordered so that each requisite has already run when
+the state requiring it is reached, which keeps the state run iterative.
+
+    python tests/bench_requisites.py -s 1000,5000,20000
+'''
+# Import python libs
+from __future__ import absolute_import, print_function
+import optparse
+import tempfile
+import time
+
+# Import Salt libs
+import salt.config
+import salt.state
+from salt.utils.odict import OrderedDict
+
+
+def parse():
+    '''
+    Parse command line options
+    '''
+    parser = optparse.OptionParser()
+    parser.add_option('-s',
+            '--sizes',
+            dest='sizes',
+            default='1000,5000,20000',
+            help='Comma separated numbers of states to time')
+    parser.add_option('--compile-only',
+            dest='compile_only',
+            default=False,
+            action='store_true',
+            help='Only compile the high data, do not run the states')
+    options, _ = parser.parse_args()
+    return options
+
+
+def high_data(size):
+    '''
+    Return high data of ``size`` states requiring each other in a chain
+    '''
+    high = OrderedDict()
+    for num in range(size):
+        args = ['succeed_without_changes', {'order': num + 1}]
+        if num:
+            args.append({'require': [{'test': 'state{0}'.format(num - 1)}]})
+        if num % 10 == 0 and num + 1 < size:
+            args.append({'require_in': [{'test': 'state{0}'.format(num + 1)}]})
+        high['state{0}'.format(num)] = {'test': args,
+                                        '__sls__': 'bench',
+                                        '__env__': 'base'}
+    return high
+
+
+def run(options):
+    opts = salt.config.minion_config(None)
+    opts['file_client'] = 'local'
+    opts['cachedir'] = tempfile.mkdtemp()
+    opts['state_events'] = False
+    state = salt.state.State(opts)
+    for size in [int(size) for size in options.sizes.split(',')]:
+        start = time.time()
+        chunks, errors = state.compile_lowstate(high_data(size))
+        compiled = time.time()
+        if errors:
+            print('{0} states: {1}'.format(size, errors))
+            continue
+        if options.compile_only:
+            print('{0} states: compiled in {1:.2f}s'.format(size, compiled - start))
+            continue
+        ret = state.call_lowstate(chunks)
+        done = time.time()
+        failed = [tag for tag, result in ret.items() if not result['result']]
+        print('{0} states: compiled in {1:.2f}s, ran in {2:.2f}s, {3} failed'.format(
+            size, compiled - start, done - compiled, len(failed)))
+
+
+if __name__ == '__main__':
+    run(parse())
@@ -5,11 +5,13 @@ unit tests for salt.cache
 
 # Import Python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import threading
 
 # Import Salt Testing libs
 # import integration
 from tests.support.unit import skipIf, TestCase
 from tests.support.mock import (
+    MagicMock,
     NO_MOCK,
     NO_MOCK_REASON,
     patch,
@@ -217,3 +219,193 @@ class MemCacheTest(TestCase):
         # Check debug data
         self.assertEqual(self.cache.call, 6)
         self.assertEqual(self.cache.hit, 3)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class DeferredWriterTest(TestCase):
+    '''
+    Validate deferred cache writes
+    '''
+    def setUp(self):
+        self.opts = {'cache': 'fake_driver',
+                     'cache_flush_interval': 60}
+        self.store_many = MagicMock()
+        self.fetch = MagicMock(return_value='stored_data')
+        modules = {'fake_driver.store_many': self.store_many,
+                   'fake_driver.fetch': self.fetch,
+                   'fake_driver.flush': MagicMock()}
+        patcher = patch('salt.loader.cache', return_value=modules)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = salt.cache.factory(self.opts)
+        self.addCleanup(self.cache._writer.stop_event.set)
+
+    def tearDown(self):
+        del self.opts
+        del self.store_many
+        del self.fetch
+        del self.cache
+
+    def test_defer_store_is_read_back_and_flushed(self):
+        self.cache.defer_store('bank1', 'key1', 'data1')
+        self.cache.defer_store('bank1', 'key1', 'data2')
+        self.cache.defer_store('bank1', 'key2', None)
+        self.assertEqual(self.cache.fetch('bank1', 'key1'), 'data2')
+        self.assertEqual(self.cache.fetch('bank1', 'key2'), None)
+        self.assertEqual(self.cache.fetch('bank2', 'key1'), 'stored_data')
+        self.store_many.assert_not_called()
+
+        self.cache._writer.flush()
+        self.store_many.assert_called_once_with(
+            'bank1', {'key1': 'data2', 'key2': None})
+        self.assertEqual(self.cache.fetch('bank1', 'key1'), 'stored_data')
+
+    def test_flush_discards_deferred_writes(self):
+        self.cache.defer_store('minions/alpha', 'mine', 'data')
+        self.cache.flush('minions')
+        self.cache._writer.flush()
+        self.store_many.assert_not_called()
+
+    def test_stop_waits_for_running_flush(self):
+        '''
+        stop() must not flush while the background thread is storing a batch,
+        and neither batch may be lost
+        '''
+        storing = threading.Event()
+        release = threading.Event()
+        stored = []
+
+        def store_many(bank, data):
+            stored.append((bank, data))
+            if len(stored) == 1:
+                storing.set()
+                release.wait(10)
+        self.cache.modules['fake_driver.store_many'] = store_many
+        self.cache._writer.interval = 0.01
+        self.cache.defer_store('bank1', 'key1', 'data1')
+        self.assertTrue(storing.wait(10))
+
+        self.cache.defer_store('bank2', 'key1', 'data2')
+        stopper = threading.Thread(target=self.cache._writer.stop)
+        stopper.start()
+        stopper.join(0.2)
+        self.assertTrue(stopper.is_alive())
+        self.assertEqual(self.cache.fetch('bank1', 'key1'), 'data1')
+        self.assertEqual(self.cache.fetch('bank2', 'key1'), 'data2')
+
+        release.set()
+        stopper.join(10)
+        self.assertFalse(stopper.is_alive())
+        self.assertEqual(stored, [('bank1', {'key1': 'data1'}),
+                                  ('bank2', {'key1': 'data2'})])
+
+    def test_store_many_falls_back_to_store(self):
+        store = MagicMock()
+        self.cache.modules.pop('fake_driver.store_many')
+        self.cache.modules['fake_driver.store'] = store
+        self.cache.store_many('bank', {'key': 'data'})
+        store.assert_called_once_with('bank', 'key', 'data')
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class LRUCacheTest(TestCase):
+    '''
+    Validate the LRU cache
+    '''
+    def setUp(self):
+        salt.cache.LRUCache.data = {}
+        salt.cache.LRUCache.counters = {}
+        self.opts = {'cache': 'fake_driver',
+                     'cache_lru_max_bytes': 2 * len(salt.payload.Serial('msgpack').dumps('x' * 100, use_bin_type=True)) + 1}
+        self.stored = {}
+        self.updated = {}
+        self.modules = {
+            'fake_driver.fetch': MagicMock(side_effect=lambda bank, key: self.stored.get((bank, key), {})),
+            'fake_driver.updated': MagicMock(side_effect=lambda bank, key: self.updated.get((bank, key))),
+            'fake_driver.store': MagicMock(),
+            'fake_driver.flush': MagicMock(),
+        }
+        patcher = patch('salt.loader.cache', return_value=self.modules)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = salt.cache.factory(self.opts)
+
+    def tearDown(self):
+        del self.opts
+        del self.stored
+        del self.updated
+        del self.modules
+        del self.cache
+
+    def test_factory_lru_cache(self):
+        self.assertIsInstance(self.cache, salt.cache.LRUCache)
+
+    def test_fetch_revalidates_on_update(self):
+        fetch = self.modules['fake_driver.fetch']
+        self.stored[('bank', 'key1')] = 'x' * 100
+        self.updated[('bank', 'key1')] = 10
+        self.assertEqual(self.cache.fetch('bank', 'key1'), 'x' * 100)
+        self.assertEqual(self.cache.fetch('bank', 'key1'), 'x' * 100)
+        self.assertEqual(fetch.call_count, 1)
+
+        self.stored[('bank', 'key1')] = 'y' * 100
+        self.updated[('bank', 'key1')] = 11
+        self.assertEqual(self.cache.fetch('bank', 'key1'), 'y' * 100)
+        self.assertEqual(fetch.call_count, 2)
+        stats = salt.cache.LRUCache.stats()['fake_driver']
+        self.assertEqual((stats['hit'], stats['miss'], stats['items']), (1, 2, 1))
+
+    def test_fetch_returns_copies(self):
+        self.cache.max_bytes = 1024 * 1024
+        self.stored[('bank', 'key1')] = {'list': ['x' * 10], 'bytes': b'\xff'}
+        self.updated[('bank', 'key1')] = 10
+        self.cache.fetch('bank', 'key1')['list'].append('y')
+        data = self.cache.fetch('bank', 'key1')
+        data['list'].append('z')
+        data['new'] = True
+        self.assertEqual(self.cache.fetch('bank', 'key1'),
+                         {'list': ['x' * 10], 'bytes': b'\xff'})
+        self.assertEqual(self.modules['fake_driver.fetch'].call_count, 1)
+
+    def test_fetch_does_not_trust_the_current_second(self):
+        fetch = self.modules['fake_driver.fetch']
+        self.updated[('bank', 'key1')] = 10
+        with patch('time.time', return_value=10.5):
+            self.cache.fetch('bank', 'key1')
+            self.cache.fetch('bank', 'key1')
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_evicts_least_recently_used(self):
+        for key in ('key1', 'key2', 'key3'):
+            self.stored[('bank', key)] = 'x' * 100
+            self.updated[('bank', key)] = 10
+        self.cache.fetch('bank', 'key1')
+        self.cache.fetch('bank', 'key2')
+        self.cache.fetch('bank', 'key1')
+        self.cache.fetch('bank', 'key3')
+        self.assertEqual(list(salt.cache.LRUCache.data['fake_driver']),
+                         [('bank', 'key1'), ('bank', 'key3')])
+        stats = salt.cache.LRUCache.stats()['fake_driver']
+        self.assertEqual(stats['eviction'], 1)
+        self.assertEqual(stats['bytes'], 2 * len(salt.payload.Serial('msgpack').dumps('x' * 100, use_bin_type=True)))
+
+    def test_store_and_flush_invalidate(self):
+        self.updated[('bank', 'key1')] = 10
+        self.cache.fetch('bank', 'key1')
+        self.cache.store('bank', 'key1', 'data')
+        self.assertEqual(salt.cache.LRUCache.data['fake_driver'], {})
+        self.cache.fetch('bank/sub', 'key1')
+        self.cache.flush('bank')
+        self.assertEqual(salt.cache.LRUCache.data['fake_driver'], {})
+        self.assertEqual(salt.cache.LRUCache.stats()['fake_driver']['bytes'], 0)
+
+    def test_ttl_without_updated(self):
+        del self.modules['fake_driver.updated']
+        fetch = self.modules['fake_driver.fetch']
+        with patch('time.time', return_value=0):
+            self.cache.fetch('bank', 'key1')
+            self.cache.fetch('bank', 'key1')
+        self.assertEqual(fetch.call_count, 1)
+        with patch('time.time', return_value=61):
+            self.cache.fetch('bank', 'key1')
+        self.assertEqual(fetch.call_count, 2)
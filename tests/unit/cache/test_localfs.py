@@ -103,6 +103,23 @@ class LocalFSTest(TestCase, LoaderModuleMockMixin):
             for line in fh_:
                 self.assertIn(b'payload data', line)
 
+    # 'store_many' function tests: 1
+
+    def test_store_many_success(self):
+        '''
+        Tests that store_many writes every key of the bank.
+        '''
+        tmp_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        with patch.dict(localfs.__context__, {'serial': salt.payload.Serial(self)}):
+            localfs.store_many(bank='bank',
+                               data={'key1': 'payload one', 'key2': 'payload two'},
+                               cachedir=tmp_dir)
+            self.assertEqual(localfs.fetch(bank='bank', key='key1', cachedir=tmp_dir),
+                             'payload one')
+            self.assertEqual(localfs.fetch(bank='bank', key='key2', cachedir=tmp_dir),
+                             'payload two')
+
     # 'fetch' function tests: 3
 
     def test_fetch_return_when_cache_file_does_not_exist(self):
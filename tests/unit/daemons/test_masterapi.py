@@ -574,6 +574,20 @@ class RemoteFuncsTestCase(TestCase):
         self.funcs = masterapi.RemoteFuncs(opts)
         self.funcs.cache = FakeCache()
 
+    def test_mine(self):
+        '''
+        Asserts that ``_mine`` merges the data into the mine stored in the
+        cache, and stores it right away
+        '''
+        self.funcs.opts['minion_data_cache'] = True
+        self.funcs.opts['cache_flush_interval'] = 5
+        self.funcs.cache.store('minions/webserver', 'mine',
+                               dict(ip_addr='2001:db8::1:3'))
+        self.assertTrue(self.funcs._mine({'id': 'webserver',
+                                          'data': dict(os='Linux')}))
+        self.assertDictEqual(self.funcs.cache.fetch('minions/webserver', 'mine'),
+                             dict(ip_addr='2001:db8::1:3', os='Linux'))
+
     def test_mine_get(self, tgt_type_key='tgt_type'):
         '''
         Asserts that ``mine_get`` gives the expected results.
@@ -6,6 +6,7 @@
 # Import Python libs
 from __future__ import absolute_import, print_function, unicode_literals
 import errno
+import hashlib
 import os
 import shutil
 import tempfile
@@ -29,6 +30,7 @@ from tests.support.helpers import patched_environ
 import salt.fileserver.gitfs as gitfs
 import salt.utils.files
 import salt.utils.platform
+import salt.utils.stringutils
 import salt.utils.win_functions
 import salt.utils.yaml
 import salt.ext.six
@@ -381,6 +383,57 @@ class GitFSTestFuncs(object):
             # the envs list, but the branches should not.
             self.assertEqual(ret, ['base', 'world'])
 
+    def test_serve_from_odb(self):
+        '''
+        Test that files are served straight from the object database when
+        gitfs_serve_from_odb is set, and that file lists are only rebuilt
+        when the tree of the ref changes
+        '''
+        opts = {'gitfs_serve_from_odb': True,
+                'hash_type': 'sha256',
+                'file_buffer_size': 262144}
+        with patch.dict(gitfs.__opts__, opts):
+            gitfs.update()
+            fnd = gitfs.find_file('testfile', 'base')
+            self.assertEqual(fnd['rel'], 'testfile')
+            self.assertIn('blob', fnd)
+            # Nothing is written to the gitfs cache
+            self.assertFalse(os.path.exists(fnd['path']))
+
+            with salt.utils.files.fopen(
+                    os.path.join(self.tmp_repo_dir, 'testfile'), 'rb') as fp_:
+                content = fp_.read()
+            ret = gitfs.serve_file(
+                {'path': 'testfile', 'saltenv': 'base', 'loc': 0}, fnd)
+            self.assertEqual(
+                salt.utils.stringutils.to_bytes(ret['data']), content)
+            ret = gitfs.file_hash({'path': 'testfile', 'saltenv': 'base'}, fnd)
+            self.assertEqual(
+                ret['hsum'], hashlib.sha256(content).hexdigest())
+
+            self.assertIn('testfile', gitfs.file_list(LOAD))
+            walked = AssertionError('tree re-walked')
+            with patch.object(salt.utils.gitfs.GitPython, 'file_list',
+                              side_effect=walked), \
+                    patch.object(salt.utils.gitfs.GitPython, 'dir_list',
+                                 side_effect=walked), \
+                    patch.object(salt.utils.gitfs.Pygit2, 'file_list',
+                                 side_effect=walked), \
+                    patch.object(salt.utils.gitfs.Pygit2, 'dir_list',
+                                 side_effect=walked):
+                self.assertIn('testfile', gitfs.file_list(LOAD))
+                self.assertIn('grail', gitfs.dir_list(LOAD))
+
+            # Large blobs are written to the cache and served from there
+            with patch.object(salt.utils.gitfs, 'BLOB_SERVE_MAX_SIZE', 1):
+                fnd = gitfs.find_file('testfile', 'base')
+                self.assertNotIn('blob', fnd)
+                self.assertTrue(os.path.exists(fnd['path']))
+                ret = gitfs.serve_file(
+                    {'path': 'testfile', 'saltenv': 'base', 'loc': 0}, fnd)
+                self.assertEqual(
+                    salt.utils.stringutils.to_bytes(ret['data']), content)
+
 
 class GitFSTestBase(object):
 
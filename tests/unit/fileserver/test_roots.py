@@ -7,13 +7,14 @@
 from __future__ import absolute_import, print_function, unicode_literals
 import copy
 import os
+import shutil
 import tempfile
 
 # Import Salt Testing libs
 from tests.integration import AdaptedConfigurationTestCaseMixin
 from tests.support.mixins import LoaderModuleMockMixin
 from tests.support.unit import TestCase, skipIf
-from tests.support.mock import patch, NO_MOCK, NO_MOCK_REASON
+from tests.support.mock import patch, MagicMock, NO_MOCK, NO_MOCK_REASON
 from tests.support.runtests import RUNTIME_VARS
 from tests.support.paths import TMP
 
@@ -179,6 +180,44 @@ class RootsTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderModuleMockMix
             if self.test_symlink_list_file_roots:
                 self.opts['file_roots'] = orig_file_roots
 
+    def test_roots_index(self):
+        '''
+        The in-memory index of the file_roots returns the same lists as
+        walking them, and picks up changes
+        '''
+        funcs = (roots.file_list, roots.file_list_emptydirs,
+                 roots.dir_list, roots.symlink_list)
+        expected = [func({'saltenv': 'base'}) for func in funcs]
+        with patch.dict(roots.__opts__, {'fileserver_roots_index': True}), \
+                patch.dict(roots._INDEX, clear=True):
+            self.assertEqual([func({'saltenv': 'base'}) for func in funcs], expected)
+
+        idx_root = tempfile.mkdtemp(dir=TMP)
+        self.addCleanup(shutil.rmtree, idx_root)
+        opts = {'file_roots': {'idx': [idx_root]},
+                'fileserver_roots_index': True,
+                'fileserver_list_cache_time': 0}
+        load = {'saltenv': 'idx'}
+        with patch.dict(roots.__opts__, opts), \
+                patch.dict(roots._INDEX, clear=True), \
+                patch.dict(roots._HASHES, clear=True):
+            os.makedirs(os.path.join(idx_root, 'sub'))
+            self.assertEqual(roots.file_list_emptydirs(load), ['sub'])
+            self.assertEqual(roots.file_list(load), [])
+
+            path = os.path.join(idx_root, 'sub', 'foo')
+            with salt.utils.files.fopen(path, 'w') as fp_:
+                fp_.write('foo')
+            self.assertEqual(roots.file_list(load), ['sub/foo'])
+            self.assertEqual(roots.file_list_emptydirs(load), [])
+
+            # Hashes are served from memory while the file is unchanged
+            load['path'] = path
+            fnd = {'path': path, 'rel': 'sub/foo'}
+            ret = roots.file_hash(load, fnd)
+            with patch('salt.utils.hashutils.get_hash', MagicMock(side_effect=AssertionError)):
+                self.assertEqual(roots.file_hash(load, fnd), ret)
+
     def test_dynamic_file_roots(self):
         dyn_root_dir = tempfile.mkdtemp(dir=TMP)
         top_sls = os.path.join(dyn_root_dir, 'top.sls')
@@ -191,3 +191,76 @@ class MatchTestCase(TestCase, LoaderModuleMockMixin):
             lookup,
             merge=mdict
         )
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class CompoundMatchTestCase(TestCase):
+    '''
+    Tests for the compiled and cached compound matcher
+    '''
+    def setUp(self):
+        self.opts = {'id': MINION_ID,
+                     'grains': {'os': 'Ubuntu'},
+                     'pillar': {'role': 'web'},
+                     'nodegroups': {'group1': 'L@foo,bar03'}}
+        self.grain_match = MagicMock(side_effect=lambda tgt, delimiter=':': tgt == 'os:Ubuntu')
+        self.matchers = {
+            'glob_match.match': MagicMock(side_effect=lambda tgt: tgt == MINION_ID),
+            'list_match.match': MagicMock(side_effect=lambda tgt: MINION_ID in tgt.split(',')),
+            'grain_match.match': self.grain_match,
+        }
+        patcher = patch('salt.loader.matchers', MagicMock(return_value=self.matchers))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        compound_match._COMPILED.clear()
+        compound_match._RESULTS.update({'data': None, 'results': {}})
+
+    def tearDown(self):
+        del self.opts
+        del self.grain_match
+        del self.matchers
+
+    def test_match(self):
+        self.assertTrue(compound_match.match('G@os:Ubuntu and bar03', opts=self.opts))
+        self.assertFalse(compound_match.match('G@os:Ubuntu and not bar03', opts=self.opts))
+        self.assertTrue(compound_match.match('foo or ( N@group1 and G@os:Ubuntu )', opts=self.opts))
+        self.assertTrue(compound_match.match(['G@os:Ubuntu', 'and', 'bar03'], opts=self.opts))
+        self.assertFalse(compound_match.match('and bar03', opts=self.opts))
+        self.assertFalse(compound_match.match('( bar03', opts=self.opts))
+        self.assertFalse(compound_match.match('X@foo', opts=self.opts))
+
+    def test_cache(self):
+        for _ in range(3):
+            self.assertTrue(compound_match.match('G@os:Ubuntu and bar03', opts=self.opts))
+        self.assertEqual(self.grain_match.call_count, 1)
+        self.assertEqual(len(compound_match._COMPILED), 1)
+
+        # Refreshing the grains replaces the grains dict
+        self.opts['grains'] = {'os': 'Ubuntu'}
+        self.assertTrue(compound_match.match('G@os:Ubuntu and bar03', opts=self.opts))
+        self.assertEqual(self.grain_match.call_count, 2)
+
+        # Results are not shared between minion ids
+        opts = dict(self.opts, id='foo')
+        self.assertTrue(compound_match.match('G@os:Ubuntu', opts=opts))
+        self.assertEqual(self.grain_match.call_count, 3)
+
+    def test_cache_nodegroups(self):
+        with patch.object(compound_match, '_compile', MagicMock(wraps=compound_match._compile)) as compile_:
+            # Minions usually have no nodegroups configured
+            opts = dict(self.opts)
+            del opts['nodegroups']
+            for _ in range(2):
+                compound_match.match('bar03', opts=dict(opts))
+            self.assertEqual(compile_.call_count, 1)
+            for _ in range(2):
+                compound_match.match('N@group1', opts=dict(self.opts, nodegroups={'group1': 'bar03'}))
+            self.assertEqual(compile_.call_count, 2)
+            compound_match.match('N@group1', opts=dict(self.opts, nodegroups={'group1': 'foo'}))
+            self.assertEqual(compile_.call_count, 3)
+
+    def test_cache_size(self):
+        with patch.object(compound_match, 'COMPILED_MAX', 2):
+            for tgt in ('foo', 'bar03', 'baz', 'bar03'):
+                compound_match.match(tgt, opts=self.opts)
+        self.assertEqual(list(compound_match._COMPILED), ['baz', 'bar03'])
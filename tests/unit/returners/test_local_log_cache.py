@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+'''
+Unit tests for the log structured job cache (local_log_cache).
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import os
+import shutil
+import time
+
+# Import Salt Testing libs
+from tests.support.mixins import LoaderModuleMockMixin
+from tests.support.runtests import RUNTIME_VARS
+from tests.support.unit import TestCase, skipIf
+from tests.support.mock import (
+    NO_MOCK,
+    NO_MOCK_REASON,
+    patch
+)
+
+# Import Salt libs
+import salt.returners.local_log_cache as local_log_cache
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class LocalLogCacheTestCase(TestCase, LoaderModuleMockMixin):
+    '''
+    Tests for the local_log_cache returner
+    '''
+    @classmethod
+    def setUpClass(cls):
+        cls.TMP_CACHE_DIR = os.path.join(RUNTIME_VARS.TMP, 'salt_test_job_log_cache')
+
+    def setup_loader_modules(self):
+        return {local_log_cache: {'__opts__': {'cachedir': self.TMP_CACHE_DIR,
+                                               'keep_jobs': 1,
+                                               'hash_type': 'sha256',
+                                               'unique_jid': False}}}
+
+    def setUp(self):
+        for key in ('segments', 'segment_jids', 'jobs'):
+            patcher = patch.dict(local_log_cache._INDEX, {key: {}})
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        if os.path.exists(self.TMP_CACHE_DIR):
+            shutil.rmtree(self.TMP_CACHE_DIR)
+
+    def _forget_index(self):
+        '''
+        Emulate another master process which has not read the log yet
+        '''
+        for key in ('segments', 'segment_jids', 'jobs'):
+            local_log_cache._INDEX[key] = {}
+
+    def test_store_and_fetch_job(self):
+        jid = local_log_cache.prep_jid()
+        load = {'fun': 'test.ping', 'arg': [], 'tgt': 'minion',
+                'tgt_type': 'glob', 'user': 'root', 'jid': jid}
+        local_log_cache.save_load(jid, load, minions=['minion'])
+        local_log_cache.save_minions(jid, ['syndic_minion'], syndic_id='syndic')
+        local_log_cache.returner({'jid': jid, 'id': 'minion', 'return': True,
+                                  'retcode': 0, 'success': True, 'out': 'nested'})
+        local_log_cache.update_endtime(jid, '2019, Jan 01 00:00:00.000000')
+        self._forget_index()
+
+        ret = local_log_cache.get_load(jid)
+        self.assertEqual(ret['fun'], 'test.ping')
+        self.assertEqual(ret['Minions'], ['minion', 'syndic_minion'])
+        self.assertEqual(local_log_cache.get_jid(jid),
+                         {'minion': {'return': True, 'retcode': 0,
+                                     'success': True, 'out': 'nested'}})
+        self.assertEqual(local_log_cache.get_endtime(jid),
+                         '2019, Jan 01 00:00:00.000000')
+        self.assertEqual(list(local_log_cache.get_jids()), [jid])
+        self.assertEqual([x['JID'] for x in local_log_cache.get_jids_filter(10)],
+                         [jid])
+        self.assertEqual(local_log_cache.get_load('20190101000000000000'), {})
+        self.assertFalse(local_log_cache.get_endtime('20190101000000000000'))
+
+    def test_returner_drops_duplicate_and_nocache(self):
+        jid = local_log_cache.prep_jid()
+        load = {'jid': jid, 'id': 'minion', 'return': 'first'}
+        self.assertIsNone(local_log_cache.returner(load))
+        self.assertFalse(local_log_cache.returner(dict(load, **{'return': 'second'})))
+        self.assertEqual(local_log_cache.get_jid(jid)['minion']['return'], 'first')
+
+        jid = local_log_cache.prep_jid(nocache=True)
+        self.assertFalse(local_log_cache.returner({'jid': jid, 'id': 'minion', 'return': True}))
+        self.assertEqual(local_log_cache.get_jid(jid), {})
+
+    def test_prep_jid_does_not_reuse_jids(self):
+        with patch('salt.utils.jid.gen_jid', side_effect=['20190101000000000000',
+                                                          '20190101000000000000',
+                                                          '20190101000000000001']):
+            self.assertEqual(local_log_cache.prep_jid(), '20190101000000000000')
+            self.assertEqual(local_log_cache.prep_jid(), '20190101000000000001')
+
+    def test_clean_old_jobs_drops_expired_segments(self):
+        with patch.dict(local_log_cache.__opts__, {'local_log_cache.segment_interval': 1}):
+            jid = local_log_cache.prep_jid()
+            local_log_cache.save_load(jid, {'fun': 'test.ping'})
+            self.assertIn('fun', local_log_cache.get_load(jid))
+            log_dir = os.path.join(self.TMP_CACHE_DIR, 'jobs_log')
+            segment = os.listdir(log_dir)[0]
+            # Make sure the segment is not the active one anymore
+            time.sleep(1.1)
+            with patch.dict(local_log_cache.__opts__, {'keep_jobs': 0.00000001}):
+                local_log_cache.clean_old_jobs()
+            self.assertNotIn(segment, os.listdir(log_dir))
+            self.assertEqual(local_log_cache.get_load(jid), {})
+            self.assertNotIn(jid, local_log_cache._INDEX['jobs'])
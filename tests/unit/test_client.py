@@ -5,14 +5,18 @@
 
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import os
 
 # Import Salt Testing libs
 import tests.integration as integration
 from tests.support.unit import TestCase, skipIf
-from tests.support.mock import patch, NO_MOCK, NO_MOCK_REASON
+from tests.support.events import eventpublisher_process
+from tests.support.mock import MagicMock, patch, NO_MOCK, NO_MOCK_REASON
 
 # Import Salt libs
 from salt import client
+import salt.utils.event
+import salt.utils.files
 import salt.utils.platform
 from salt.exceptions import (
     EauthAuthenticationError, SaltInvocationError, SaltClientError, SaltReqTimeoutError
@@ -81,6 +85,45 @@ class LocalClientTestCase(TestCase,
                                                     ret='')
 
     @skipIf(salt.utils.platform.is_windows(), 'Not supported on Windows')
+    def test_get_iter_returns_batch(self):
+        '''
+        Tests that the events of a job published while the returns of another
+        job are read reach the client
+        '''
+        opts = self.get_temp_config('master')
+        local_client = client.LocalClient(mopts=opts)
+        sender = salt.utils.event.MasterEvent(opts['sock_dir'], listen=False)
+
+        def _send(load, **kwargs):
+            # What the master fires when the job is published and the minion
+            # returns right away
+            sender.fire_event({'minions': ['minion2']}, 'salt/job/2/new')
+            sender.fire_event({'id': 'minion2', 'return': True}, 'salt/job/2/ret/minion2')
+            return {'load': {'jid': '2', 'minions': ['minion2']}}
+
+        channel = MagicMock()
+        channel.send.side_effect = _send
+        returners = {'local_cache.get_load': MagicMock(return_value={'fun': 'test.ping'})}
+        with eventpublisher_process(opts['sock_dir']), \
+                patch.object(local_client, 'returners', returners), \
+                patch('salt.transport.client.ReqChannel.factory', return_value=channel):
+            # pub checks the master publisher is running
+            with salt.utils.files.fopen(os.path.join(opts['sock_dir'], 'publish_pull.ipc'), 'w'):
+                pass
+            local_client.event.connect_pub()
+            first = local_client.get_iter_returns('1', ['minion1'], timeout=10)
+            sender.fire_event({'id': 'minion1', 'return': True}, 'salt/job/1/ret/minion1')
+            self.assertEqual(next(first), {'minion1': {'ret': True}})
+            # Leave the publisher the time to apply a tag filter, if any
+            self.assertIsNone(local_client.event.get_event(wait=0.5, tag='salt/job/1/ret'))
+            pub_data = local_client.pub('minion2', 'test.ping')
+            self.assertEqual(pub_data, {'jid': '2', 'minions': ['minion2']})
+            self.assertEqual(list(first), [])
+            second = local_client.get_iter_returns('2', ['minion2'], timeout=10)
+            self.assertEqual(list(second), [{'minion2': {'ret': True}}])
+        sender.destroy()
+        del local_client
+
     def test_pub(self):
         '''
         Tests that the client cleanly returns when the publisher is not running
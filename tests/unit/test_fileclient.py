@@ -411,3 +411,98 @@ class FileclientCacheTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderMod
                 log.debug('cache_loc = %s', cache_loc)
                 log.debug('content = %s', content)
                 self.assertTrue(saltenv in content)
+
+    def test_get_file_chunked(self):
+        '''
+        Ensure that chunked transfers only fetch the chunks which are missing
+        from the local copy of the file
+        '''
+        patched_opts = dict((x, y) for x, y in six.iteritems(self.minion_opts))
+        patched_opts.update(self.MOCKED_OPTS)
+        patched_opts.update({'file_chunk_transfer': True,
+                             'file_chunk_size': 8,
+                             'file_chunk_batch': 3})
+        path = os.path.join(self.FS_ROOT, 'base', 'chunked.txt')
+        content = ''.join('{0:07d}\n'.format(x) for x in range(16))
+        with salt.utils.files.fopen(path, 'w') as fp_:
+            fp_.write(content)
+
+        with patch.dict(fileclient.__opts__, patched_opts):
+            client = fileclient.get_file_client(fileclient.__opts__, pillar=False)
+            send = client.channel.send
+            served = []
+
+            def _send(load, **kwargs):
+                if load['cmd'] == '_serve_chunks':
+                    served.append(list(load['chunks']))
+                return send(load, **kwargs)
+
+            with patch.object(client.channel, 'send', _send):
+                cache_loc = client.cache_file('salt://chunked.txt', 'base')
+                self.assertEqual(
+                    served,
+                    [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9, 10, 11], [12, 13, 14], [15]])
+                with salt.utils.files.fopen(cache_loc) as fp_:
+                    self.assertEqual(fp_.read(), content)
+
+                content = content.replace('0000003\n', 'changed\n')
+                with salt.utils.files.fopen(path, 'w') as fp_:
+                    fp_.write(content)
+                del served[:]
+                self.assertEqual(client.cache_file('salt://chunked.txt', 'base'), cache_loc)
+                self.assertEqual(served, [[3]])
+                with salt.utils.files.fopen(cache_loc) as fp_:
+                    self.assertEqual(fp_.read(), content)
+
+    def test_cache_files_batched(self):
+        '''
+        Ensure that batched transfers request several files at once, skip
+        the files which are unchanged, and fall back to individual transfers
+        for large files
+        '''
+        patched_opts = dict((x, y) for x, y in six.iteritems(self.minion_opts))
+        patched_opts.update(self.MOCKED_OPTS)
+        patched_opts.update({'file_batch_size': 2,
+                             'file_batch_max_size': 64})
+        paths = []
+        for name, size in (('a', 8), ('b', 8), ('c', 128), ('d', 8)):
+            path = os.path.join(self.FS_ROOT, 'base', 'batch_{0}.txt'.format(name))
+            with salt.utils.files.fopen(path, 'w') as fp_:
+                fp_.write(name * size)
+            paths.append('salt://batch_{0}.txt'.format(name))
+        paths.append('salt://batch_missing.txt')
+
+        with patch.dict(fileclient.__opts__, patched_opts):
+            client = fileclient.get_file_client(fileclient.__opts__, pillar=False)
+            send = client.channel.send
+            requested = []
+
+            def _send(load, **kwargs):
+                if load['cmd'] in ('_serve_files', '_serve_file'):
+                    requested.append((load['cmd'], load.get('paths', load.get('path'))))
+                return send(load, **kwargs)
+
+            with patch.object(client.channel, 'send', _send):
+                ret = client.cache_files(paths, 'base')
+                self.assertEqual(
+                    requested[:3],
+                    [('_serve_files', ['batch_a.txt', 'batch_b.txt']),
+                     ('_serve_files', ['batch_c.txt', 'batch_d.txt']),
+                     ('_serve_files', ['batch_missing.txt'])])
+                # Only the large file is transferred individually
+                self.assertEqual(
+                    set(requested[3:]), set([('_serve_file', 'batch_c.txt')]))
+                self.assertIs(ret[-1], False)
+                for name, size, cache_loc in zip('abcd', (8, 8, 128, 8), ret):
+                    with salt.utils.files.fopen(cache_loc) as fp_:
+                        self.assertEqual(fp_.read(), name * size)
+
+                with salt.utils.files.fopen(
+                        os.path.join(self.FS_ROOT, 'base', 'batch_b.txt'), 'w') as fp_:
+                    fp_.write('changed')
+                del requested[:]
+                self.assertEqual(client.cache_files(paths[:2], 'base'), ret[:2])
+                self.assertEqual(
+                    requested, [('_serve_files', ['batch_a.txt', 'batch_b.txt'])])
+                with salt.utils.files.fopen(ret[1]) as fp_:
+                    self.assertEqual(fp_.read(), 'changed')
@@ -19,12 +19,14 @@ import shutil
 import sys
 import tempfile
 import textwrap
+import time
+import types
 
 # Import Salt Testing libs
 from tests.support.runtests import RUNTIME_VARS
 from tests.support.case import ModuleCase
 from tests.support.unit import TestCase
-from tests.support.mock import patch
+from tests.support.mock import patch, MagicMock
 
 # Import Salt libs
 import salt.config
@@ -308,6 +310,47 @@ class LazyLoaderGrainsBlacklistTest(TestCase):
         self.assertNotIn('ipv6', grains)
 
 
+class GrainsTTLTest(TestCase):
+    '''
+    Test the caching of grain functions with a TTL
+    '''
+    def setUp(self):
+        salt.loader._GRAINS_FUNC_CACHE.clear()
+        self.addCleanup(salt.loader._GRAINS_FUNC_CACHE.clear)
+
+    def test_call_grain_func(self):
+        calls = []
+
+        def func():
+            calls.append(True)
+            return {'calls': len(calls)}
+
+        opts = {'id': 'minion', 'grains_ttl': {'core.*': 60}}
+        self.assertEqual(salt.loader._call_grain_func(opts, 'core.func', func), {'calls': 1})
+        self.assertIn('core.func', salt.loader.GRAINS_FUNC_TIMINGS)
+        # Cached until the TTL expires
+        self.assertEqual(salt.loader._call_grain_func(opts, 'core.func', func), {'calls': 1})
+        now = time.time()
+        with patch('time.time', MagicMock(return_value=now + 120)):
+            self.assertEqual(salt.loader._call_grain_func(opts, 'core.func', func), {'calls': 2})
+
+        # Grain functions without a TTL always run
+        opts['grains_ttl'] = {'core.other': 60}
+        self.assertEqual(salt.loader._call_grain_func(opts, 'core.func', func), {'calls': 3})
+        self.assertEqual(salt.loader._call_grain_func(opts, 'core.func', func), {'calls': 4})
+
+    def test_declared_ttl(self):
+        module = types.ModuleType('grainsttl')
+        module.__grains_ttl__ = {'func': 60}
+        func = MagicMock(return_value={'foo': 'bar'})
+        with patch('inspect.getmodule', MagicMock(return_value=module)):
+            self.assertEqual(salt.loader._grain_ttl({}, 'grainsttl.func', func), 60)
+            self.assertEqual(salt.loader._grain_ttl({}, 'grainsttl.other', func), 0)
+            self.assertEqual(
+                salt.loader._grain_ttl({'grains_ttl': {'grainsttl.func': 5}}, 'grainsttl.func', func),
+                5)
+
+
 class LazyLoaderSingleItem(TestCase):
     '''
     Test loading a single item via the _load() function
@@ -507,6 +550,178 @@ def test():
 '''.format(virtual_aliases)
 
 
+class LazyLoaderManifestTest(TestCase):
+    '''
+    Test the persisted file mapping manifest of the loader
+    '''
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.mod_dir = os.path.join(self.tmp_dir, 'modules')
+        os.makedirs(self.mod_dir)
+        self.opts = {'cachedir': os.path.join(self.tmp_dir, 'cache'),
+                     'loader_manifest': True,
+                     'optimization_order': [0, 1, 2]}
+        self.write_module('first')
+        salt.loader.LazyLoader._manifests.clear()
+
+    def tearDown(self):
+        salt.loader.LazyLoader._manifests.clear()
+        shutil.rmtree(self.tmp_dir)
+        del self.tmp_dir
+        del self.mod_dir
+        del self.opts
+
+    def write_module(self, name):
+        with salt.utils.files.fopen(os.path.join(self.mod_dir, name + '.py'), 'w') as fh:
+            fh.write('def test():\n    return True\n')
+        # Backdate the directory so that the listing is considered settled
+        mtime = os.stat(self.mod_dir).st_mtime - 60 - len(os.listdir(self.mod_dir))
+        os.utime(self.mod_dir, (mtime, mtime))
+
+    def loader(self):
+        return salt.loader.LazyLoader([self.mod_dir], copy.deepcopy(self.opts), tag='module')
+
+    def test_manifest(self):
+        '''
+        The file mapping is read back from the manifest instead of listing
+        the module directories, until one of those directories changes
+        '''
+        file_mapping = self.loader().file_mapping
+        self.assertIn('first', file_mapping)
+        manifests = os.listdir(os.path.join(self.opts['cachedir'], 'loader'))
+        self.assertEqual(len(manifests), 1)
+        self.assertTrue(manifests[0].startswith('module-'))
+
+        # Start from the persisted manifest only
+        salt.loader.LazyLoader._manifests.clear()
+        with patch('os.listdir', side_effect=AssertionError('listdir called')):
+            loader = self.loader()
+            self.assertEqual(loader.file_mapping, file_mapping)
+            self.assertTrue(loader['first.test']())
+
+        # Adding a module invalidates the manifest
+        self.write_module('second')
+        self.assertIn('second', self.loader().file_mapping)
+
+        # A different configuration uses a different manifest
+        self.opts['disable_modules'] = ['first']
+        self.assertNotIn('first', self.loader().file_mapping)
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.opts['cachedir'], 'loader'))), 2)
+
+
+virtual_cache_template = '''
+import salt.utils.files
+
+with salt.utils.files.fopen({imports!r}, 'a') as fh:
+    fh.write('imported\\n')
+
+__virtual_cacheable__ = {cacheable}
+
+
+def __virtual__():
+    return {virtual}
+
+
+def test():
+    return True
+'''
+
+
+class LazyLoaderVirtualCacheTest(TestCase):
+    '''
+    Test the cache of unavailable modules according to __virtual__
+    '''
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.mod_dir = os.path.join(self.tmp_dir, 'modules')
+        os.makedirs(self.mod_dir)
+        self.imports = os.path.join(self.tmp_dir, 'imports')
+        self.opts = {'cachedir': os.path.join(self.tmp_dir, 'cache'),
+                     'loader_virtual_cache': True,
+                     'optimization_order': [0, 1, 2],
+                     'grains': {'os': 'Linux'}}
+        salt.loader.LazyLoader._virtual_caches.clear()
+
+    def tearDown(self):
+        salt.loader.LazyLoader._virtual_caches.clear()
+        shutil.rmtree(self.tmp_dir)
+        del self.tmp_dir
+        del self.mod_dir
+        del self.imports
+        del self.opts
+
+    def write_module(self, virtual, cacheable=True):
+        with salt.utils.files.fopen(os.path.join(self.mod_dir, 'vcache.py'), 'w') as fh:
+            fh.write(virtual_cache_template.format(imports=self.imports,
+                                                   virtual=virtual,
+                                                   cacheable=cacheable))
+
+    def load_all(self):
+        loader = salt.loader.LazyLoader([self.mod_dir], copy.deepcopy(self.opts), tag='module')
+        loader._load_all()
+        return loader
+
+    @property
+    def import_count(self):
+        with salt.utils.files.fopen(self.imports) as fh:
+            return len(fh.readlines())
+
+    def test_virtual_cache(self):
+        '''
+        Unavailable modules are not imported again until the module or the
+        fingerprint of the host changes
+        '''
+        self.write_module("(False, 'missing')")
+        self.assertEqual(self.load_all().missing_modules['vcache'], 'missing')
+        self.assertEqual(self.import_count, 1)
+
+        # Served from the persisted cache, without importing the module
+        salt.loader.LazyLoader._virtual_caches.clear()
+        loader = self.load_all()
+        self.assertEqual(loader.missing_modules['vcache'], 'missing')
+        self.assertNotIn('vcache.test', loader)
+        self.assertEqual(self.import_count, 1)
+
+        # Grains which differ between processes do not
+        self.opts['grains']['pid'] = 1234
+        self.load_all()
+        self.assertEqual(self.import_count, 1)
+
+        # Different grains use a different cache, the caches of the other
+        # fingerprints are only removed once unused for long
+        cache_dir = os.path.join(self.opts['cachedir'], 'loader')
+        old_cache = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+        self.opts['grains']['os'] = 'FreeBSD'
+        self.load_all()
+        self.assertEqual(self.import_count, 2)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+        expired = time.time() - salt.loader.VIRTUAL_CACHE_MAX_AGE - 1
+        os.utime(old_cache, (expired, expired))
+        self.opts['grains']['os'] = 'OpenBSD'
+        self.load_all()
+        self.assertEqual(self.import_count, 3)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+        self.assertFalse(os.path.exists(old_cache))
+
+        # Changing the module invalidates its entry
+        self.write_module('True')
+        self.assertTrue(self.load_all()['vcache.test']())
+        self.assertEqual(self.import_count, 4)
+
+    def test_virtual_cache_opt_in(self):
+        '''
+        The __virtual__ outcome of modules which do not set
+        __virtual_cacheable__ is not cached
+        '''
+        self.write_module("(False, 'missing')", cacheable=False)
+        self.assertEqual(self.load_all().missing_modules['vcache'], 'missing')
+        salt.loader.LazyLoader._virtual_caches.clear()
+        self.assertEqual(self.load_all().missing_modules['vcache'], 'missing')
+        self.assertEqual(self.import_count, 2)
+        self.assertFalse(os.path.exists(os.path.join(self.opts['cachedir'], 'loader')))
+
+
 class LazyLoaderVirtualAliasTest(TestCase):
     '''
     Test the loader of salt with changing modules
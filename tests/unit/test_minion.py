@@ -14,6 +14,7 @@ from tests.support.mock import NO_MOCK, NO_MOCK_REASON, patch, MagicMock
 from tests.support.mixins import AdaptedConfigurationTestCaseMixin
 from tests.support.helpers import skip_if_not_root
 # Import salt libs
+import salt.defaults.events
 import salt.minion
 import salt.utils.event as event
 from salt.exceptions import SaltSystemExit, SaltMasterUnresolvableError
@@ -383,6 +384,31 @@ class MinionTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
             self.assertIn('ps', minion.opts['beacons'])
             self.assertEqual(minion.opts['beacons']['ps'], bdata)
 
+    def test_fire_grains_changed(self):
+        '''
+        Tests that an event with the changed grains is fired, only when the
+        grains changed.
+        '''
+        with patch('salt.minion.Minion.ctx', MagicMock(return_value={})), \
+                patch('salt.minion.Minion.sync_connect_master', MagicMock(side_effect=RuntimeError('stop execution'))), \
+                patch('salt.utils.process.SignalHandlingMultiprocessingProcess.start', MagicMock(return_value=True)), \
+                patch('salt.utils.process.SignalHandlingMultiprocessingProcess.join', MagicMock(return_value=True)):
+            mock_opts = self.get_config('minion', from_scratch=True)
+            io_loop = tornado.ioloop.IOLoop()
+            io_loop.make_current()
+            minion = salt.minion.Minion(mock_opts, io_loop=io_loop)
+
+            mock_event = MagicMock()
+            with patch('salt.utils.event.get_event', MagicMock(return_value=mock_event)):
+                opts = {'grains': {'os': 'Linux', 'num_cpus': 4}}
+                minion._fire_grains_changed(opts, {'os': 'Linux', 'num_cpus': 4})
+                self.assertFalse(mock_event.fire_event.called)
+
+                minion._fire_grains_changed(opts, {'os': 'Linux', 'num_cpus': 2})
+                mock_event.fire_event.assert_called_once_with(
+                    {'num_cpus': {'old': 2, 'new': 4}},
+                    tag=salt.defaults.events.MINION_GRAINS_CHANGED)
+
 
 @skipIf(NO_MOCK, NO_MOCK_REASON)
 class MinionAsyncTestCase(TestCase, AdaptedConfigurationTestCaseMixin, tornado.testing.AsyncTestCase):
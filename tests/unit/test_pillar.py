@@ -9,8 +9,11 @@
 
 # Import python libs
 from __future__ import absolute_import
+import os
 import shutil
 import tempfile
+import threading
+import time
 
 # Import Salt Testing libs
 from tests.support.runtests import RUNTIME_VARS
@@ -19,8 +22,10 @@ from tests.support.unit import skipIf, TestCase
 from tests.support.mock import NO_MOCK, NO_MOCK_REASON, MagicMock, patch
 
 # Import salt libs
+import salt.config
 import salt.fileclient
 import salt.pillar
+import salt.utils.files
 import salt.utils.stringutils
 import salt.exceptions
 
@@ -82,6 +87,97 @@ class PillarTestCase(TestCase):
             self.assertEqual(pillar.opts['saltenv'], 'dev')
             self.assertEqual(pillar.opts['pillarenv'], 'dev')
 
+    def test_ext_pillar_concurrency(self):
+        opts = {
+            'optimization_order': [0, 1, 2],
+            'renderer': 'json',
+            'renderer_blacklist': [],
+            'renderer_whitelist': [],
+            'state_top': '',
+            'pillar_roots': {'base': []},
+            'file_roots': {'base': []},
+            'extension_modules': '',
+            'ext_pillar': [{'slow': {}}, {'fast': {}}, {'hung': {}}],
+            'ext_pillar_concurrency': 3,
+            'ext_pillar_timeout': 5,
+            'ext_pillar_timeouts': {'hung': 1},
+        }
+
+        def slow(minion_id, pillar):
+            time.sleep(0.5)
+            return {'source': 'slow', 'slow': True}
+
+        def fast(minion_id, pillar):
+            return {'source': 'fast'}
+
+        def hung(minion_id, pillar):
+            time.sleep(3)
+            return {'source': 'hung'}
+
+        with patch('salt.loader.pillars',
+                   MagicMock(return_value={'slow': slow, 'fast': fast, 'hung': hung})), \
+                patch.object(salt.pillar.Pillar, 'ext_pillar_counters', {}):
+            pillar = salt.pillar.Pillar(opts, {}, 'mocked-minion', 'base')
+            start = time.time()
+            data, errors = pillar.ext_pillar({})
+            self.assertLess(time.time() - start, 2)
+            # Merged in the configured order
+            self.assertEqual(data, {'source': 'fast', 'slow': True})
+            self.assertEqual(errors, ['Failed to load ext_pillar hung: timed out after 1 seconds'])
+            stats = salt.pillar.Pillar.ext_pillar_stats()
+            self.assertEqual(stats['hung']['timeouts'], 1)
+            self.assertEqual(stats['slow']['runs'], 1)
+            self.assertGreaterEqual(stats['slow']['max'], 0.5)
+
+            opts['ext_pillar_fail_policy'] = 'open'
+            pillar = salt.pillar.Pillar(opts, {}, 'mocked-minion', 'base')
+            self.assertEqual(pillar.ext_pillar({}),
+                             ({'source': 'fast', 'slow': True}, []))
+
+    def test_ext_pillar_concurrency_hung_source(self):
+        '''
+        Ensure that the sources which timed out do not hold up the sources of
+        the following compiles
+        '''
+        opts = {
+            'optimization_order': [0, 1, 2],
+            'renderer': 'json',
+            'renderer_blacklist': [],
+            'renderer_whitelist': [],
+            'state_top': '',
+            'pillar_roots': {'base': []},
+            'file_roots': {'base': []},
+            'extension_modules': '',
+            'ext_pillar': [{'hung': {}}, {'fast': {}}],
+            'ext_pillar_concurrency': 2,
+            'ext_pillar_timeout': 1,
+        }
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def hung(minion_id, pillar):
+            release.wait(30)
+            return {'source': 'hung'}
+
+        def fast(minion_id, pillar):
+            return {'source': 'fast'}
+
+        with patch('salt.loader.pillars',
+                   MagicMock(return_value={'hung': hung, 'fast': fast})), \
+                patch.object(salt.pillar.Pillar, 'ext_pillar_counters', {}):
+            for concurrency in (2, 2, 2, 4):
+                opts['ext_pillar_concurrency'] = concurrency
+                pillar = salt.pillar.Pillar(opts, {}, 'mocked-minion', 'base')
+                start = time.time()
+                self.assertEqual(
+                    pillar.ext_pillar({}),
+                    ({'source': 'fast'},
+                     ['Failed to load ext_pillar hung: timed out after 1 seconds']))
+                self.assertLess(time.time() - start, 2)
+            stats = salt.pillar.Pillar.ext_pillar_stats()
+            self.assertEqual(stats['hung']['timeouts'], 4)
+            self.assertEqual(stats['fast']['runs'], 4)
+
     def test_ext_pillar_no_extra_minion_data_val_dict(self):
         opts = {
             'optimization_order': [0, 1, 2],
@@ -678,6 +774,116 @@ generic:
             self.assertEqual(compiled_pillar['foo1'], 'bar1')
             self.assertEqual(compiled_pillar['foo2'], 'bar2')
 
+    @with_tempdir()
+    def test_render_cache(self, tempdir):
+        opts = salt.config.master_config(None)
+        opts.update({
+            'cachedir': tempdir,
+            'pillar_roots': {'base': [tempdir]},
+            'renderer': 'jinja|yaml',
+            'pillar_render_cache': True,
+        })
+        with salt.utils.files.fopen(os.path.join(tempdir, 'map.jinja'), 'w') as fp_:
+            fp_.write("{% set family = grains.get('os_family') %}")
+        sls = os.path.join(tempdir, 'os.sls')
+        with salt.utils.files.fopen(sls, 'w') as fp_:
+            fp_.write("{% from 'map.jinja' import family %}\n"
+                      "os: {{ grains['os'] }}\n"
+                      "family: {{ family }}\n")
+        fc_mock = MockFileclient(get_state={'os': {'path': '', 'dest': sls}},
+                                 list_states=['os'])
+        fc_mock.get_file = MagicMock()
+        self.addCleanup(setattr, salt.pillar.RenderCache, '_cache', None)
+        salt.pillar.RenderCache._cache = None
+        salt.pillar.RenderCache.dependencies.clear()
+        salt.pillar.RenderCache.data.clear()
+        salt.pillar.RenderCache.stored.clear()
+        counters = dict.fromkeys(salt.pillar.RenderCache.counters, 0)
+
+        def render(minion_id, grains):
+            pillar = salt.pillar.Pillar(opts, dict(grains, id=minion_id), minion_id, 'base')
+            return pillar.render_pstate('os', 'base', set())[0]
+
+        with patch.object(salt.fileclient, 'get_file_client',
+                          MagicMock(return_value=fc_mock)), \
+                patch.dict(salt.pillar.RenderCache.counters, counters), \
+                patch('salt.pillar.compile_template',
+                      MagicMock(side_effect=salt.pillar.compile_template)) as compile_mock:
+            ubuntu = {'os': 'Ubuntu', 'os_family': 'Debian'}
+            self.assertEqual(render('minion1', ubuntu),
+                             {'os': 'Ubuntu', 'family': 'Debian'})
+            data = render('minion2', ubuntu)
+            self.assertEqual(data, {'os': 'Ubuntu', 'family': 'Debian'})
+            self.assertEqual(compile_mock.call_count, 1)
+            # The render handed out is a copy
+            data['os'] = 'changed'
+            self.assertEqual(render('minion3', ubuntu)['os'], 'Ubuntu')
+            self.assertEqual(compile_mock.call_count, 1)
+
+            self.assertEqual(render('minion4', {'os': 'CentOS', 'os_family': 'RedHat'}),
+                             {'os': 'CentOS', 'family': 'RedHat'})
+            self.assertEqual(compile_mock.call_count, 2)
+            self.assertEqual(salt.pillar.RenderCache.counters['hit'], 2)
+            self.assertEqual(salt.pillar.RenderCache.counters['miss'], 2)
+
+            # Other processes reuse the renders stored in the master cache
+            salt.pillar.RenderCache.dependencies.clear()
+            salt.pillar.RenderCache.data.clear()
+            self.assertEqual(render('minion5', ubuntu)['os'], 'Ubuntu')
+            self.assertEqual(compile_mock.call_count, 2)
+
+            # Included templates are part of the key
+            with salt.utils.files.fopen(os.path.join(tempdir, 'map.jinja'), 'w') as fp_:
+                fp_.write("{% set family = 'static' %}")
+            self.assertEqual(render('minion6', ubuntu)['family'], 'static')
+            self.assertEqual(compile_mock.call_count, 3)
+
+    @with_tempdir()
+    def test_render_cache_ttl(self, tempdir):
+        opts = salt.config.master_config(None)
+        opts.update({'cachedir': tempdir, 'pillar_render_cache_ttl': 100})
+        self.addCleanup(setattr, salt.pillar.RenderCache, '_cache', None)
+        salt.pillar.RenderCache._cache = None
+        self.addCleanup(salt.pillar.RenderCache.data.clear)
+        self.addCleanup(salt.pillar.RenderCache.dependencies.clear)
+        self.addCleanup(salt.pillar.RenderCache.stored.clear)
+        render_cache = salt.pillar.RenderCache(opts)
+        cache = render_cache.cache
+        with patch.dict(salt.pillar.RenderCache.counters, {'expired': 0}):
+            # The localfs driver knows when the keys were stored
+            render_cache.store('dep1', [], 'old', {'foo': 'old'})
+            render_cache.store('dep2', [], 'new', {'foo': 'new'})
+            old = os.path.join(tempdir, 'pillar_render', 'data', 'old.p')
+            new = os.path.join(tempdir, 'pillar_render', 'data', 'new.p')
+            for path in (old, new):
+                os.utime(path, (time.time() - 200, time.time() - 200))
+            # A render used from memory is stored again, at most every tenth
+            # of the TTL
+            salt.pillar.RenderCache.stored[('pillar_render/data', 'new')] -= 200
+            self.assertEqual(render_cache.fetch('new'), {'foo': 'new'})
+            self.assertGreater(os.path.getmtime(new), time.time() - 10)
+            with patch.object(render_cache, '_store') as store:
+                render_cache.fetch('new')
+                store.assert_not_called()
+            salt.pillar.RenderCache._expire_clock = 0
+            render_cache.expire()
+            self.assertEqual(sorted(cache.list('pillar_render/data')), ['new'])
+            self.assertEqual(salt.pillar.RenderCache.counters['expired'], 1)
+
+            # Other drivers rely on the time stored in the entries
+            modules = dict((fun, cache.modules['localfs.' + fun])
+                           for fun in ('fetch', 'store', 'list', 'flush'))
+            with patch.object(cache, '_modules', dict(
+                    ('localfs.' + fun, func) for fun, func in modules.items())):
+                with patch('time.time', MagicMock(return_value=time.time() - 200)):
+                    render_cache.store('dep3', [], 'older', {'foo': 'older'})
+                render_cache.store('dep2', [], 'newer', {'foo': 'newer'})
+                salt.pillar.RenderCache._expire_clock = 0
+                render_cache.expire()
+            self.assertEqual(sorted(cache.list('pillar_render/data')), ['new', 'newer'])
+            self.assertEqual(sorted(cache.list('pillar_render/dependencies')), ['dep1', 'dep2'])
+            self.assertNotIn('dep3', salt.pillar.RenderCache.dependencies)
+
     def _setup_test_include_sls(self, tempdir):
         top_file = tempfile.NamedTemporaryFile(dir=tempdir, delete=False)
         top_file.write(b'''
@@ -726,6 +932,78 @@ foo_wildcard:
         }
 
 
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class PillarCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.tempdir, ignore_errors=True)
+        self.addCleanup(delattr, self, 'tempdir')
+        # The master creates the directory of the disk backend on start
+        os.makedirs(os.path.join(self.tempdir, 'cache', 'pillar_cache'))
+        os.makedirs(os.path.join(self.tempdir, 'roots'))
+        self.opts = salt.config.master_config(None)
+        self.opts.update({
+            'cachedir': os.path.join(self.tempdir, 'cache'),
+            'pillar_roots': {'base': [os.path.join(self.tempdir, 'roots')]},
+            'pillar_cache': True,
+        })
+        self.addCleanup(delattr, self, 'opts')
+        self.addCleanup(setattr, salt.pillar.PillarCache, '_revisions', (0, None))
+        salt.pillar.PillarCache._revisions = (0, None)
+        patcher = patch('salt.pillar.Pillar')
+        self.pillar_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(delattr, self, 'pillar_mock')
+        self.pillar_mock.return_value.compile_pillar.side_effect = \
+            lambda: {'compiled': self.pillar_mock.call_count}
+
+    def _compile(self, grains, pillar_override=None):
+        salt.pillar.PillarCache._revisions = (0, None)
+        return salt.pillar.get_pillar(self.opts, grains, 'minion', 'base',
+                                      pillar_override=pillar_override,
+                                      pillarenv='base').compile_pillar()
+
+    def _test_fingerprint(self):
+        grains = {'os': 'Ubuntu'}
+        self.assertEqual(self._compile(grains), {'compiled': 1})
+        self.assertEqual(self._compile(grains), {'compiled': 1})
+        # Grains changed
+        self.assertEqual(self._compile({'os': 'CentOS'}), {'compiled': 2})
+        # pillar_override changed
+        self.assertEqual(self._compile({'os': 'CentOS'}, {'foo': 'bar'}),
+                         {'compiled': 3})
+        self.assertEqual(self._compile({'os': 'CentOS'}, {'foo': 'bar'}),
+                         {'compiled': 3})
+        # A pillar file changed
+        with salt.utils.files.fopen(os.path.join(self.tempdir, 'roots', 'top.sls'), 'w') as fp_:
+            fp_.write('base: {}')
+        self.assertEqual(self._compile({'os': 'CentOS'}, {'foo': 'bar'}),
+                         {'compiled': 4})
+
+        self.assertTrue(salt.pillar.PillarCache.clear(self.opts, 'minion'))
+        self.assertFalse(salt.pillar.PillarCache.clear(self.opts, 'minion'))
+        self.assertEqual(self._compile({'os': 'CentOS'}, {'foo': 'bar'}),
+                         {'compiled': 5})
+
+    def test_fingerprint_disk(self):
+        self._test_fingerprint()
+
+    def test_fingerprint_cache(self):
+        self.opts['pillar_cache_backend'] = 'cache'
+        self._test_fingerprint()
+        self.assertTrue(os.path.isdir(os.path.join(self.tempdir, 'cache', 'pillar', 'minion')))
+
+    def test_source_revisions_interval(self):
+        revisions = salt.pillar.PillarCache.source_revisions(self.opts)
+        with patch('salt.utils.path.os_walk', MagicMock(return_value=[])) as walk:
+            self.assertEqual(salt.pillar.PillarCache.source_revisions(self.opts), revisions)
+            walk.assert_not_called()
+            self.opts['pillar_cache_source_interval'] = 0
+            salt.pillar.PillarCache.source_revisions(self.opts)
+            walk.assert_called()
+
+
 @skipIf(NO_MOCK, NO_MOCK_REASON)
 @patch('salt.transport.client.ReqChannel.factory', MagicMock())
 class RemotePillarTestCase(TestCase):
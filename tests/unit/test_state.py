@@ -5,6 +5,8 @@
 
 # Import Python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import datetime
+import fnmatch
 import os
 import shutil
 import tempfile
@@ -23,6 +25,7 @@ from tests.support.runtests import RUNTIME_VARS
 # Import Salt libs
 import salt.exceptions
 import salt.state
+import salt.utils.files
 from salt.utils.odict import OrderedDict
 from salt.utils.decorators import state as statedecorators
 
@@ -129,6 +132,175 @@ class StateCompilerTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
             run_num = ret['test_|-step_one_|-step_one_|-succeed_with_changes']['__run_num__']
             self.assertEqual(run_num, 0)
 
+    def test_parallel_workers(self):
+        '''
+        Test that the parallel scheduler runs every chunk, runs required
+        chunks first and records the critical path of each chunk
+        '''
+        with patch('salt.state.State._gather_pillar') as state_patch:
+            high_data = {
+                'step_one': {'test': ['succeed_with_changes',
+                                      {'order': 10000}],
+                             '__env__': 'base',
+                             '__sls__': 'test.parallel_workers'},
+                'step_two': OrderedDict([
+                    ('test', [
+                        OrderedDict([
+                            ('require', [
+                                OrderedDict([
+                                    ('test', 'step_three')])])]),
+                        'succeed_with_changes', {'order': 10001}]),
+                    ('__sls__', 'test.parallel_workers'),
+                    ('__env__', 'base')]),
+                'step_three': {'test': ['succeed_without_changes',
+                                        {'order': 10002}],
+                               '__env__': 'base',
+                               '__sls__': 'test.parallel_workers'}}
+
+            minion_opts = self.get_temp_config('minion')
+            minion_opts['state_parallel_workers'] = 2
+            state_obj = salt.state.State(minion_opts, jid='20191018000000000000')
+            ret = state_obj.call_high(high_data)
+            self.assertEqual(len(ret), 3)
+            self.assertTrue(all(chunk['result'] for chunk in ret.values()))
+            two = ret['test_|-step_two_|-step_two_|-succeed_with_changes']
+            three = ret['test_|-step_three_|-step_three_|-succeed_without_changes']
+            self.assertLess(three['__run_num__'], two['__run_num__'])
+            self.assertGreaterEqual(two['__critical_path__'],
+                                    three['__critical_path__'])
+
+    def test_parallel_workers_order(self):
+        '''
+        Test that the parallel scheduler only starts a chunk ordered last
+        once the other chunks have finished
+        '''
+        with patch('salt.state.State._gather_pillar') as state_patch:
+            high_data = {
+                'step_one': {'test': ['succeed_without_changes',
+                                      {'order': 'last'}],
+                             '__env__': 'base',
+                             '__sls__': 'test.parallel_workers'},
+                'step_two': {'cmd': ['run',
+                                     {'name': 'sleep 1'},
+                                     {'shell': '/bin/sh'},
+                                     {'order': 10000}],
+                             '__env__': 'base',
+                             '__sls__': 'test.parallel_workers'},
+                'step_three': {'test': ['succeed_without_changes',
+                                        {'order': 10001}],
+                               '__env__': 'base',
+                               '__sls__': 'test.parallel_workers'}}
+
+            minion_opts = self.get_temp_config('minion')
+            minion_opts['state_parallel_workers'] = 2
+            state_obj = salt.state.State(minion_opts, jid='20191018000000000000')
+            ret = state_obj.call_high(high_data)
+            self.assertEqual(len(ret), 3)
+
+            def _start(chunk):
+                return datetime.datetime.strptime(chunk['start_time'], '%H:%M:%S.%f')
+
+            last = ret['test_|-step_one_|-step_one_|-succeed_without_changes']
+            sleep = ret['cmd_|-step_two_|-sleep 1_|-run']
+            three = ret['test_|-step_three_|-step_three_|-succeed_without_changes']
+            self.assertTrue(sleep['result'])
+            self.assertGreater(last['__run_num__'], three['__run_num__'])
+            self.assertGreaterEqual(
+                _start(last),
+                _start(sleep) + datetime.timedelta(milliseconds=sleep['duration']))
+
+    def test_requisite_index(self):
+        '''
+        Test that requisites are resolved through the chunk and high data
+        indexes the same way as by scanning the chunks
+        '''
+        with patch('salt.state.State._gather_pillar') as state_patch:
+            high_data = {
+                'web_a': {'file': ['managed', {'name': '/etc/a.conf'}],
+                          '__env__': 'base',
+                          '__sls__': 'web.a'},
+                'web_b': {'file': ['managed', {'name': '/etc/b.conf'}],
+                          'cmd': ['run', {'name': 'true'}],
+                          '__env__': 'base',
+                          '__sls__': 'web.b'},
+                'db': {'pkg': ['installed'],
+                       '__env__': 'base',
+                       '__sls__': 'db'}}
+
+            minion_opts = self.get_temp_config('minion')
+            state_obj = salt.state.State(minion_opts)
+            chunks = state_obj.compile_high_data(high_data)
+            self.assertIs(state_obj._chunk_index[0], chunks)
+
+            def _scan(req_key, req_val):
+                ret = []
+                for chunk in chunks:
+                    if req_key == 'sls':
+                        if fnmatch.fnmatch(chunk['__sls__'], req_val):
+                            ret.append(chunk)
+                    elif (fnmatch.fnmatch(chunk['name'], req_val) or
+                          fnmatch.fnmatch(chunk['__id__'], req_val)) \
+                            and req_key in ('id', chunk['state']):
+                        ret.append(chunk)
+                return ret
+
+            for req_key, req_val in (('id', 'web_b'),
+                                     ('file', 'web_*'),
+                                     ('file', '/etc/a.conf'),
+                                     ('cmd', 'web_a'),
+                                     ('sls', 'web.*'),
+                                     ('sls', 'db'),
+                                     ('id', 'missing')):
+                self.assertEqual(
+                    state_obj.find_chunks(chunks, req_key, req_val),
+                    _scan(req_key, req_val))
+
+            # A different list of chunks is indexed on use
+            subset = chunks[1:]
+            self.assertEqual(
+                state_obj.find_chunks(subset, 'id', 'db'),
+                [chunk for chunk in subset if chunk['__id__'] == 'db'])
+            self.assertIs(state_obj._chunk_index[0], subset)
+
+            index = salt.state.index_high(high_data)
+            self.assertEqual(
+                salt.state.find_sls_ids('web.b', high_data, index),
+                salt.state.find_sls_ids('web.b', high_data))
+            self.assertEqual(
+                salt.state.find_name('/etc/b.conf', 'file', high_data, index),
+                salt.state.find_name('/etc/b.conf', 'file', high_data))
+            self.assertEqual(index['names']['true'], ('cmd', 'web_b'))
+
+    def test_requisite_in_duplicate_names(self):
+        '''
+        Test that a requisite_in naming a state by a name several states share
+        is added to the first of them
+        '''
+        with patch('salt.state.State._gather_pillar') as state_patch:
+            high_data = OrderedDict([
+                ('nginx_pkg', {'pkg': ['installed', {'name': 'nginx'}],
+                               '__env__': 'base',
+                               '__sls__': 'web'}),
+                ('nginx_service', {'service': ['running', {'name': 'nginx'}],
+                                   '__env__': 'base',
+                                   '__sls__': 'web'}),
+                ('nginx_conf', {'file': ['managed',
+                                         {'name': '/etc/nginx/nginx.conf'},
+                                         {'require_in': ['nginx']}],
+                                '__env__': 'base',
+                                '__sls__': 'web'})])
+
+            minion_opts = self.get_temp_config('minion')
+            state_obj = salt.state.State(minion_opts)
+            high, errors = state_obj.requisite_in(high_data)
+            self.assertEqual(errors, [])
+            self.assertIn({'file': 'nginx_conf'},
+                          [req for arg in high['nginx_pkg']['pkg'] if isinstance(arg, dict)
+                           for req in arg.get('require', [])])
+            self.assertNotIn('require',
+                             [key for arg in high['nginx_service']['service']
+                              if isinstance(arg, dict) for key in arg])
+
 
 class HighStateTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
     def setUp(self):
@@ -227,6 +399,50 @@ class HighStateTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
         ret = salt.state.find_sls_ids('issue-47182.stateA.newer', high)
         self.assertEqual(ret, [('somestuff', 'cmd')])
 
+    def test_lowstate_cache(self):
+        '''
+        Test that a highstate runs the cached lowstate until an SLS file,
+        template or the pillar it is compiled from changes
+        '''
+        files = {
+            'top.sls': "base:\n  '*':\n    - web\n",
+            'web.sls': "{% from 'map.jinja' import port %}\n"
+                       "web:\n"
+                       "  test.succeed_without_changes:\n"
+                       "    - name: port-{{ port }}{{ pillar.get('suffix', '') }}\n",
+            'map.jinja': "{% set port = 80 %}\n",
+        }
+        for name, contents in files.items():
+            with salt.utils.files.fopen(os.path.join(self.state_tree_dir, name), 'w') as fp_:
+                fp_.write(contents)
+        self.config['state_lowstate_cache'] = True
+        self.config['autoload_dynamic_modules'] = False
+
+        def _highstate(pillar=None):
+            highstate = salt.state.HighState(self.config)
+            if pillar is not None:
+                highstate.state.opts['pillar'].update(pillar)
+            highstate.push_active()
+            try:
+                ret = highstate.call_highstate()
+            finally:
+                highstate.pop_active()
+            return sorted(chunk['name'] for chunk in ret.values())
+
+        self.assertEqual(_highstate(), ['port-80'])
+        with patch.object(salt.state.HighState, 'render_highstate',
+                          MagicMock(side_effect=AssertionError)):
+            self.assertEqual(_highstate(), ['port-80'])
+
+        with salt.utils.files.fopen(os.path.join(self.state_tree_dir, 'map.jinja'), 'w') as fp_:
+            fp_.write("{% set port = 8080 %}\n")
+        self.assertEqual(_highstate(), ['port-8080'])
+
+        self.assertEqual(_highstate({'suffix': '-ssl'}), ['port-8080-ssl'])
+        with patch.object(salt.state.HighState, 'render_highstate',
+                          MagicMock(side_effect=AssertionError)):
+            self.assertEqual(_highstate({'suffix': '-ssl'}), ['port-8080-ssl'])
+
 
 @skipIf(NO_MOCK, NO_MOCK_REASON)
 @skipIf(pytest is None, 'PyTest is missing')
@@ -5,22 +5,37 @@
 
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import ctypes
+import logging
+import multiprocessing
+import socket
 import threading
+import time
+
+import msgpack
 
 import tornado.gen
 import tornado.ioloop
 import tornado.concurrent
+import tornado.iostream
+import tornado.tcpclient
 from tornado.testing import AsyncTestCase, gen_test
 
 import salt.config
+import salt.crypt
+import salt.master
+import salt.payload
 from salt.ext import six
 import salt.utils.platform
 import salt.utils.process
 import salt.transport.server
 import salt.transport.client
+import salt.transport.frame
+import salt.transport.tcp
 import salt.exceptions
 from salt.ext.six.moves import range
-from salt.transport.tcp import SaltMessageClientPool
+from salt.transport.tcp import (PubServer, SaltMessageClient, SaltMessageClientPool, SaltMessageServer,
+                                ShardPresence, Subscriber)
 
 # Import Salt Testing libs
 from tests.support.unit import TestCase, skipIf
@@ -29,6 +44,8 @@ from tests.support.mixins import AdaptedConfigurationTestCaseMixin
 from tests.support.mock import MagicMock, patch
 from tests.unit.transport.mixins import PubChannelMixin, ReqChannelMixin
 
+log = logging.getLogger(__name__)
+
 
 class BaseTCPReqCase(TestCase, AdaptedConfigurationTestCaseMixin):
     '''
@@ -310,3 +327,252 @@ class SaltMessageClientPoolTest(AsyncTestCase):
 
         with self.assertRaises(tornado.ioloop.TimeoutError):
             test_connect(self)
+
+
+class SaltMessageThroughputTest(AsyncTestCase):
+    '''
+    Round trip messages from 1KB to 64MB through a SaltMessageServer and
+    SaltMessageClient over the loopback interface
+    '''
+    def setUp(self):
+        super(SaltMessageThroughputTest, self).setUp()
+        self.port = get_unused_localhost_port()
+        self.server = SaltMessageServer(self._echo, io_loop=self.io_loop)
+        self.server.listen(self.port, address='127.0.0.1')
+        self.client = SaltMessageClient({}, '127.0.0.1', self.port, io_loop=self.io_loop)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        self.server.shutdown()
+        del self.client
+        del self.server
+        super(SaltMessageThroughputTest, self).tearDown()
+
+    @tornado.gen.coroutine
+    def _echo(self, stream, header, body):
+        if body['enc'] == 'aes':
+            # Stands for the session key check of the req server channel
+            self.server.set_authenticated(stream)
+        yield stream.write(salt.transport.frame.frame_msg(body, header={'mid': header['mid']}))
+
+    @gen_test(timeout=120)
+    def test_round_trip(self):
+        for size in (1024, 64 * 1024, 1024 * 1024, 16 * 1024 * 1024, 64 * 1024 * 1024):
+            body = {'enc': 'aes', 'load': b'\x01' * size}
+            start = time.time()
+            ret = yield self.client.send(body, timeout=60)
+            duration = time.time() - start
+            log.debug('Round trip of %d bytes took %.3fs (%.1f MB/s)',
+                      size, duration, 2 * size / (duration or 1e-9) / 1024 / 1024)
+            self.assertEqual(len(ret['load']), size)
+
+    @gen_test(timeout=30)
+    def test_pre_auth_buffer_limit(self):
+        '''
+        Ensure that a stream is closed once it sends more than
+        PRE_AUTH_MAX_BUFFER_SIZE bytes of a message before authenticating
+        '''
+        handler = MagicMock()
+        self.server.message_handler = handler
+        stream = yield tornado.tcpclient.TCPClient().connect('127.0.0.1', self.port)
+        address = stream.socket.getsockname()
+        try:
+            payload = salt.transport.frame.frame_msg(
+                {'enc': 'clear', 'load': b'\x01' * (salt.transport.frame.PRE_AUTH_MAX_BUFFER_SIZE + 1)},
+                header={'mid': 1})
+            with self.assertRaises(tornado.iostream.StreamClosedError):
+                yield stream.write(payload)
+                yield stream.read_bytes(1)
+        finally:
+            stream.close()
+        handler.assert_not_called()
+        self.assertNotIn(address, [client[1] for client in self.server.clients])
+
+
+class PubServerTest(AsyncTestCase):
+    '''
+    Tests for the PubServer subscriber bookkeeping
+    '''
+    def setUp(self):
+        super(PubServerTest, self).setUp()
+        with patch('salt.master.AESFuncs', MagicMock()):
+            self.pub_server = PubServer({'transport': 'tcp'}, io_loop=self.io_loop, shard=3)
+
+    def tearDown(self):
+        del self.pub_server
+        super(PubServerTest, self).tearDown()
+
+    def _subscriber(self, id_):
+        client = Subscriber(MagicMock(), ('127.0.0.1', 0))
+        client.id_ = id_
+        client.stream.write.return_value = tornado.concurrent.Future()
+        self.pub_server.clients.add(client)
+        self.pub_server._add_client_present(client)
+        return client
+
+    @gen_test
+    def test_publish_backlog(self):
+        minion1 = self._subscriber('minion1')
+        minion2 = self._subscriber('minion2')
+        yield self.pub_server.publish_payload({'payload': b'1234'}, None)
+        yield self.pub_server.publish_payload({'payload': b'12', 'topic_lst': ['minion2', 'minion3']}, None)
+        self.assertEqual(minion1.stream.write.call_count, 1)
+        self.assertEqual(minion2.stream.write.call_count, 2)
+        self.assertEqual(self.pub_server.stats(), {'shard': 3,
+                                                   'clients': 2,
+                                                   'present': 2,
+                                                   'publishes': 2,
+                                                   'backlog': 3,
+                                                   'backlog_bytes': 10})
+        minion1.stream.write.return_value.set_result(None)
+        yield tornado.gen.moment
+        stats = self.pub_server.stats()
+        self.assertEqual(stats['backlog'], 2)
+        self.assertEqual(stats['backlog_bytes'], 6)
+        minion2.stream.write.return_value.set_result(None)
+        yield tornado.gen.moment
+        stats = self.pub_server.stats()
+        self.assertEqual(stats['backlog'], 0)
+        self.assertEqual(stats['backlog_bytes'], 0)
+
+    def test_sharded_presence(self):
+        '''
+        Test that a shard hands its presence changes to the shard dispatcher
+        '''
+        event = MagicMock()
+        with patch('salt.master.AESFuncs', MagicMock()), \
+                patch('salt.utils.event.get_event', MagicMock(return_value=event)):
+            self.pub_server = PubServer({'transport': 'tcp', 'presence_events': True},
+                                        io_loop=self.io_loop, shard=3, sharded=True)
+        event.fire_event.assert_called_once_with({'shard': 3, 'reset': True},
+                                                 'salt/presence/shard/3')
+        minion = self._subscriber('minion1')
+        self._subscriber('minion1')
+        self.pub_server._remove_client_present(minion)
+        self.assertEqual(event.fire_event.call_count, 2)
+        event.fire_event.assert_called_with({'shard': 3, 'new': ['minion1'], 'lost': []},
+                                            'salt/presence/shard/3')
+
+
+class ShardPresenceTest(TestCase):
+    '''
+    Tests for merging the presence of the publish shards
+    '''
+    def setUp(self):
+        with patch('salt.utils.event.get_event', MagicMock()):
+            self.presence = ShardPresence({})
+
+    def _fired(self):
+        fired = [call[0] for call in self.presence.event.fire_event.call_args_list]
+        self.presence.event.fire_event.reset_mock()
+        return [(tag, sorted(data['present'])) for data, tag in fired
+                if tag == 'salt/presence/present'] + \
+               [(tag, sorted(data['new']), sorted(data['lost'])) for data, tag in fired
+                if tag == 'salt/presence/change']
+
+    def test_update(self):
+        self.presence.update({'shard': 0, 'new': ['minion1', 'minion2'], 'lost': []})
+        self.assertEqual(self._fired(), [('salt/presence/present', ['minion1', 'minion2']),
+                                         ('salt/presence/change', ['minion1', 'minion2'], [])])
+        self.presence.update({'shard': 1, 'new': ['minion3'], 'lost': []})
+        self.assertEqual(self._fired(), [('salt/presence/present', ['minion1', 'minion2', 'minion3']),
+                                         ('salt/presence/change', ['minion3'], [])])
+        # A minion connected to two shards is only lost once gone from both
+        self.presence.update({'shard': 1, 'new': ['minion1'], 'lost': []})
+        self.assertEqual(self._fired(), [])
+        self.presence.update({'shard': 0, 'new': [], 'lost': ['minion1']})
+        self.assertEqual(self._fired(), [])
+        self.presence.update({'shard': 1, 'reset': True})
+        self.assertEqual(self._fired(), [('salt/presence/present', ['minion2']),
+                                         ('salt/presence/change', [], ['minion1', 'minion3'])])
+
+
+class PublishShardTest(AsyncTestCase):
+    '''
+    Tests for the connection of a shard to the shard dispatcher
+    '''
+    @gen_test
+    def test_read_shard_publishes_reconnects(self):
+        channel = salt.transport.tcp.TCPPubServerChannel({'transport': 'tcp', 'sock_dir': '/tmp'})
+        done = tornado.concurrent.Future()
+        done.set_result(None)
+        pending = tornado.concurrent.Future()
+        subscriber = MagicMock()
+        subscriber.read_async.side_effect = [done, done, pending]
+        with patch('tornado.gen.sleep', MagicMock(return_value=done)):
+            self.io_loop.spawn_callback(channel._read_shard_publishes, subscriber, 0)
+            for _ in range(10):
+                yield tornado.gen.moment
+        self.assertEqual(subscriber.read_async.call_count, 3)
+
+
+@skipIf(not hasattr(socket, 'SO_REUSEPORT'), 'SO_REUSEPORT is not available')
+class ShardedPubServerTest(TestCase, AdaptedConfigurationTestCaseMixin):
+    '''
+    Broadcast through a TCPPubServerChannel with its subscribers spread over
+    several shard processes
+    '''
+    def setUp(self):
+        self.opts = self.get_temp_config(
+            'master',
+            **{'transport': 'tcp',
+               'ipc_mode': 'tcp',
+               'publish_port': get_unused_localhost_port(),
+               'tcp_master_publish_pull': get_unused_localhost_port(),
+               'tcp_master_publish_shards': get_unused_localhost_port(),
+               'tcp_publish_shards': 2,
+               'sign_pub_messages': False}
+        )
+        salt.master.SMaster.secrets['aes'] = {
+            'secret': multiprocessing.Array(
+                ctypes.c_char,
+                six.b(salt.crypt.Crypticle.generate_key_string()),
+            ),
+        }
+        self.process_manager = salt.utils.process.ProcessManager(name='ShardedPubServer_ProcessManager')
+        self.channel = salt.transport.tcp.TCPPubServerChannel(self.opts)
+        self.channel.pre_fork(self.process_manager)
+
+    def tearDown(self):
+        self.process_manager.kill_children()
+        del self.process_manager
+        del self.channel
+        del self.opts
+
+    def test_broadcast(self):
+        self.assertEqual(len(self.process_manager._process_map), 3)
+        # Allow time for the publisher and its shards to start
+        deadline = time.time() + 60
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', self.opts['publish_port'])).close()
+                break
+            except socket.error:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.5)
+        time.sleep(5)
+        socks = []
+        for _ in range(6):
+            sock = socket.create_connection(('127.0.0.1', self.opts['publish_port']))
+            sock.settimeout(10)
+            socks.append(sock)
+        time.sleep(1)
+        self.channel.publish({'tgt_type': 'glob', 'tgt': '*', 'jid': 1})
+        serial = salt.payload.Serial(self.opts)
+        crypticle = salt.crypt.Crypticle(self.opts, salt.master.SMaster.secrets['aes']['secret'].value)
+        try:
+            for sock in socks:
+                unpacker = msgpack.Unpacker()
+                framed_msg = None
+                while framed_msg is None:
+                    unpacker.feed(sock.recv(4096))
+                    for framed_msg in unpacker:
+                        break
+                load = crypticle.loads(serial.loads(framed_msg[b'body'])['load'])
+                self.assertEqual(load['jid'], 1)
+        finally:
+            for sock in socks:
+                sock.close()
+
@@ -10,6 +10,7 @@ import time
 import threading
 import multiprocessing
 import ctypes
+import hashlib
 from concurrent.futures.thread import ThreadPoolExecutor
 
 # linux_distribution deprecated in py3.7
@@ -361,6 +362,22 @@ class ZMQConfigTest(TestCase):
                                                          source_port=s_port) == 'tcp://0.0.0.0:{0};{1}:{2}'.format(s_port, m_ip, m_port)
 
 
+class PublishLatencyHistogramTest(TestCase):
+    def test_add(self):
+        stats = salt.transport.zeromq.PublishLatencyHistogram()
+        for latency in (0.0005, 0.002, 0.002, 3, 30):
+            stats.add(latency)
+        ret = stats.stats()
+        assert ret['runs'] == 5
+        assert ret['max'] == 30
+        assert ret['histogram']['le_0.001'] == 1
+        assert ret['histogram']['le_0.005'] == 2
+        assert ret['histogram']['le_5.0'] == 1
+        assert ret['histogram']['inf'] == 1
+        stats.reset()
+        assert stats.stats()['runs'] == 0
+
+
 class PubServerChannel(TestCase, AdaptedConfigurationTestCaseMixin):
 
     @classmethod
@@ -507,6 +524,43 @@ class PubServerChannel(TestCase, AdaptedConfigurationTestCaseMixin):
         server_channel.pub_close()
         assert len(results) == send_num, (len(results), set(expect).difference(results))
 
+    def test_publish_filtered_large_list(self):
+        '''
+        Test a zmq_filtering publish targeting 100K minions only reaches the
+        subscribers of the hashed topics
+        '''
+        opts = dict(self.master_config, ipc_mode='tcp', pub_hwm=0, zmq_filtering=True)
+        server_channel = salt.transport.zeromq.ZeroMQPubServerChannel(opts)
+        server_channel.pre_fork(self.process_manager, kwargs={
+            'log_queue': salt.log.setup.get_multiprocessing_logging_queue()
+        })
+        pub_uri = 'tcp://{interface}:{publish_port}'.format(**opts)
+        ctx = zmq.Context()
+        sock = ctx.socket(zmq.SUB)
+        sock.setsockopt(zmq.LINGER, 0)
+        sock.setsockopt(zmq.SUBSCRIBE, hashlib.sha1(b'minion-99999').hexdigest().encode())
+        sock.connect(pub_uri)
+        # Allow time for server channel to start, especially on windows
+        time.sleep(2)
+        tgt = ['minion-{0}'.format(idx) for idx in range(100000)]
+        check_minions = MagicMock(side_effect=lambda tgt, tgt_type: {'minions': tgt, 'missing': []})
+        with patch.object(server_channel.ckminions, 'check_minions', check_minions):
+            server_channel.publish({'tgt_type': 'list', 'tgt': tgt, 'jid': 1})
+            server_channel.publish({'tgt_type': 'list', 'tgt': tgt[:10], 'jid': 2})
+            server_channel.publish({'tgt_type': 'list', 'tgt': tgt, 'jid': 3})
+        serial = salt.payload.Serial(opts)
+        crypticle = salt.crypt.Crypticle(opts, salt.master.SMaster.secrets['aes']['secret'].value)
+        results = []
+        deadline = time.time() + 60
+        while len(results) < 2 and time.time() < deadline:
+            if sock.poll(1000):
+                _, payload = sock.recv_multipart()
+                results.append(crypticle.loads(serial.loads(payload)['load'])['jid'])
+        sock.close()
+        ctx.term()
+        server_channel.pub_close()
+        assert results == [1, 3]
+
     @staticmethod
     def _send_small(opts, sid, num=10):
         server_channel = salt.transport.zeromq.ZeroMQPubServerChannel(opts)
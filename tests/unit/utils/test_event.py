@@ -13,9 +13,12 @@ import os
 import hashlib
 import time
 import shutil
+import threading
+import tempfile
 
 # Import Salt Testing libs
 from tests.support.unit import expectedFailure, skipIf, TestCase
+from tests.support.mock import MagicMock, patch
 from tests.support.runtests import RUNTIME_VARS
 from tests.support.events import eventpublisher_process, eventsender_process
 
@@ -232,6 +235,73 @@ class TestSaltEvent(TestCase):
             self.assertGotEvent(evt2, {'data': 'foo2'})
             self.assertGotEvent(evt1, {'data': 'foo1'})
 
+    def test_event_subscriptions_overlap(self):
+        '''Test an event cached for several subscriptions is returned once'''
+        with eventpublisher_process(self.sock_dir):
+            me = salt.utils.event.MasterEvent(self.sock_dir, listen=True)
+            me.subscribe('salt/job/1')
+            me.subscribe('salt/job/')
+            me.subscribe('.*/ret$', 'regex')
+            me.fire_event({'data': 'foo1'}, 'salt/job/1/ret')
+            me.fire_event({'data': 'foo2'}, 'salt/job/2/ret')
+            me.fire_event({'data': 'foo3'}, 'evt3')
+            evt3 = me.get_event(tag='evt3')
+            self.assertGotEvent(evt3, {'data': 'foo3'})
+            self.assertGotEvent(me.get_event(tag='salt/job/', no_block=True), {'data': 'foo1'})
+            self.assertIsNone(me.get_event(tag='salt/job/1', no_block=True))
+            self.assertGotEvent(me.get_event(tag='salt/job/2', no_block=True), {'data': 'foo2'})
+            self.assertIsNone(me.get_event(tag='.*/ret$', match_type='regex', no_block=True))
+            me.unsubscribe('salt/job/')
+            me.fire_event({'data': 'foo4'}, 'salt/job/4/ret')
+            me.fire_event({'data': 'foo5'}, 'evt5')
+            self.assertGotEvent(me.get_event(tag='evt5'), {'data': 'foo5'})
+            self.assertGotEvent(me.get_event(tag='.*/ret$', match_type='regex', no_block=True),
+                                {'data': 'foo4'})
+            me.unsubscribe('salt/job/1')
+            me.unsubscribe('.*/ret$', 'regex')
+            self.assertEqual(me.pending_tags, {})
+            self.assertEqual(len(me.pending_events), 0)
+
+    def test_event_subscribe_cached(self):
+        '''Test a new subscription gets the events cached for other ones'''
+        me = salt.utils.event.MasterEvent(self.sock_dir, listen=False)
+        me.subscribe('salt/job/')
+        me._cache_pending({'tag': 'salt/job/1/ret/minion', 'data': {}})
+        me._cache_pending({'tag': 'salt/job/2/ret/minion', 'data': {}})
+        me.subscribe('salt/job/1')
+        match_func = me._get_match_func()
+        self.assertEqual(me._check_pending('salt/job/1', match_func)['tag'],
+                         'salt/job/1/ret/minion')
+        self.assertIsNone(me._check_pending('salt/job/1', match_func))
+        me.unsubscribe('salt/job/1')
+        self.assertEqual(me._check_pending('salt/job/', match_func)['tag'],
+                         'salt/job/2/ret/minion')
+        me.unsubscribe('salt/job/')
+        self.assertEqual(len(me.pending_events), 0)
+
+    def test_event_filter_tags(self):
+        '''Test the publisher only sends the events matching the tag filter'''
+        with eventpublisher_process(self.sock_dir):
+            me = salt.utils.event.MasterEvent(self.sock_dir, listen=True)
+            me.filter_tags(['salt/job/', 'evt1'])
+            # Let the publisher register the filter
+            me.get_event(wait=0.5)
+            me.fire_event({'data': 'foo2'}, 'evt2')
+            me.fire_event({'data': 'foo1'}, 'evt1')
+            me.fire_event({'data': 'foo3'}, 'salt/job/3/ret')
+            self.assertGotEvent(me.get_event(tag=''), {'data': 'foo1'})
+            self.assertGotEvent(me.get_event(tag=''), {'data': 'foo3'})
+            me.filter_tags(None)
+            me.get_event(wait=0.5)
+            me.fire_event({'data': 'foo2'}, 'evt2')
+            self.assertGotEvent(me.get_event(tag=''), {'data': 'foo2'})
+
+    def test_tag_prefixes(self):
+        '''Test the literal prefixes of tag globs'''
+        self.assertEqual(salt.utils.event.tag_prefixes(['salt/job/*/ret/*', 'salt/auth', 'salt/run/?/new']),
+                         ['salt/auth', 'salt/job/', 'salt/run/'])
+        self.assertIsNone(salt.utils.event.tag_prefixes(['salt/auth', '*/ret']))
+
     def test_event_multiple_clients(self):
         '''Test event is received by multiple clients'''
         with eventpublisher_process(self.sock_dir):
@@ -325,3 +395,176 @@ class TestAsyncEventPublisher(AsyncTestCase):
         self.assertEqual(self.tag, 'evt1')
         self.data.pop('_stamp')  # drop the stamp
         self.assertEqual(self.data, {'data': 'foo1'})
+
+
+class TestEventReturn(TestCase):
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.cachedir, ignore_errors=True)
+        self.opts = {'cachedir': self.cachedir,
+                     'event_return': 'fake',
+                     'event_return_queue': 0,
+                     'event_return_spool_max': 0,
+                     'event_return_whitelist': [],
+                     'event_return_blacklist': []}
+
+    def _event_return(self, **opts):
+        self.opts.update(opts)
+        with patch('salt.minion.MasterMinion', MagicMock()):
+            return salt.utils.event.EventReturn(self.opts)
+
+    def test_filter(self):
+        '''
+        Test that the whitelist and blacklist globs are matched like fnmatch
+        '''
+        tags = ['salt/job/1/ret/minion', 'salt/job/1/new', 'salt/auth', 'salt/run/1/ret']
+        evr = self._event_return()
+        self.assertEqual([tag for tag in tags if evr._filter({'tag': tag})], tags)
+        evr = self._event_return(event_return_whitelist=['salt/job/*', 'salt/run/?/ret'],
+                                 event_return_blacklist=['*/new'])
+        self.assertEqual([tag for tag in tags if evr._filter({'tag': tag})],
+                         ['salt/job/1/ret/minion', 'salt/run/1/ret'])
+
+    def test_flusher_spool(self):
+        '''
+        Test that spooled batches are retried, kept across restarts and
+        bounded by event_return_spool_max
+        '''
+        self.opts['event_return_spool_max'] = 3
+        stored = []
+        returner = MagicMock(side_effect=Exception('unavailable'))
+        flusher = salt.utils.event.EventReturnFlusher(self.opts, 'fake', returner)
+        spool_dir = os.path.join(self.cachedir, 'event_return', 'fake')
+        flusher.put([{'tag': 'a'}])
+        flusher.put([{'tag': 'b'}, {'tag': 'c'}])
+        self.assertEqual(len(os.listdir(spool_dir)), 2)
+        # The oldest batch is dropped once the spool holds too many events
+        flusher.put([{'tag': 'd'}])
+        self.assertEqual(len(os.listdir(spool_dir)), 2)
+        self.assertEqual(flusher.stats['dropped'], 1)
+        flusher.start()
+        flusher.stop(timeout=1)
+        self.assertFalse(flusher.is_alive())
+        self.assertEqual(len(os.listdir(spool_dir)), 2)
+
+        # The batches left in the spool are stored once the returner is back
+        self.opts['event_return_spool_max'] = 10
+        flusher = salt.utils.event.EventReturnFlusher(self.opts, 'fake', stored.extend)
+        self.assertEqual(flusher.stats['spooled'], 3)
+        flusher.start()
+        flusher.put([{'tag': 'e'}])
+        flusher.stop(timeout=5)
+        self.assertEqual([event['tag'] for event in stored], ['b', 'c', 'd', 'e'])
+        self.assertEqual(os.listdir(spool_dir), [])
+        self.assertEqual(flusher.stats['events'], 4)
+        self.assertEqual(flusher.stats['spooled'], 0)
+
+    def test_flusher_spool_retries(self):
+        '''
+        Test that batches are set aside after event_return_spool_retries
+        attempts, dropped first when the spool is full and stored on the next
+        start, and that the temp files of interrupted writes are cleaned up
+        '''
+        self.opts.update(event_return_spool_max=10, event_return_spool_retries=2)
+        spool_dir = os.path.join(self.cachedir, 'event_return', 'fake')
+        os.makedirs(spool_dir)
+        with salt.utils.files.fopen(os.path.join(spool_dir, '.___atomic_writeabc'), 'w'):
+            pass
+        returner = MagicMock(side_effect=Exception('unavailable'))
+        flusher = salt.utils.event.EventReturnFlusher(self.opts, 'fake', returner)
+        self.assertEqual(os.listdir(spool_dir), [])
+        flusher.start()
+        flusher.put([{'tag': 'a'}, {'tag': 'b'}])
+        flusher.put([{'tag': 'c'}])
+        flusher.stop(timeout=5)
+        self.assertEqual(returner.call_count, 4)
+        self.assertEqual(len(os.listdir(spool_dir)), 2)
+        self.assertEqual(flusher.stats['failed'], 3)
+        self.assertEqual(flusher.stats['spooled'], 3)
+
+        # The batches set aside count toward the spool size
+        self.opts['event_return_spool_max'] = 3
+        flusher = salt.utils.event.EventReturnFlusher(self.opts, 'fake', returner)
+        flusher._failed.extend(flusher._spool)
+        flusher._spool.clear()
+        flusher.put([{'tag': 'd'}])
+        self.assertEqual(flusher.stats['dropped'], 2)
+        self.assertEqual(len(os.listdir(spool_dir)), 2)
+
+        stored = []
+        flusher = salt.utils.event.EventReturnFlusher(self.opts, 'fake', stored.extend)
+        flusher.start()
+        flusher.stop(timeout=5)
+        self.assertEqual([event['tag'] for event in stored], ['c', 'd'])
+        self.assertEqual(os.listdir(spool_dir), [])
+
+    def test_flusher_stop_busy_returner(self):
+        '''
+        Test that stopping does not hang on a returner still storing a batch
+        '''
+        release = threading.Event()
+        stored = []
+
+        def returner(events):
+            release.wait(10)
+            stored.extend(events)
+        evr = self._event_return()
+        evr.minion.returners = {'fake.event_return': returner}
+        evr.event_queue.append({'tag': 'a'})
+        evr.flush_events()
+        evr.event_queue.append({'tag': 'b'})
+        evr.flush_events()
+        evr.event_queue.append({'tag': 'c'})
+        evr.flush_events(timeout=0.1)
+        flusher = evr.flushers['fake']
+        self.assertEqual(flusher.stats['dropped'], 1)
+        start = time.time()
+        flusher.stop(timeout=0.1)
+        self.assertLess(time.time() - start, 5)
+        release.set()
+        flusher.join(5)
+        self.assertFalse(flusher.is_alive())
+        self.assertEqual(stored, [{'tag': 'a'}])
+
+    def test_flush_events(self):
+        '''
+        Test that the queued events are passed to every event returner
+        '''
+        first, second = [], []
+        evr = self._event_return(event_return=['first', 'second', 'missing'])
+        evr.minion.returners = {'first.event_return': first.extend,
+                                'second.event_return': second.extend}
+        evr.event_queue.extend([{'tag': 'a'}, {'tag': 'b'}])
+        evr.flush_events()
+        self.assertEqual(evr.event_queue, [])
+        self.assertEqual(sorted(evr.flushers), ['first', 'second'])
+        evr._stop_flushers()
+        self.assertEqual(first, [{'tag': 'a'}, {'tag': 'b'}])
+        self.assertEqual(second, [{'tag': 'a'}, {'tag': 'b'}])
+
+
+class TestSubscriptionIndex(TestCase):
+    def test_match(self):
+        '''
+        Test that the index returns the subscriptions an event tag matches
+        '''
+        index = salt.utils.event.SubscriptionIndex()
+        index.add('all', '', None, 'startswith')
+        index.add('job', 'salt/job/', None, 'startswith')
+        index.add('job1', 'salt/job/1', None, 'startswith')
+        index.add('job1-exact', 'salt/job/1', None, 'exact')
+        index.add('ret', '/ret', lambda event_tag, tag: event_tag.endswith(tag))
+        self.assertEqual(sorted(index.match('salt/job/1')),
+                         ['all', 'job', 'job1', 'job1-exact'])
+        self.assertEqual(sorted(index.match('salt/job/12/ret')),
+                         ['all', 'job', 'job1', 'ret'])
+        self.assertEqual(sorted(index.match('salt/auth')), ['all'])
+
+        index.remove('job1', 'salt/job/1', 'startswith')
+        index.remove('job1-exact', 'salt/job/1', 'exact')
+        index.remove('ret', '/ret')
+        index.remove('all', '', 'startswith')
+        self.assertEqual(index.match('salt/job/1/ret'), ['job'])
+        index.remove('job', 'salt/job/', 'startswith')
+        self.assertEqual(index.match('salt/job/1/ret'), [])
+        self.assertEqual(index._trie, {})
@@ -90,3 +90,49 @@ class TestGitFSProvider(TestCase):
                                 role_class,
                                 *args,
                                 **kwargs)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class TestGitFSBlobs(TestCase):
+
+    def setUp(self):
+        with patch.object(salt.utils.gitfs.GitFS, 'verify_gitpython',
+                          MagicMock(return_value=True)):
+            self.gitfs = salt.utils.gitfs.GitFS(
+                dict(OPTS, gitfs_provider='gitpython', hash_type='sha256'),
+                {}, init_remotes=False)
+        self.repo = MagicMock(id='repo')
+        self.repo.read_blob.side_effect = lambda blob: blob.encode() * 10
+        self.gitfs.remotes = [self.repo]
+
+    def tearDown(self):
+        del self.gitfs
+        del self.repo
+
+    def test_read_blob(self):
+        '''
+        Ensure that the blobs last read are kept up to BLOB_CACHE_SIZE bytes
+        '''
+        with patch.object(salt.utils.gitfs, 'BLOB_CACHE_SIZE', 25):
+            for blob in ('a', 'b', 'a', 'c', 'a', 'b'):
+                self.assertEqual(
+                    self.gitfs._read_blob({'blob': blob, 'remote': 'repo'}),
+                    blob.encode() * 10)
+        self.assertEqual(
+            [call[0][0] for call in self.repo.read_blob.call_args_list],
+            ['a', 'b', 'c', 'b'])
+        self.assertEqual(list(self.gitfs.blob_data), ['a', 'b'])
+        self.assertEqual(self.gitfs.blob_data_size, 20)
+        self.assertIsNone(self.gitfs._read_blob({'blob': 'd', 'remote': 'other'}))
+
+    def test_blob_hashes(self):
+        '''
+        Ensure that at most BLOB_HASHES_MAX blob hashes are kept
+        '''
+        with patch.object(salt.utils.gitfs, 'BLOB_HASHES_MAX', 2):
+            for blob in ('a', 'b', 'a', 'c'):
+                ret = self.gitfs.file_hash(
+                    {'path': blob, 'saltenv': 'base'},
+                    {'blob': blob, 'remote': 'repo'})
+                self.assertEqual(ret['hash_type'], 'sha256')
+        self.assertEqual([key[0] for key in self.gitfs.blob_hashes], ['a', 'c'])
@@ -37,7 +37,7 @@ from salt.utils.jinja import (
     tojson
 )
 from salt.utils.odict import OrderedDict
-from salt.utils.templates import JINJA, render_jinja_tmpl
+from salt.utils.templates import JINJA, jinja_dependencies, render_jinja_tmpl
 
 # dateutils is needed so that the strftime jinja filter is loaded
 import salt.utils.dateutils  # pylint: disable=unused-import
@@ -1321,6 +1321,29 @@ class TestCustomExtensions(TestCase):
         )
         self.assertEqual(rendered, '2')
 
+    def test_context_dependencies(self):
+        '''
+        Test the grains, pillar and opts keys and templates a template reads
+        '''
+        def deps(source):
+            return jinja_dependencies(source, self.local_opts, 'test')
+
+        self.assertEqual(
+            deps("{{ grains['os'] }}{{ pillar.users.root }}{{ opts.get('id') }}"
+                 "{{ salt['grains.get']('ip4:eth0') }}"),
+            {('grains', 'os'), ('pillar', 'users'), ('opts', 'id'),
+             ('grains', 'ip4')})
+        self.assertEqual(deps("{% for key in grains %}{{ key }}{% endfor %}"),
+                         {('grains', None)})
+        self.assertEqual(deps("{% set key = 'os' %}{{ grains[key] }}"),
+                         {('grains', None)})
+        self.assertEqual(deps("{% from 'map.jinja' import map %}"
+                              "{% import_yaml 'defaults.yaml' as defaults %}"),
+                         {('file', 'map.jinja'), ('file', 'defaults.yaml')})
+        self.assertIsNone(deps("{{ salt['cmd.run']('uptime') }}"))
+        self.assertIsNone(deps("{{ 10|random_str }}"))
+        self.assertIsNone(deps("{% include tmpl %}"))
+
     # def test_print(self):
     #     env = Environment(extensions=[SerializerExtension])
     #     source = '{% import_yaml "toto.foo" as docu %}'
@@ -2,12 +2,19 @@
 
 # Import python libs
 from __future__ import absolute_import, unicode_literals
+import os
+import shutil
 import sys
+import tempfile
 
 # Import Salt Libs
+import salt.payload
+import salt.utils.data
+import salt.utils.files
 import salt.utils.minions
 
 # Import Salt Testing Libs
+from tests.support.runtests import RUNTIME_VARS
 from tests.support.unit import TestCase, skipIf
 from tests.support.mock import (
     patch,
@@ -509,3 +516,206 @@ class NodegroupCompTest(TestCase):
         # If this works, it should also print an error to the console
         ret = salt.utils.minions.nodegroup_comp('group1', referenced_nodegroups)
         self.assertEqual(ret, [])
+
+
+MINION_DATA = {
+    'web1': {'grains': {'os': 'Ubuntu',
+                        'roles': ['web', 'frontend'],
+                        'ipv4': ['10.0.0.1', '127.0.0.1'],
+                        'num_cpus': 4,
+                        'locale_info': {'defaultlanguage': 'en_US'}},
+             'pillar': {'app': {'version': '1.2:rc1'}, 'env': 'prod'}},
+    'web2': {'grains': {'os': 'ubuntu',
+                        'roles': ['web'],
+                        'ipv4': ['10.0.0.2'],
+                        'num_cpus': 8},
+             'pillar': {'app': {'version': '1.3'}, 'env': 'prod'}},
+    'db1': {'grains': {'os': 'CentOS',
+                       'roles': [{'db': 'primary'}],
+                       'ipv4': ['10.0.1.1'],
+                       'num_cpus': 16},
+            'pillar': {'env': 'staging'}},
+    'empty': {},
+}
+
+
+class MinionDataIndexTestCase(TestCase):
+    '''
+    TestCase for salt.utils.minions.MinionDataIndex
+    '''
+    def setUp(self):
+        self.index = salt.utils.minions.MinionDataIndex()
+        for minion_id, mdata in MINION_DATA.items():
+            self.index.update(minion_id, mdata)
+
+    def _subdict_match(self, search_type, expr, **kwargs):
+        return set(
+            minion_id for minion_id, mdata in MINION_DATA.items()
+            if salt.utils.data.subdict_match(mdata.get(search_type), expr, **kwargs)
+        )
+
+    def test_match_agrees_with_subdict_match(self):
+        '''
+        The index must return exactly what matching every minion would
+        '''
+        exprs = ('os:Ubuntu', 'os:ubuntu', 'os:Cent*', 'os:*', 'os', 'nope:x',
+                 'roles:web', 'roles:front*', 'roles:db', 'roles:db:primary',
+                 'ipv4:10.0.0.*', 'ipv4:0:10.0.0.1', 'num_cpus:8',
+                 'locale_info:defaultlanguage:en_*', '*:web',
+                 'locale_info:*:en_US')
+        for expr in exprs:
+            self.assertEqual(self.index.match('grains', expr),
+                             self._subdict_match('grains', expr),
+                             expr)
+        for expr in ('app:version:1.2:rc1', 'app:version:1.*', 'env:prod'):
+            self.assertEqual(self.index.match('pillar', expr),
+                             self._subdict_match('pillar', expr),
+                             expr)
+        for expr in ('os:ubun.*', 'os:(Cent|Ubu)', 'ipv4:10\\.0\\.1\\..*', 'os:['):
+            self.assertEqual(self.index.match('grains', expr, regex_match=True),
+                             self._subdict_match('grains', expr, regex_match=True),
+                             expr)
+        for expr in ('env:prod', 'env:pro*', 'app:version:1.3'):
+            self.assertEqual(self.index.match('pillar', expr, exact_match=True),
+                             self._subdict_match('pillar', expr, exact_match=True),
+                             expr)
+        self.assertEqual(self.index.match('grains', 'os|Ubuntu', delimiter='|'),
+                         self._subdict_match('grains', 'os|Ubuntu', delimiter='|'))
+
+    def test_update_and_remove(self):
+        self.index.update('web2', {'grains': {'os': 'Debian'}})
+        self.assertEqual(self.index.match('grains', 'os:ubuntu'), set(['web1']))
+        self.assertEqual(self.index.match('grains', 'os:debian'), set(['web2']))
+        self.index.remove('web1')
+        self.assertEqual(self.index.match('grains', 'os:ubuntu'), set())
+        self.assertNotIn('ubuntu', self.index.tokens['grains']['os'])
+
+    def test_refresh(self):
+        cache = MagicMock()
+        cache.driver = 'localfs'
+        cache.modules = {'localfs.updated': None}
+        cache.list.return_value = ['web1', 'db2']
+        cache.updated.return_value = 1
+        cache.fetch.return_value = {'grains': {'os': 'Fedora'}}
+        self.index.refresh(cache)
+        self.assertEqual(set(self.index.data), set(['web1', 'db2']))
+        self.assertEqual(self.index.match('grains', 'os:fedora'), set(['web1', 'db2']))
+        # Unchanged entries are not fetched again
+        cache.fetch.reset_mock()
+        self.index.refresh(cache)
+        cache.fetch.assert_not_called()
+        # Refreshes are rate limited by the interval
+        cache.list.reset_mock()
+        self.index.refresh(cache, interval=60)
+        cache.list.assert_not_called()
+
+    def test_refresh_without_updated(self):
+        '''
+        Test that with cache drivers not implementing updated, every minion is
+        fetched again on refresh
+        '''
+        cache = MagicMock()
+        cache.driver = 'redis'
+        cache.modules = {'redis.fetch': None}
+        cache.list.return_value = ['web1']
+        cache.fetch.return_value = {'grains': {'os': 'Fedora'}}
+        self.index.refresh(cache)
+        self.assertEqual(self.index.match('grains', 'os:fedora'), set(['web1']))
+        cache.updated.assert_not_called()
+        cache.fetch.return_value = {'grains': {'os': 'Arch'}}
+        self.index.refresh(cache)
+        self.assertEqual(self.index.match('grains', 'os:arch'), set(['web1']))
+        cache.updated.assert_not_called()
+
+
+class CkMinionsDataIndexTestCase(TestCase):
+    '''
+    TestCase for targeting through the minion data index
+    '''
+    def setUp(self):
+        opts = {'minion_data_cache': True, 'minion_data_index': True}
+        self.ckminions = salt.utils.minions.CkMinions(opts)
+        self.index = salt.utils.minions.MinionDataIndex()
+        for minion_id, mdata in MINION_DATA.items():
+            self.index.update(minion_id, mdata)
+        patcher = patch('salt.utils.minions.get_minion_data_index',
+                        MagicMock(return_value=self.index))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for method in ('_pki_minions', '_accepted_minions'):
+            patcher = patch('salt.utils.minions.CkMinions.' + method,
+                            MagicMock(return_value=['db1', 'empty', 'new', 'web1', 'web2']))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_check_grain_minions(self):
+        ret = self.ckminions._check_grain_minions('os:ubuntu', ':', False)
+        self.assertEqual(sorted(ret['minions']), ['web1', 'web2'])
+        # Minions without cached data are kept when greedy
+        ret = self.ckminions._check_grain_minions('os:ubuntu', ':', True)
+        self.assertEqual(ret['minions'], ['new', 'web1', 'web2'])
+
+    def test_check_compound_minions(self):
+        ret = self.ckminions._check_compound_minions(
+            'G@roles:web and not I@env:prod or db*', ':', False)
+        self.assertEqual(sorted(ret['minions']), ['db1'])
+        ret = self.ckminions._check_compound_minions(
+            'G@roles:web and ( I@app:version:1.2* or G@num_cpus:8 )', ':', False)
+        self.assertEqual(sorted(ret['minions']), ['web1', 'web2'])
+        ret = self.ckminions._check_compound_minions('not G@os:ubuntu', ':', False)
+        self.assertEqual(sorted(ret['minions']), ['db1', 'empty', 'new'])
+
+
+class PkiKeyIndexTestCase(TestCase):
+    '''
+    TestCase for salt.utils.minions.PkiKeyIndex
+    '''
+    def setUp(self):
+        self.pki_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.pki_dir)
+        self.acc_dir = os.path.join(self.pki_dir, 'minions')
+        os.makedirs(os.path.join(self.acc_dir, 'subdir'))
+        for id_ in ('web-2', 'Web-1', 'web-10', 'db-1', 'webserver', '.key_cache'):
+            self._touch(id_)
+        # Make the directory old enough for its mtime to be trusted
+        os.utime(self.acc_dir, (0, 0))
+        self.ckminions = salt.utils.minions.CkMinions({'pki_dir': self.pki_dir,
+                                                       'key_cache': ''})
+
+    def _touch(self, id_):
+        with salt.utils.files.fopen(os.path.join(self.acc_dir, id_), 'w'):
+            pass
+
+    def test_pki_minions(self):
+        self.assertEqual(self.ckminions._pki_minions(),
+                         ['db-1', 'Web-1', 'web-10', 'web-2', 'webserver'])
+
+    def test_all_minions_ignore_key_cache(self):
+        with salt.utils.files.fopen(os.path.join(self.acc_dir, '.key_cache'), 'wb') as fp_:
+            salt.payload.Serial('msgpack').dump(['db-1'], fp_)
+        self.ckminions.opts['key_cache'] = 'sched'
+        self.assertEqual(self.ckminions._pki_minions(), ['db-1'])
+        self.assertEqual(self.ckminions._all_minions()['minions'],
+                         ['db-1', 'Web-1', 'web-10', 'web-2', 'webserver'])
+
+    def test_glob(self):
+        index = salt.utils.minions.get_pki_key_index(self.acc_dir)
+        for expr in ('web-*', 'web-1?', '*-1', 'web*', 'web-[12]', 'db-1', 'nope', '*'):
+            self.assertEqual(index.glob(expr),
+                             salt.utils.minions.fnmatch.filter(index.keys, expr),
+                             expr)
+
+    def test_check_list_and_pcre_minions(self):
+        ret = self.ckminions._check_list_minions('web-2,nope', True)
+        self.assertEqual(ret, {'minions': ['web-2'], 'missing': ['nope']})
+        ret = self.ckminions._check_pcre_minions('web-\\d$', True)
+        self.assertEqual(ret['minions'], ['web-2'])
+
+    def test_refresh_only_lists_changed_directories(self):
+        index = salt.utils.minions.get_pki_key_index(self.acc_dir)
+        with patch('os.listdir') as listdir:
+            index.refresh()
+            listdir.assert_not_called()
+        self._touch('web-3')
+        self.assertEqual(self.ckminions._check_glob_minions('web-?', True)['minions'],
+                         ['web-2', 'web-3'])